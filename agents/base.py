@@ -1,10 +1,59 @@
+from typing import Any, AsyncIterator, Dict, List, Optional
+
 from autogen import AssistantAgent
 from config import CONFIG
 
 class BaseAgent(AssistantAgent):
-    def __init__(self, name: str, system_message: str):
+    """
+    The built-in agents answer from templates in generate_reply. Agents that call
+    the model use a_chat / stream_chat, i.e. the process-wide pooled client:
+    autogen gets llm_config=False so it does not build a client stack per agent.
+    """
+
+    def __init__(self, name: str, system_message: str, llm_config: Optional[Dict[str, Any]] = None):
+        llm_config = llm_config or CONFIG["llm_config"]
         super().__init__(
             name=name,
             system_message=system_message,
-            llm_config=CONFIG["llm_config"],
+            llm_config=False,
         )
+        # used by core.executor to pick the thread pool for this agent's calls
+        self.backend = llm_config.get("base_url", "default")
+        self.llm = dict(llm_config)
+
+    def _payload(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "model": self.llm.get("model"),
+            "messages": [{"role": "system", "content": self.system_message}] + list(messages),
+            "temperature": self.llm.get("temperature"),
+            "max_tokens": self.llm.get("max_tokens"),
+        }
+
+    async def a_chat(self, messages: List[Dict[str, Any]]) -> str:
+        """
+        One completion through the process-wide pooled HTTP client (keep-alive,
+        shared by every agent and run) instead of a per-agent client stack.
+        """
+        from core.llm_client import get_llm_client
+
+        body = await get_llm_client().chat(self.llm["base_url"], self._payload(messages), self.llm.get("api_key", ""))
+        try:
+            return body["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError):
+            return ""
+
+    async def stream_chat(self, messages: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        """Streaming variant of a_chat (yields content deltas)."""
+        from core.llm_client import get_llm_client
+
+        async for chunk in get_llm_client().stream_chat(
+            self.llm["base_url"], self._payload(messages), self.llm.get("api_key", "")
+        ):
+            yield chunk
+
+    def with_llm_config(self, **overrides: Any) -> "BaseAgent":
+        """
+        Same agent (class + system message) pointed at another backend/model.
+        """
+        cfg = {**CONFIG["llm_config"], **overrides}
+        return type(self)(name=self.name, system_message=self.system_message, llm_config=cfg)
@@ -0,0 +1,148 @@
+# agents/registry.py
+from __future__ import annotations
+
+import importlib
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+
+# Third-party packages add agents with an entry point in this group, e.g. in pyproject.toml:
+#   [project.entry-points."aidt.agents"]
+#   Reviewer = "my_pkg.agents:make_reviewer"   # zero-arg factory (or an agent instance)
+ENTRY_POINT_GROUP = "aidt.agents"
+
+# name -> "module:attribute" of the module-level agent instance
+BUILTIN: Dict[str, str] = {
+    "Director": "agents.director:director",
+    "Planner": "agents.planner:planner",
+    "Researcher": "agents.researcher:researcher",
+    "Coder": "agents.coder:coder",
+    "Designer": "agents.designer:designer",
+    "Scribe": "agents.scribe:scribe",
+    "QA": "agents.qa:qa",
+}
+
+Factory = Callable[[], Any]
+
+
+def _from_path(path: str) -> Factory:
+    module, _, attr = path.partition(":")
+    return lambda: getattr(importlib.import_module(module), attr)
+
+
+def _from_entry_point(ep: Any) -> Factory:
+    def factory():
+        obj = ep.load()
+        return obj if hasattr(obj, "generate_reply") else obj()
+    return factory
+
+
+def _entry_points(group: str) -> List[Any]:
+    from importlib import metadata  # ~10 ms: only paid when an unknown name is looked up
+
+    eps = metadata.entry_points()
+    if hasattr(eps, "select"):  # 3.10+
+        return list(eps.select(group=group))
+    return list(eps.get(group, []))  # type: ignore[attr-defined]
+
+
+class AgentRegistry:
+    """
+    Agent name -> factory; an agent module (and autogen behind it) is imported
+    the first time the agent is looked up, not when the orchestrator is imported.
+    Behaves like a read/write dict of agents for the orchestrator:
+    `name in registry`, `registry[name]`, `registry.update({name: agent})`.
+    Built-in names win over entry points with the same name.
+    """
+
+    def __init__(self, builtin: Optional[Dict[str, str]] = None, group: Optional[str] = ENTRY_POINT_GROUP):
+        self._factories: Dict[str, Factory] = {n: _from_path(p) for n, p in (builtin or {}).items()}
+        self._instances: Dict[str, Any] = {}
+        self._group = group
+        self._discovered = group is None
+        self._lock = threading.RLock()
+
+    def _discover(self) -> None:
+        if self._discovered:
+            return
+        with self._lock:
+            if self._discovered:
+                return
+            self._discovered = True
+            try:
+                eps = _entry_points(self._group)
+            except Exception:
+                eps = []  # broken metadata must not break the built-in agents
+            for ep in eps:
+                self._factories.setdefault(ep.name, _from_entry_point(ep))
+
+    def register(self, name: str, factory: Union[Factory, Any]) -> None:
+        """Adds / replaces an agent: a zero-arg factory, or an agent instance."""
+        with self._lock:
+            self._instances.pop(name, None)
+            if hasattr(factory, "generate_reply"):
+                self._instances[name] = factory
+                self._factories[name] = lambda: factory
+            else:
+                self._factories[name] = factory
+
+    def update(self, agents: Dict[str, Any]) -> None:
+        for name, agent in agents.items():
+            self.register(name, agent)
+
+    def get(self, name: str) -> Any:
+        agent = self._instances.get(name)
+        if agent is not None:
+            return agent
+        if name not in self._factories:
+            self._discover()
+        with self._lock:
+            agent = self._instances.get(name)
+            if agent is None:
+                factory = self._factories.get(name)
+                if factory is None:
+                    raise KeyError(name)
+                agent = self._instances[name] = factory()
+            return agent
+
+    def __getitem__(self, name: str) -> Any:
+        return self.get(name)
+
+    def __contains__(self, name: object) -> bool:
+        if name in self._factories:
+            return True
+        self._discover()
+        return name in self._factories
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names())
+
+    def __len__(self) -> int:
+        return len(self.names())
+
+    def names(self) -> List[str]:
+        self._discover()
+        with self._lock:
+            return list(self._factories)
+
+    def loaded(self) -> List[str]:
+        """Agents instantiated so far."""
+        with self._lock:
+            return list(self._instances)
+
+
+_REGISTRY: Optional[AgentRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_registry() -> AgentRegistry:
+    """Process-wide registry: the built-in agents + the aidt.agents entry points."""
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = AgentRegistry(BUILTIN)
+        return _REGISTRY
+
+
+def get_agent(name: str) -> Any:
+    return get_registry().get(name)
@@ -0,0 +1,145 @@
+# benchmarks/bench_import.py
+"""
+Cold-start import latency of the entry points, each measured in a fresh interpreter
+(no warm sys.modules, .pyc files as they are on disk):
+
+    python benchmarks/bench_import.py                 # run + print
+    python benchmarks/bench_import.py --save          # ... and store benchmarks/import_baseline.json
+    python benchmarks/bench_import.py --compare       # ... and fail (exit 1) on regressions
+
+"import" is the time spent inside the import statement(s). "process" is the
+interpreter start-to-exit time. "agents" lists the agent modules that were
+actually loaded, and "autogen" whether autogen was.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from run import compare  # noqa: E402
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_baseline.json")
+
+TARGETS: Dict[str, str] = {
+    "cli": "import main",
+    "orchestrator": "import dashboard.orchestrator",
+    "dashboard": "import dashboard.service, core.run_index, core.contracts, core.profiling, preview",
+    "fast_mode_agent": "from agents.registry import get_agent; get_agent('Coder')",
+    "all_agents": "from agents.registry import get_registry; r = get_registry(); [r[n] for n in r.names()]",
+}
+
+_PROBE = """
+import sys, time, json
+t = time.perf_counter()
+{stmt}
+took = time.perf_counter() - t
+print(json.dumps({{
+    "import_sec": took,
+    "autogen": "autogen" in sys.modules,
+    "agents": sorted(m for m in sys.modules if m.startswith("agents.") and m not in ("agents.base", "agents.registry")),
+}}))
+"""
+
+
+def probe(stmt: str) -> Dict[str, Any]:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(p for p in (ROOT, os.environ.get("PYTHONPATH", "")) if p)}
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(stmt=stmt)],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    process = time.perf_counter() - started
+    if out.returncode != 0:
+        last = (out.stderr.strip().splitlines() or ["failed"])[-1]
+        return {"skipped": last}
+    r = json.loads(out.stdout.strip().splitlines()[-1])
+    r["process_sec"] = process
+    return r
+
+
+def measure(stmt: str, repeat: int) -> Dict[str, Any]:
+    runs: List[Dict[str, Any]] = []
+    for _ in range(repeat):
+        r = probe(stmt)
+        if "skipped" in r:
+            return r
+        runs.append(r)
+    imports = sorted(r["import_sec"] for r in runs)
+    procs = sorted(r["process_sec"] for r in runs)
+    return {
+        "best_us": round(imports[0] * 1e6, 1),
+        "median_us": round(imports[len(imports) // 2] * 1e6, 1),
+        "process_ms": round(procs[len(procs) // 2] * 1000, 1),
+        "autogen": runs[-1]["autogen"],
+        "agents": runs[-1]["agents"],
+    }
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--filter", default="", help="only targets whose name contains this text")
+    p.add_argument("--repeat", type=int, default=5, help="fresh interpreters per target (best is compared)")
+    p.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON path")
+    p.add_argument("--save", action="store_true", help="write results as the new baseline")
+    p.add_argument("--compare", action="store_true", help="compare with the baseline; exit 1 on regression")
+    p.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    p.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = p.parse_args(argv)
+
+    baseline: Optional[Dict[str, Any]] = None
+    if args.compare:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            print(f"no baseline at {args.baseline} (run with --save first)", file=sys.stderr)
+            return 2
+
+    results = {name: measure(stmt, args.repeat) for name, stmt in TARGETS.items() if args.filter in name}
+    regressions = compare(results, baseline, args.threshold) if baseline else []
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        width = max((len(n) for n in results), default=10)
+        for name, r in results.items():
+            if "skipped" in r:
+                print(f"{name:<{width}}  skipped ({r['skipped']})")
+                continue
+            line = (
+                f"{name:<{width}}  import {r['best_us'] / 1000:>8.1f} ms  process {r['process_ms']:>8.1f} ms  "
+                f"autogen {'yes' if r['autogen'] else 'no '}  agents {len(r['agents'])}"
+            )
+            if "vs_baseline" in r:
+                flag = "  <-- REGRESSION" if name in regressions else ""
+                line += f"  x{r['vs_baseline']:.2f} vs baseline{flag}"
+            print(line)
+
+    if args.save:
+        saved: Dict[str, Any] = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                saved = json.load(f).get("results", {})
+        saved.update({k: {"best_us": v["best_us"], "median_us": v["median_us"]} for k, v in results.items() if "best_us" in v})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": saved}, f, indent=2)
+        print(f"baseline saved: {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
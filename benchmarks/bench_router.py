@@ -0,0 +1,88 @@
+# benchmarks/bench_router.py
+"""
+Micro-benchmark: legacy keyword scans (3 lowercases + repeated any(k in g))
+vs the single-pass router in core.router, through the public route() (what the
+orchestrator calls) and IntentRouter.classify alone.
+
+    python benchmarks/bench_router.py [--n 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.router import DEFAULT_KEYWORDS, IntentRouter, route  # noqa: E402
+
+
+GOALS = [
+    "build a streamlit login page",
+    "tell me 7 days of week names",
+    "Create a realtor lead capture form with a PRD and a Streamlit MVP that saves to CSV",
+    "what is the capital of France",
+    "Fix the JSON parsing bug in my FastAPI endpoint and add tests",
+    "Design a dark dashboard layout for monitoring agent runs with charts and filters",
+    "define idempotency",
+    "debugging my flask app",
+    "help with implementation of quicksort",
+    "Write a long explanation of how HTTP keep-alive works, with examples and pitfalls, "
+    "and compare it to HTTP/2 multiplexing for a team that runs a local LLM server",
+]
+
+
+def legacy_route(goal: str):
+    def needs_code(goal: str) -> bool:
+        g = (goal or "").lower()
+        return any(k in g for k in DEFAULT_KEYWORDS["code"])
+
+    def needs_ui(goal: str) -> bool:
+        g = (goal or "").lower()
+        return any(k in g for k in DEFAULT_KEYWORDS["ui"])
+
+    def is_simple_factual(goal: str) -> bool:
+        g = (goal or "").strip().lower()
+        if not g:
+            return True
+        if len(g.split()) <= 6 and not needs_code(g) and not needs_ui(g):
+            return True
+        return any(t in g for t in DEFAULT_KEYWORDS["factual"]) and not needs_code(g)
+
+    return needs_code(goal), needs_ui(goal), is_simple_factual(goal)
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--n", type=int, default=20000, help="goals classified per measurement")
+    p.add_argument("--repeat", type=int, default=7, help="rounds per path (best is reported)")
+    args = p.parse_args(argv)
+
+    router = IntentRouter()
+
+    def classify_only(goal: str):
+        i = router.classify(goal)
+        return i.code, i.ui, i.simple_factual
+
+    def public_route(goal: str):
+        i = route(goal)  # what build_subtasks / run_agents call: router lookup + classify
+        return i.code, i.ui, i.simple_factual
+
+    corpus = (GOALS * (args.n // len(GOALS) + 1))[: args.n]
+    results = {}
+    for label, fn in (("legacy", legacy_route), ("route()", public_route), ("classify", classify_only)):
+        best = min(timeit.repeat(lambda: [fn(g) for g in corpus], number=1, repeat=args.repeat))
+        results[label] = best
+        print(f"{label:>9}: {best / args.n * 1e6:8.2f} us/goal  ({args.n} goals, best of {args.repeat})")
+
+    print(f"  route() vs legacy: {results['legacy'] / results['route()']:.2f}x")
+
+    diffs = [g for g in GOALS if legacy_route(g) != public_route(g)]
+    for g in diffs:
+        print(f"  differs (word boundaries): {g!r} legacy={legacy_route(g)} route={public_route(g)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+# benchmarks/bench_similarity.py
+"""
+Near-duplicate goal index (core.similarity) at scale: incremental adds, cold load
+of the project's jsonl, and lookup latency / recall over a synthetic project of
+--n past goals.
+
+    python benchmarks/bench_similarity.py [--n 100000] [--queries 2000]
+
+Queries are drawn from the stored goals:
+  repeat      same goal, other case / a-the-please filler     (expect: the original, reuse)
+  paraphrase  synonym verb, other stopwords, same word order  (expect: warm start; reuse only if worded alike)
+  reordered   same words shuffled                             (expect: never reuse; warm start only if some pairs survive)
+  drift       one content word replaced                       (expect: some run, warm start)
+  unseen      fresh random words                              (expect: no match)
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.similarity import DEFAULT_SYNONYMS, SimilarityIndex  # noqa: E402
+
+
+VERBS = ["build"] + DEFAULT_SYNONYMS["build"]
+FILLER = ["a", "the", "for", "with", "please", "simple", "in", "using"]
+
+
+def _vocab(rnd: random.Random, n: int) -> List[str]:
+    letters = "bcdfghjklmnprstvz"
+    vowels = "aeiou"
+    words = set()
+    while len(words) < n:
+        words.add("".join(rnd.choice(letters) + rnd.choice(vowels) for _ in range(rnd.randint(2, 4))))
+    return sorted(words)
+
+
+def _goal(rnd: random.Random, vocab: List[str]) -> List[str]:
+    return rnd.sample(vocab, rnd.randint(4, 7))
+
+
+def _text(rnd: random.Random, words: List[str], shuffle: bool = False) -> str:
+    words = list(words)
+    if shuffle:
+        rnd.shuffle(words)
+    out = [rnd.choice(VERBS)]
+    for w in words:
+        if rnd.random() < 0.3:
+            out.append(rnd.choice(FILLER))
+        out.append(w)
+    return " ".join(out)
+
+
+def _percentile(xs: List[float], q: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q * len(xs)))]
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--n", type=int, default=100000, help="past runs in the project")
+    p.add_argument("--queries", type=int, default=2000, help="lookups per query kind")
+    p.add_argument("--vocab", type=int, default=5000, help="distinct content words")
+    p.add_argument("--seed", type=int, default=7)
+    args = p.parse_args(argv)
+
+    rnd = random.Random(args.seed)
+    vocab = _vocab(rnd, args.vocab)
+    goals = [_goal(rnd, vocab) for _ in range(args.n)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cfg = {"dir": tmp}
+        index = SimilarityIndex(cfg)
+        texts = [_text(rnd, words) for words in goals]
+        started = time.perf_counter()
+        for i, text in enumerate(texts):
+            index.add("bench", f"run-{i}", text, "team", f"runs/run-{i}/scribe.md")
+        add_sec = time.perf_counter() - started
+        size_mb = os.path.getsize(os.path.join(tmp, "bench.jsonl")) / 1e6
+        print(f"add      : {add_sec / args.n * 1e6:8.1f} us/run   ({args.n} runs, jsonl {size_mb:.1f} MB)")
+
+        index = SimilarityIndex(cfg)
+        started = time.perf_counter()
+        index.load("bench")
+        print(f"cold load: {time.perf_counter() - started:8.2f} s        (once per project per process)")
+
+        picks = [rnd.randrange(args.n) for _ in range(args.queries)]
+        kinds: Dict[str, List] = {
+            "repeat": [(i, "Please " + texts[i].upper().replace(" A ", " THE ")) for i in picks],
+            "paraphrase": [(i, _text(rnd, goals[i])) for i in picks],
+            "reordered": [(i, _text(rnd, goals[i], shuffle=True)) for i in picks],
+            "drift": [(i, _text(rnd, goals[i][:-1] + [rnd.choice(vocab)])) for i in picks],
+            "unseen": [(None, _text(rnd, _goal(rnd, vocab))) for _ in picks],
+        }
+        warm = float(index.cfg.get("warm_start_threshold", 0.5))
+        for kind, queries in kinds.items():
+            lat: List[float] = []
+            found = exact = 0
+            cands = 0
+            for i, text in queries:
+                t = time.perf_counter()
+                m = index.lookup("bench", text, mode="team")
+                lat.append(time.perf_counter() - t)
+                if m is None:
+                    continue
+                cands += m.candidates
+                if m.similarity >= warm:
+                    found += 1
+                if i is not None and m.run_id == f"run-{i}" and m.exact:
+                    exact += 1
+            n = len(queries)
+            print(
+                f"{kind:<10}: p50 {_percentile(lat, 0.5) * 1e6:6.1f} us  p99 {_percentile(lat, 0.99) * 1e6:7.1f} us  "
+                f">= warm {found / n:6.1%}  original reused {exact / n:6.1%}  candidates/lookup {cands / n:6.1f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# benchmarks/corpora.py
+"""
+Deterministic inputs for benchmarks/run.py, shaped like what the agents really
+produce: large Coder replies full of fences, Director JSON that is truncated or
+wrapped in prose, and the multi-section messages the orchestrator sends to Scribe.
+"""
+from __future__ import annotations
+
+import json
+import random
+from typing import Dict, List
+
+
+CORE = ["Planner", "Researcher", "Coder", "Designer"]
+
+GOALS = [
+    "build a streamlit login page",
+    "tell me 7 days of week names",
+    "Create a realtor lead capture form with a PRD and a Streamlit MVP that saves to CSV",
+    "what is the capital of France",
+    "Fix the JSON parsing bug in my FastAPI endpoint and add tests",
+    "Design a dark dashboard layout for monitoring agent runs with charts and filters",
+    "define idempotency",
+    "Write a long explanation of how HTTP keep-alive works, with examples and pitfalls, "
+    "and compare it to HTTP/2 multiplexing for a team that runs a local LLM server",
+]
+
+
+def _code_block(rng: random.Random, lang: str, lines: int) -> str:
+    body = []
+    for i in range(lines):
+        indent = "    " * rng.randint(0, 2)
+        body.append(f"{indent}value_{i} = compute({i}, {{'key': {rng.randint(0, 999)}}})  # step {i}")
+    return f"```{lang}\n" + "\n".join(body) + "\n```"
+
+
+def coder_reply(blocks: int = 12, lines: int = 60, seed: int = 7) -> str:
+    """~50 KB Coder answer: prose between fenced blocks (python / html / text / no language)."""
+    rng = random.Random(seed)
+    parts = ["Here is the implementation. It keeps state in st.session_state {like this}."]
+    for b in range(blocks):
+        parts.append(f"### Part {b + 1}\nExplanation for part {b + 1}: uses a dict such as {{'a': 1}} and a list.")
+        parts.append(_code_block(rng, rng.choice(["python", "html", "", "text"]), lines))
+    parts.append("Run it with `streamlit run app.py`.")
+    return "\n\n".join(parts)
+
+
+def director_json(subtasks: int = 6) -> str:
+    return json.dumps({
+        "goal": GOALS[2],
+        "subtasks": [{"agent": CORE[i % len(CORE)], "task": f"Subtask {i}: " + "detail " * 20} for i in range(subtasks)],
+    }, indent=2)
+
+
+def malformed_json() -> List[str]:
+    """Replies _extract_json_obj sees in practice (most are not valid JSON)."""
+    good = director_json()
+    return [
+        good,
+        "Sure! Here is the plan:\n" + good + "\nLet me know if you need more.",
+        good[: len(good) // 2],  # truncated by max_tokens
+        good.replace('"task"', "'task'"),  # single quotes
+        good.rstrip("}") + ",}",  # trailing comma
+        "Use {curly} braces in prose and {another one} before " + good,  # greedy match spans prose
+        "No JSON here, just a paragraph of text " * 40,
+        "{" * 200 + "}" * 150,  # unbalanced nesting
+        "```json\n" + good + "\n```",
+    ]
+
+
+def scribe_input(sections: int = 4, paragraph: int = 30) -> str:
+    """GOAL + OUTPUTS message in the format orchestrator._format_sections builds."""
+    rng = random.Random(11)
+    out = f"GOAL:\n{GOALS[2]}\n\nOUTPUTS:\n"
+    names = (CORE * (sections // len(CORE) + 1))[:sections]
+    for name in names:
+        body = " ".join(rng.choice(["alpha", "beta", "gamma", "## not a header", "delta"]) for _ in range(paragraph))
+        out += f"\n## {name}\n{body}\n{_code_block(rng, 'python', 10)}\n"
+    return out
+
+
+def agent_replies() -> Dict[str, object]:
+    """Mixed reply shapes normalize_output receives."""
+    return {
+        "coder_text": coder_reply(),
+        "schema_string": json.dumps({"type": "code", "language": "python", "content": coder_reply(2, 20)}),
+        "dict": {"type": "markdown", "language": "md", "content": "# Title\n" + "text " * 500, "meta": {"k": 1}},
+        "html": "<!doctype html><html><body>" + "<div>x</div>" * 2000 + "</body></html>",
+        "none": None,
+    }
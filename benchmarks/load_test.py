@@ -0,0 +1,178 @@
+# benchmarks/load_test.py
+"""
+End-to-end load test of the orchestrator against the stub backend (no model needed).
+
+Every agent is swapped for an LLM-backed BaseAgent talking to the stub through the
+pooled HTTP client, then run_agents is driven with N runs at C concurrent:
+
+    python benchmarks/load_test.py --runs 50 --concurrency 10 --latency lognormal:200,0.4
+    python benchmarks/load_test.py --base-url http://127.0.0.1:11435/v1 --stream
+
+Reports throughput, run latency and p50/p95/p99 per stage (duration, queue wait,
+execution), plus event-loop lag sampled while the runs are in flight.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import CONFIG  # noqa: E402
+from core.stats import summarize  # noqa: E402
+from stub_llm_server import StubServer, add_stub_args, options_from_args  # noqa: E402
+
+
+def make_agents(base_url: str, stream: bool) -> Dict[str, Any]:
+    """One LLM-backed agent per orchestrator role, all pointed at base_url."""
+    from agents.base import BaseAgent
+
+    class StubChatAgent(BaseAgent):
+        async def generate_reply(self, messages):
+            return await self.a_chat(messages)
+
+    class StubStreamAgent(StubChatAgent):
+        async def stream_reply(self, messages) -> AsyncIterator[str]:
+            async for chunk in self.stream_chat(messages):
+                yield chunk
+
+    cls = StubStreamAgent if stream else StubChatAgent
+    cfg = {**CONFIG["llm_config"], "base_url": base_url, "model": "stub"}
+    names = ["Director", "Planner", "Researcher", "Coder", "Designer", "Scribe", "QA"]
+    return {n: cls(name=n, system_message=f"You are {n}.", llm_config=cfg) for n in names}
+
+
+async def _loop_lag(samples: List[float], interval: float, stop: asyncio.Event) -> None:
+    """How late the loop wakes up from a sleep(interval): blocking work shows up here."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        t = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - t - interval))
+
+
+async def drive(runs: int, concurrency: int, project: str, mode: str) -> Dict[str, Any]:
+    from dashboard.orchestrator import run_agents
+
+    sem = asyncio.Semaphore(max(1, concurrency))
+    latencies: List[float] = []
+    stages: Dict[str, Dict[str, List[float]]] = {}
+    counts = {"completed": 0, "failed": 0, "errors": 0}
+    lag: List[float] = []
+    stop = asyncio.Event()
+
+    async def one(i: int) -> None:
+        async with sem:
+            t = time.perf_counter()
+            try:
+                ctx, _, _ = await run_agents(
+                    goal=f"build a streamlit dashboard for load test run {i}",
+                    project=project,
+                    mode=mode,
+                    model="stub",
+                    use_cache=False,
+                )
+            except Exception:
+                counts["errors"] += 1
+                return
+            latencies.append(time.perf_counter() - t)
+            counts["completed" if ctx.get("status") == "completed" else "failed"] += 1
+            for agent, tm in (ctx.get("timings") or {}).items():
+                s = stages.setdefault(agent, {"duration": [], "queue_wait": [], "exec": []})
+                for key in s:
+                    if tm.get(key) is not None:
+                        s[key].append(float(tm[key]))
+
+    monitor = asyncio.ensure_future(_loop_lag(lag, 0.01, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(runs)))
+    wall = time.perf_counter() - started
+    stop.set()
+    await monitor
+
+    return {
+        "runs": runs,
+        **counts,
+        "concurrency": concurrency,
+        "wall_sec": round(wall, 4),
+        "throughput_per_min": round(runs / wall * 60.0, 2) if wall > 0 else 0.0,
+        "latency_sec": summarize(latencies),
+        "stages": {
+            agent: {k: summarize(v) for k, v in s.items() if v}
+            for agent, s in stages.items()
+        },
+        "loop_lag_ms": {k: (round(v * 1000, 3) if k != "count" else v) for k, v in summarize(lag).items()},
+    }
+
+
+def _print_report(r: Dict[str, Any], http: Dict[str, Any]) -> None:
+    lat = r["latency_sec"]
+    print(
+        f"runs {r['runs']} (completed {r['completed']}, failed {r['failed']}, errors {r['errors']}) "
+        f"at concurrency {r['concurrency']}: {r['wall_sec']}s, {r['throughput_per_min']}/min"
+    )
+    print(f"run latency  p50 {lat.get('p50', 0)}s  p95 {lat.get('p95', 0)}s  p99 {lat.get('p99', 0)}s")
+    print(f"{'stage':<12}{'p50':>9}{'p95':>9}{'p99':>9}{'wait p95':>10}{'exec p95':>10}")
+    for agent, s in r["stages"].items():
+        d, w, e = s.get("duration", {}), s.get("queue_wait", {}), s.get("exec", {})
+        print(
+            f"{agent:<12}{d.get('p50', 0):>9.3f}{d.get('p95', 0):>9.3f}{d.get('p99', 0):>9.3f}"
+            f"{w.get('p95', 0):>10.3f}{e.get('p95', 0):>10.3f}"
+        )
+    lag = r["loop_lag_ms"]
+    print(f"loop lag     p50 {lag.get('p50', 0)}ms  p99 {lag.get('p99', 0)}ms  max {lag.get('max', 0)}ms")
+    for host, s in http.items():
+        print(f"http {host}: requests {s.get('requests', 0)}, max_connections {s.get('max_connections', 0)}")
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--runs", type=int, default=20)
+    p.add_argument("--concurrency", type=int, default=5)
+    p.add_argument("--base-url", default="", help="existing backend; default: start the stub in-process")
+    p.add_argument("--stream", action="store_true", help="agents use the SSE streaming path")
+    p.add_argument("--project", default="loadtest")
+    p.add_argument("--mode", default="Team Mode")
+    p.add_argument("--json", action="store_true", help="print the report as JSON")
+    add_stub_args(p)
+    args = p.parse_args(argv)
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = StubServer(options_from_args(args)).start()
+        base_url = server.base_url
+
+    from dashboard import orchestrator
+    from core.llm_client import get_llm_client
+
+    orchestrator.AGENTS.update(make_agents(base_url, args.stream))
+
+    try:
+        report = asyncio.run(drive(args.runs, args.concurrency, args.project, args.mode))
+    finally:
+        if server is not None:
+            report_backend = dict(server.backend.counters)
+            server.stop()
+        else:
+            report_backend = {}
+
+    report["backend"] = report_backend
+    http = get_llm_client().stats()
+    if args.json:
+        print(json.dumps({**report, "http": http}, indent=2))
+    else:
+        _print_report(report, http)
+        if report_backend:
+            print(f"stub backend: {report_backend}")
+    return 0 if not report["errors"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
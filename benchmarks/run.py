@@ -0,0 +1,205 @@
+# benchmarks/run.py
+"""
+Micro-benchmarks for the pure-Python paths that run on every run / every dashboard rerun:
+contracts.normalize_output / _extract_json_obj / parse_code_blocks, scribe._extract_section,
+the intent router and orchestrator.build_subtasks / _extract_director_payload.
+
+    python benchmarks/run.py                       # run + print
+    python benchmarks/run.py --save                # ... and store benchmarks/baseline.json
+    python benchmarks/run.py --compare             # ... and fail (exit 1) on regressions
+    python benchmarks/run.py --filter json --threshold 0.25
+
+Timings are the best of --repeat rounds (per call, microseconds). Baselines are
+machine-specific: save and compare on the same box.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import corpora  # noqa: E402
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable[[], Callable[[], Any]]  # returns the zero-arg function to time
+    ops: int = 1  # calls made by one invocation (to report per-call time)
+
+
+def _each(fn: Callable[[Any], Any], items: List[Any]) -> Callable[[], Any]:
+    return lambda: [fn(x) for x in items]
+
+
+# ----------------------------
+# Cases (imports happen in setup so a missing dependency only skips its cases)
+# ----------------------------
+def _contracts_normalize(key: str) -> Callable[[], Callable[[], Any]]:
+    def setup():
+        from core.contracts import normalize_output
+
+        reply = corpora.agent_replies()[key]
+        return lambda: normalize_output("Coder", reply, "Coder Output", "coder_output.py")
+    return setup
+
+
+def _contracts_json():
+    from core.contracts import _extract_json_obj
+
+    return _each(_extract_json_obj, corpora.malformed_json())
+
+
+def _orchestrator_json():
+    from dashboard.orchestrator import _extract_json_obj
+
+    return _each(_extract_json_obj, corpora.malformed_json())
+
+
+def _director_payload():
+    from dashboard.orchestrator import _extract_director_payload
+
+    return _each(_extract_director_payload, corpora.malformed_json())
+
+
+def _code_blocks():
+    from core.contracts import parse_code_blocks
+
+    text = corpora.coder_reply()
+    return lambda: parse_code_blocks(text)
+
+
+def _scribe_sections():
+    from agents.scribe import _extract_section
+
+    text = corpora.scribe_input(sections=4, paragraph=400)
+    headers = ["Planner", "Researcher", "Coder", "Designer", "QA"]
+    return lambda: [_extract_section(text, h) for h in headers]
+
+
+def _router():
+    from core.router import route
+
+    return _each(route, corpora.GOALS)
+
+
+def _build_subtasks():
+    from dashboard.orchestrator import build_subtasks
+
+    return _each(lambda g: build_subtasks(g, "Team Mode"), corpora.GOALS)
+
+
+CASES: List[Case] = [
+    Case("contracts.normalize_output[coder_text]", _contracts_normalize("coder_text")),
+    Case("contracts.normalize_output[schema_string]", _contracts_normalize("schema_string")),
+    Case("contracts.normalize_output[dict]", _contracts_normalize("dict")),
+    Case("contracts.normalize_output[html]", _contracts_normalize("html")),
+    Case("contracts._extract_json_obj[malformed]", _contracts_json, ops=len(corpora.malformed_json())),
+    Case("orchestrator._extract_json_obj[malformed]", _orchestrator_json, ops=len(corpora.malformed_json())),
+    Case("orchestrator._extract_director_payload", _director_payload, ops=len(corpora.malformed_json())),
+    Case("contracts.parse_code_blocks[coder_text]", _code_blocks),
+    Case("scribe._extract_section[5 headers]", _scribe_sections, ops=5),
+    Case("router.route[goals]", _router, ops=len(corpora.GOALS)),
+    Case("orchestrator.build_subtasks[goals]", _build_subtasks, ops=len(corpora.GOALS)),
+]
+
+
+def measure(case: Case, repeat: int, min_time: float) -> Dict[str, Any]:
+    try:
+        fn = case.setup()
+    except ImportError as e:
+        return {"skipped": f"{type(e).__name__}: {e}"}
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()  # calls per round so one round takes >= 0.2s
+    number = max(1, int(number * min_time / 0.2))
+    rounds = [t / number / case.ops for t in timer.repeat(repeat=repeat, number=number)]
+    rounds.sort()
+    return {
+        "best_us": round(rounds[0] * 1e6, 3),
+        "median_us": round(rounds[len(rounds) // 2] * 1e6, 3),
+        "calls": number * case.ops,
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Names whose best time got slower than baseline by more than `threshold` (0.15 = 15%)."""
+    regressions = []
+    for name, r in results.items():
+        base = (baseline.get("results") or {}).get(name) or {}
+        if "best_us" not in r or not base.get("best_us"):
+            continue
+        ratio = r["best_us"] / base["best_us"]
+        r["vs_baseline"] = round(ratio, 3)
+        if ratio > 1.0 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--filter", default="", help="only cases whose name contains this text")
+    p.add_argument("--repeat", type=int, default=7, help="rounds per case (best is reported)")
+    p.add_argument("--min-time", type=float, default=0.2, help="seconds per round")
+    p.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON path")
+    p.add_argument("--save", action="store_true", help="write results as the new baseline")
+    p.add_argument("--compare", action="store_true", help="compare with the baseline; exit 1 on regression")
+    p.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown vs baseline (0.15 = 15%%)")
+    args = p.parse_args(argv)
+
+    baseline: Optional[Dict[str, Any]] = None
+    if args.compare:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except FileNotFoundError:
+            print(f"no baseline at {args.baseline} (run with --save first)", file=sys.stderr)
+            return 2
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for case in CASES:
+        if args.filter and args.filter not in case.name:
+            continue
+        results[case.name] = measure(case, args.repeat, args.min_time)
+
+    regressions = compare(results, baseline, args.threshold) if baseline else []
+
+    width = max((len(n) for n in results), default=10)
+    for name, r in results.items():
+        if "skipped" in r:
+            print(f"{name:<{width}}  skipped ({r['skipped']})")
+            continue
+        line = f"{name:<{width}}  {r['best_us']:>10.2f} us/call  (median {r['median_us']:.2f})"
+        if "vs_baseline" in r:
+            flag = "  <-- REGRESSION" if name in regressions else ""
+            line += f"  x{r['vs_baseline']:.2f} vs baseline{flag}"
+        print(line)
+
+    if args.save:
+        saved: Dict[str, Any] = {}
+        if os.path.exists(args.baseline):  # --filter updates only the cases it ran
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                saved = json.load(f).get("results", {})
+        saved.update({k: {"best_us": v["best_us"], "median_us": v["median_us"]} for k, v in results.items() if "best_us" in v})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": saved}, f, indent=2)
+        print(f"baseline saved: {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
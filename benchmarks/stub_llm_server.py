@@ -0,0 +1,245 @@
+# benchmarks/stub_llm_server.py
+"""
+Offline stand-in for the OpenAI-compatible backend (Ollama's /v1 API):
+POST {base}/chat/completions (plain JSON or SSE streaming), GET {base}/models,
+GET /stats. No model involved: replies are filler tokens, timed by the options below.
+
+    python benchmarks/stub_llm_server.py --port 11435 --latency lognormal:300,0.5 \\
+        --tokens 120 --tokens-per-sec 80 --error-rate 0.02
+
+Point CONFIG["llm_config"]["base_url"] at http://127.0.0.1:11435/v1.
+
+Latency specs (time to first token, milliseconds):
+    fixed:MS | uniform:LO,HI | normal:MEAN,STD | lognormal:MEDIAN,SIGMA
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, Optional
+
+
+WORDS = (
+    "plan build test ship agent stream token latency cache queue pool worker "
+    "router scheduler batch index trace span metric budget reply draft review"
+).split()
+
+
+@dataclass
+class StubOptions:
+    latency: str = "fixed:50"  # time to first token
+    tokens: int = 60  # reply length (whitespace tokens)
+    tokens_per_sec: float = 0.0  # 0 = the whole reply at once after the first-token latency
+    error_rate: float = 0.0  # share of requests answered with error_status
+    error_status: int = 500
+    seed: Optional[int] = None
+
+
+def parse_latency(spec: str):
+    """'kind:a,b' -> function returning seconds."""
+    kind, _, args = (spec or "fixed:0").partition(":")
+    vals = [float(x) for x in args.split(",") if x.strip()] or [0.0]
+    kind = kind.strip().lower()
+    if kind == "fixed":
+        return lambda rng: vals[0] / 1000.0
+    if kind == "uniform":
+        lo, hi = vals[0], vals[1] if len(vals) > 1 else vals[0]
+        return lambda rng: rng.uniform(lo, hi) / 1000.0
+    if kind == "normal":
+        mean, std = vals[0], vals[1] if len(vals) > 1 else 0.0
+        return lambda rng: max(0.0, rng.gauss(mean, std)) / 1000.0
+    if kind == "lognormal":
+        median, sigma = vals[0], vals[1] if len(vals) > 1 else 0.5
+        mu = math.log(max(median, 1e-6))
+        return lambda rng: rng.lognormvariate(mu, sigma) / 1000.0
+    raise ValueError(f"unknown latency distribution: {spec!r}")
+
+
+class StubBackend:
+    """Request accounting + reply generation shared by the handler threads."""
+
+    def __init__(self, opts: StubOptions):
+        self.opts = opts
+        self.latency = parse_latency(opts.latency)
+        self._rng = random.Random(opts.seed)
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {"requests": 0, "streams": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0}
+
+    def draw(self):
+        with self._lock:
+            return self.latency(self._rng), self._rng.random() < self.opts.error_rate
+
+    def track(self, key: str, delta: int = 1) -> None:
+        with self._lock:
+            self.counters[key] += delta
+            if key == "in_flight":
+                self.counters["max_in_flight"] = max(self.counters["max_in_flight"], self.counters["in_flight"])
+
+    def tokens(self, prompt: str) -> Iterator[str]:
+        seed = sum(map(ord, prompt[-64:]))
+        for i in range(max(1, self.opts.tokens)):
+            yield WORDS[(seed + i) % len(WORDS)] + " "
+
+    def token_delay(self) -> float:
+        return 1.0 / self.opts.tokens_per_sec if self.opts.tokens_per_sec > 0 else 0.0
+
+
+def _handler(backend: StubBackend):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real server
+
+        def log_message(self, fmt: str, *args: Any) -> None:
+            pass
+
+        def _json(self, status: int, body: Dict[str, Any]) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _chunk(self, data: bytes) -> None:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def do_GET(self) -> None:
+            if self.path.rstrip("/").endswith("/models"):
+                self._json(200, {"object": "list", "data": [{"id": "stub", "object": "model"}]})
+            elif self.path.rstrip("/") == "/stats":
+                with backend._lock:
+                    self._json(200, dict(backend.counters))
+            else:
+                self._json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b"{}"
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._json(404, {"error": {"message": "not found"}})
+                return
+            try:
+                req = json.loads(raw or b"{}")
+            except ValueError:
+                self._json(400, {"error": {"message": "invalid JSON"}})
+                return
+
+            backend.track("requests")
+            backend.track("in_flight")
+            try:
+                self._complete(req)
+            finally:
+                backend.track("in_flight", -1)
+
+        def _complete(self, req: Dict[str, Any]) -> None:
+            first, fail = backend.draw()
+            time.sleep(first)
+            if fail:
+                backend.track("errors")
+                self._json(backend.opts.error_status, {"error": {"message": "stub: injected failure"}})
+                return
+
+            messages = req.get("messages") or [{}]
+            prompt = str(messages[-1].get("content", ""))
+            model = req.get("model") or "stub"
+            delay = backend.token_delay()
+
+            if not req.get("stream"):
+                text = "".join(backend.tokens(prompt)).strip()
+                time.sleep(delay * backend.opts.tokens)
+                self._json(200, {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": backend.opts.tokens},
+                })
+                return
+
+            backend.track("streams")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for tok in backend.tokens(prompt):
+                event = {"object": "chat.completion.chunk", "model": model, "choices": [{"index": 0, "delta": {"content": tok}}]}
+                self._chunk(b"data: " + json.dumps(event).encode("utf-8") + b"\n\n")
+                if delay:
+                    time.sleep(delay)
+            self._chunk(b"data: [DONE]\n\n")
+            self._chunk(b"")
+
+    return Handler
+
+
+class StubServer:
+    """ThreadingHTTPServer on a background thread; port=0 picks a free port."""
+
+    def __init__(self, opts: Optional[StubOptions] = None, host: str = "127.0.0.1", port: int = 0):
+        self.backend = StubBackend(opts or StubOptions())
+        self.httpd = ThreadingHTTPServer((host, port), _handler(self.backend))
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="stub-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def add_stub_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--latency", default="fixed:50", help="first-token latency distribution (ms), see module doc")
+    p.add_argument("--tokens", type=int, default=60, help="tokens per reply")
+    p.add_argument("--tokens-per-sec", type=float, default=0.0, help="token rate after the first token (0 = instant)")
+    p.add_argument("--error-rate", type=float, default=0.0, help="share of requests that fail")
+    p.add_argument("--error-status", type=int, default=500)
+    p.add_argument("--seed", type=int, default=None)
+
+
+def options_from_args(args: argparse.Namespace) -> StubOptions:
+    return StubOptions(
+        latency=args.latency,
+        tokens=args.tokens,
+        tokens_per_sec=args.tokens_per_sec,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed,
+    )
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=11435)
+    add_stub_args(p)
+    args = p.parse_args(argv)
+
+    server = StubServer(options_from_args(args), host=args.host, port=args.port)
+    print(f"stub LLM backend on {server.base_url}  (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,5 +7,168 @@ CONFIG = {
         "temperature": 0.3,
         "max_tokens": 300,
         "price": [0.0, 0.0]  # Optional: suppress cost warnings
-    }
+    },
+    # Blocking agent calls run in a thread pool per backend (base_url).
+    # Pool size = max concurrent calls against that backend.
+    "executor": {
+        "max_workers": 4,
+        "backends": {
+            # "http://localhost:11434/v1": 2,
+        },
+    },
+    # Per-agent deadlines, retries with jittered backoff, optional hedged requests.
+    "resilience": {
+        "timeout_sec": 120,
+        "retries": 2,
+        "backoff_base": 0.5,
+        "backoff_max": 8.0,
+        "per_agent": {
+            # "Coder": {"timeout_sec": 180},
+            # "Scribe": {"retries": 0},
+        },
+        "hedge": {
+            "enabled": False,
+            # llm_config overrides for the second backend the duplicate request goes to
+            "llm_config": {
+                # "base_url": "http://other-host:11434/v1",
+            },
+            "after_sec": None,  # None = observed p95 latency of the agent
+            "min_samples": 20,
+        },
+    },
+    # Adaptive pipeline (orchestrator.run_agents): no Director when the router is confident
+    # (simple factual goals, Fast Mode), and an early exit when the first answer of such a
+    # goal passes a cheap string check (Scribe / QA are then cancelled). See ctx["skipped"].
+    "pruning": {
+        "enabled": True,
+        "skip_director": True,
+        "early_exit": True,
+        "min_answer_chars": 20,
+        "max_answer_chars": 2000,
+    },
+    # core.model_router: model per agent call. Rules are tried in order, the first match wins;
+    # no match = the run's model (dashboard selectbox / --model).
+    "model_router": {
+        "enabled": True,
+        # every model named here must be pulled on the backend (ollama pull tinyllama)
+        "policy": [
+            # short factual answers and Researcher tips don't need the run's model
+            {"intent": "simple_factual", "model": "tinyllama:latest"},
+            {"agent": "Researcher", "max_expected_tokens": 300, "model": "tinyllama:latest"},
+            # {"agent": ["Coder"], "model": "phi3:latest", "max_tokens": 800, "fallback_model": "gemma3:latest"},
+        ],
+        # used instead of the chosen model while that one is saturated ("" = never switch)
+        "fallback_model": "tinyllama:latest",
+        "saturation": {
+            "max_in_flight": 4,  # calls in flight on one model
+            "latency_slo_sec": None,  # or: latency EWMA above this
+        },
+        "ewma_alpha": 0.3,
+        "expected_tokens": {
+            # "Coder": 1200,
+        },
+    },
+    # Extra keywords for the intent router (added to core.router.DEFAULT_KEYWORDS).
+    "router": {
+        "keywords": {
+            # "code": ["sql", "regex"],
+            # "ui": ["wireframe"],
+            # "factual": ["how many"],
+        },
+    },
+    # Shared pooled HTTP client (BaseAgent.a_chat / stream_chat), HTTP/1.1 keep-alive.
+    "http": {
+        "max_connections_per_host": 8,
+        "max_keepalive": 8,
+        "keepalive_expiry": 30.0,
+        "connect_timeout": 5.0,
+        "read_timeout": 120.0,
+        "write_timeout": 30.0,
+        "pool_timeout": 60.0,
+    },
+    # Run artifacts: background writer with a bounded queue, atomic temp+rename writes.
+    "storage": {
+        "queue_size": 256,
+        "batch_size": 32,
+        "fsync": "never",  # "never" | "file" | "dir"
+    },
+    # Dashboard: background orchestrator loop shared by all sessions
+    "service": {
+        "poll_sec": 0.5,  # UI refresh interval while a job is running
+        "keep_jobs": 100,  # finished jobs kept for polling
+    },
+    # SQLite index of runs / artifacts used by the dashboard (rebuild: python main.py --reindex)
+    "run_index": {
+        "enabled": True,
+        "path": "projects/runs.sqlite3",
+    },
+    # core.sandbox: warm worker processes for run_python_sandbox
+    "sandbox": {
+        "pool_size": 2,
+        "max_runs_per_worker": 50,  # recycle a worker after this many snippets
+        "max_rss_growth_mb": 64,  # ... or once the worker's own RSS grew this much (Linux)
+        "max_output_kb": 64,  # per stream; longer output is cut with a marker
+        "chunk_kb": 4,
+        "cpu_sec": None,  # RLIMIT_CPU per snippet (None = the timeout)
+        "memory_mb": 256,  # RLIMIT_AS headroom per snippet (Linux)
+        "timeout_sec": 5,
+        # trusted runs (tools.run_python_code): full interpreter in a fresh process
+        "trusted": {
+            "timeout_sec": 15,
+            "memory_mb": 1024,
+        },
+        # run the Coder's python blocks in the sandbox after each run (results in coder_runs.json)
+        "run_coder_blocks": False,
+    },
+    # preview.PreviewManager: `streamlit run` servers for generated apps
+    "preview": {
+        "base_port": 8600,
+        "port_range": 50,
+        "max_previews": 3,  # the least recently used preview is stopped to make room
+        "idle_timeout_sec": 600,
+    },
+    # core.metrics: Prometheus text endpoint (GET http://host:port/metrics); port 0 = collect only
+    "metrics": {
+        "host": "127.0.0.1",
+        "port": 9464,
+        "latency_buckets": [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120],
+    },
+    # core.profiling: per-run cProfile + stack sampler (also: main.py --profile, AIDT_PROFILE=1, dashboard toggle)
+    "profiling": {
+        "enabled": False,
+        "sample_interval_ms": 5,
+        "block_threshold_ms": 100,  # event-loop stalls longer than this are reported as blocking calls
+        "top_n": 25,
+    },
+    # core.similarity: near-duplicate goals (MinHash LSH over normalized goal words, one jsonl per project).
+    # A Team Mode run of the same goal (same words in the same order; case, plurals and a/an/the/please
+    # aside) answered within reuse_max_age_sec returns that run's Scribe output; at warm_start_threshold
+    # a similar goal's output is given to warm_start_agents as a starting point. Bypassed with the response cache.
+    "similarity": {
+        "enabled": True,
+        "dir": "cache/similarity",
+        "reuse_max_age_sec": 7 * 24 * 3600,  # None = any age
+        # Jaccard over goal words + ordered word pairs: a reworded goal ("build a streamlit login page" /
+        # "create a login page in streamlit") scores ~0.55, the same words reversed ~0.43
+        "warm_start_threshold": 0.5,
+        "warm_start_agents": ["Planner", "Scribe"],
+        "max_warm_chars": 2000,
+        "num_perm": 48,
+        "bands": 16,  # 3 rows per band: a pair at J 0.5 is a candidate ~88% of the time, at 0.55 ~95%
+        "max_candidates": 50,  # exact Jaccard checks per lookup
+        # read every project's index in the background when the orchestrator service starts;
+        # otherwise the first run of a project waits for it (seconds at ~100k runs)
+        "preload": True,
+        "synonyms": {
+            # "dashboard": ["panel", "console"],
+        },
+    },
+    # Content-addressed cache of agent replies (memory LRU + on-disk tier).
+    "cache": {
+        "enabled": True,
+        "max_entries": 512,
+        "ttl_sec": 24 * 3600,
+        "disk_dir": "cache/responses",  # None = memory only
+        "disk_max_mb": 64,
+    },
 }
\ No newline at end of file
@@ -0,0 +1,125 @@
+# core/batch.py
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TextIO
+
+from core.stats import summarize
+
+
+RunFn = Callable[..., Awaitable[Any]]
+
+
+@dataclass
+class BatchItem:
+    line: int
+    goal: str
+    project: str = "general"
+    mode: str = "Team Mode"
+    model: str = "phi3:latest"
+
+
+def parse_goals(lines: Iterable[str], defaults: Optional[Dict[str, str]] = None) -> List[BatchItem]:
+    """
+    One goal per line. Either plain text, or a JSON object:
+      {"goal": "...", "project": "...", "mode": "...", "model": "..."}
+    Blank lines and lines starting with '#' are ignored.
+    Missing fields fall back to defaults.
+    """
+    d = defaults or {}
+    items: List[BatchItem] = []
+    for i, raw in enumerate(lines, start=1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+
+        fields: Dict[str, Any] = {"goal": line}
+        if line.startswith("{"):
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"line {i}: invalid JSON ({e})")
+            if not isinstance(obj, dict) or not str(obj.get("goal") or "").strip():
+                raise ValueError(f"line {i}: JSON lines need a non-empty \"goal\"")
+            fields = obj
+
+        items.append(BatchItem(
+            line=i,
+            goal=str(fields["goal"]).strip(),
+            project=str(fields.get("project") or d.get("project") or "general"),
+            mode=str(fields.get("mode") or d.get("mode") or "Team Mode"),
+            model=str(fields.get("model") or d.get("model") or "phi3:latest"),
+        ))
+    return items
+
+
+def _emit(out: TextIO, record: Dict[str, Any]) -> None:
+    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+    out.flush()
+
+
+async def run_batch(
+    items: List[BatchItem],
+    run_fn: RunFn,
+    out: TextIO,
+    concurrency: int = 4,
+    **run_kwargs: Any,
+) -> Dict[str, Any]:
+    """
+    Runs every item through run_fn(goal=, project=, mode=, model=, **run_kwargs)
+    with at most `concurrency` runs in flight.
+    Streams one NDJSON line per finished run (completion order), then a summary line.
+    Returns the summary dict.
+    """
+    sem = asyncio.Semaphore(max(1, int(concurrency)))
+    latencies: List[float] = []
+    counts = {"completed": 0, "failed": 0, "errors": 0}
+    started = time.perf_counter()
+
+    async def one(item: BatchItem) -> None:
+        async with sem:
+            t = time.perf_counter()
+            record: Dict[str, Any] = {"type": "result", **asdict(item)}
+            try:
+                ctx, dirs, logs = await run_fn(
+                    goal=item.goal,
+                    project=item.project,
+                    mode=item.mode,
+                    model=item.model,
+                    **run_kwargs,
+                )
+                record.update({
+                    "run_id": ctx.get("run_id"),
+                    "status": ctx.get("status"),
+                    "runs_dir": str(dirs.get("runs", "")),
+                    "critical_path": ctx.get("critical_path", []),
+                    "errors": ctx.get("errors", {}),
+                    "final_agent": ctx.get("final_agent") or "Scribe",
+                    "final": (logs.get(ctx.get("final_agent") or "Scribe") or {}).get("content", ""),
+                })
+                counts["completed" if ctx.get("status") == "completed" else "failed"] += 1
+            except Exception as e:
+                record.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+                counts["errors"] += 1
+            elapsed = time.perf_counter() - t
+            latencies.append(elapsed)
+            record["seconds"] = round(elapsed, 4)
+            _emit(out, record)
+
+    await asyncio.gather(*(one(it) for it in items))
+
+    wall = time.perf_counter() - started
+    summary: Dict[str, Any] = {
+        "type": "summary",
+        "runs": len(items),
+        **counts,
+        "concurrency": max(1, int(concurrency)),
+        "wall_sec": round(wall, 4),
+        "throughput_per_min": round(len(items) / wall * 60.0, 2) if wall > 0 else 0.0,
+        "latency_sec": summarize(latencies),
+    }
+    _emit(out, summary)
+    return summary
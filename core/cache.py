@@ -0,0 +1,300 @@
+# core/cache.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import CONFIG
+
+
+def make_key(
+    agent: str,
+    system_message: str,
+    task: str,
+    model: str,
+    temperature: Any = None,
+    max_tokens: Any = None,
+) -> str:
+    """
+    Content address of one agent call: sha256 over everything that changes the reply.
+    """
+    payload = json.dumps(
+        {
+            "agent": agent,
+            "system_message": system_message or "",
+            "task": task or "",
+            "model": model or "",
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two tiers:
+      - memory: LRU (OrderedDict), max_entries
+      - disk:   one JSON file per key under disk_dir, LRU by mtime, bounded by disk_max_bytes
+    Both tiers honour ttl_sec. Only JSON-serializable replies (str / dict / list) are cached.
+    On an event loop use aget / aput: the disk tier then runs in a worker thread.
+    The disk LRU order and size are tracked in memory (one directory scan per process),
+    so eviction pops the oldest entries instead of re-scanning the folder.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_sec: float = 24 * 3600,
+        disk_dir: Optional[str] = "cache/responses",
+        disk_max_bytes: int = 64 * 1024 * 1024,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_sec = float(ttl_sec)
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = int(disk_max_bytes)
+
+        self._mem: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None  # lazily measured
+        self._disk_index: "Optional[OrderedDict[str, int]]" = None  # key -> bytes, least recently used first
+        self.counters: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "puts": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                created, value = item
+                if now - created <= self.ttl_sec:
+                    self._mem.move_to_end(key)
+                    if self._disk_index is not None and key in self._disk_index:
+                        self._disk_index.move_to_end(key)
+                    self.counters["hits"] += 1
+                    self.counters["memory_hits"] += 1
+                    return value
+                del self._mem[key]
+                self.counters["expired"] += 1
+
+        found = self._disk_get(key, now)
+        with self._lock:
+            if found is None:
+                self.counters["misses"] += 1
+                return None
+            created, value = found
+            self._mem_put(key, created, value)
+            self.counters["hits"] += 1
+            self.counters["disk_hits"] += 1
+            return value
+
+    def put(self, key: str, value: Any) -> bool:
+        blob = self._mem_store(key, value)
+        if blob is None:
+            return False
+        self._disk_put(key, blob)
+        return True
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """get() for the event loop: a memory hit returns inline, the disk tier runs in a thread."""
+        with self._lock:
+            item = self._mem.get(key)
+            fresh = item is not None and time.time() - item[0] <= self.ttl_sec
+        if fresh or not self.disk_dir:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, value: Any) -> bool:
+        """put() for the event loop: the memory tier is updated inline, the disk write runs in a thread."""
+        blob = self._mem_store(key, value)
+        if blob is None:
+            return False
+        if self.disk_dir:
+            await asyncio.to_thread(self._disk_put, key, blob)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self.counters)
+            out["entries"] = len(self._mem)
+            lookups = out["hits"] + out["misses"]
+            out["hit_rate"] = round(out["hits"] / lookups, 4) if lookups else 0.0
+            out["disk_bytes"] = self._disk_bytes or 0
+            return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+        if self.disk_dir and self.disk_dir.exists():
+            for fp in self.disk_dir.glob("*/*.json"):
+                try:
+                    fp.unlink()
+                except OSError:
+                    pass
+        with self._lock:
+            self._disk_index = OrderedDict()
+            self._disk_bytes = 0
+
+    # ----------------------------
+    # Memory tier
+    # ----------------------------
+    def _mem_store(self, key: str, value: Any) -> Optional[str]:
+        """Puts the value in memory; returns the disk blob (None: not JSON-serializable, not cached)."""
+        created = time.time()
+        try:
+            blob = json.dumps({"created": created, "value": value}, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return None
+        with self._lock:
+            self._mem_put(key, created, value)
+            self.counters["puts"] += 1
+        return blob
+
+    def _mem_put(self, key: str, created: float, value: Any) -> None:
+        self._mem[key] = (created, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    # ----------------------------
+    # Disk tier
+    # ----------------------------
+    def _path(self, key: str) -> Path:
+        assert self.disk_dir is not None
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, Any]]:
+        if not self.disk_dir:
+            return None
+        fp = self._path(key)
+        try:
+            data = json.loads(fp.read_text(encoding="utf-8"))
+            created = float(data["created"])
+        except Exception:
+            return None
+
+        if now - created > self.ttl_sec:
+            self._disk_remove(fp)
+            with self._lock:
+                self.counters["expired"] += 1
+            return None
+
+        try:
+            os.utime(fp, None)  # mtime = last access -> LRU order across restarts
+        except OSError:
+            pass
+        with self._lock:
+            if self._disk_index is not None and key in self._disk_index:
+                self._disk_index.move_to_end(key)
+        return created, data.get("value")
+
+    def _disk_put(self, key: str, blob: str) -> None:
+        if not self.disk_dir:
+            return
+        self._load_disk_index()
+        fp = self._path(key)
+        try:
+            fp.parent.mkdir(parents=True, exist_ok=True)
+            tmp = fp.with_name(f"{fp.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(blob, encoding="utf-8")
+            os.replace(tmp, fp)
+            size = fp.stat().st_size
+        except OSError:
+            return
+
+        with self._lock:
+            index = self._disk_index
+            assert index is not None
+            old = index.pop(key, 0)
+            index[key] = size
+            self._disk_bytes = (self._disk_bytes or 0) + size - old
+            over = self._disk_bytes > self.disk_max_bytes
+        if over:
+            self._evict_disk()
+
+    def _disk_remove(self, fp: Path) -> None:
+        try:
+            fp.unlink()
+        except OSError:
+            return
+        with self._lock:
+            if self._disk_index is not None:
+                size = self._disk_index.pop(fp.stem, 0)
+                self._disk_bytes = max(0, (self._disk_bytes or 0) - size)
+
+    def _load_disk_index(self) -> None:
+        """First disk write of the process: one scan of the folder, ordered by mtime (= last access)."""
+        if self._disk_index is not None:
+            return
+        entries = []
+        if self.disk_dir and self.disk_dir.exists():
+            for fp in self.disk_dir.glob("*/*.json"):
+                try:
+                    st = fp.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, fp.stem, st.st_size))
+        entries.sort()
+        with self._lock:
+            if self._disk_index is None:
+                self._disk_index = OrderedDict((key, size) for _, key, size in entries)
+                self._disk_bytes = sum(size for _, _, size in entries)
+
+    def _evict_disk(self) -> None:
+        """Drop least recently used files until we are under 90% of the budget."""
+        target = int(self.disk_max_bytes * 0.9)
+        victims: List[str] = []
+        with self._lock:
+            index = self._disk_index
+            assert index is not None
+            while index and (self._disk_bytes or 0) > target:
+                key, size = index.popitem(last=False)
+                self._disk_bytes = (self._disk_bytes or 0) - size
+                victims.append(key)
+            self.counters["evictions"] += len(victims)
+        for key in victims:
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+
+_CACHE: Optional[ResponseCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """Process-wide cache from CONFIG["cache"]; None when caching is disabled."""
+    global _CACHE
+    cfg = CONFIG.get("cache", {})
+    if not cfg.get("enabled", True):
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = ResponseCache(
+                max_entries=cfg.get("max_entries", 512),
+                ttl_sec=cfg.get("ttl_sec", 24 * 3600),
+                disk_dir=cfg.get("disk_dir", "cache/responses"),
+                disk_max_bytes=int(cfg.get("disk_max_mb", 64) * 1024 * 1024),
+            )
+        return _CACHE
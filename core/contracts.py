@@ -161,3 +161,19 @@ def normalize_output(agent: str, reply: Any, title: str, default_save_as: str) -
         previewable=(inferred_lang in ("html",)),
         meta={},
     )
+
+
+def parse_code_blocks(text: str):
+    """
+    Returns list of dicts:
+    [{"lang": "python", "code": "...", "raw": "```python ...```"}, ...]
+    plus remaining plain text.
+    """
+    blocks = []
+    pattern = r"```(\w+)?\s*([\s\S]*?)```"
+    for m in re.finditer(pattern, text or ""):
+        lang = (m.group(1) or "").strip() or "text"
+        code = (m.group(2) or "").strip()
+        blocks.append({"lang": lang, "code": code, "raw": m.group(0)})
+    plain = re.sub(pattern, "", text or "").strip()
+    return blocks, plain
@@ -0,0 +1,118 @@
+# core/executor.py
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import CONFIG
+
+
+@dataclass
+class ExecStats:
+    backend: str
+    queue_wait: float = 0.0  # submitted -> picked up by a worker
+    exec_time: float = 0.0   # time spent inside the call
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class AgentExecutor:
+    """
+    Runs blocking (sync) agent calls off the event loop.
+    One bounded thread pool per backend (e.g. per Ollama base_url), so a slow
+    backend cannot starve the others and the pool size is the concurrency limit.
+
+    Threads (not processes): agents hold autogen/openai clients that are not picklable.
+    """
+
+    def __init__(self, max_workers: int = 4, backends: Optional[Dict[str, int]] = None):
+        self.max_workers = max(1, int(max_workers))
+        self.backend_limits: Dict[str, int] = dict(backends or {})
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, float]] = {}
+
+    def _pool(self, backend: str) -> ThreadPoolExecutor:
+        with self._lock:
+            pool = self._pools.get(backend)
+            if pool is None:
+                workers = max(1, int(self.backend_limits.get(backend, self.max_workers)))
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"agent-{len(self._pools)}")
+                self._pools[backend] = pool
+                self._counters[backend] = {
+                    "workers": workers,
+                    "queued": 0,
+                    "running": 0,
+                    "completed": 0,
+                    "queue_wait_total": 0.0,
+                    "exec_total": 0.0,
+                }
+            return pool
+
+    def _bump(self, backend: str, key: str, delta: float) -> None:
+        with self._lock:
+            self._counters[backend][key] += delta
+
+    async def run(self, fn: Callable[..., Any], *args: Any, backend: str = "default") -> Tuple[Any, ExecStats]:
+        """
+        Returns (result, ExecStats). Exceptions from fn propagate to the caller.
+        """
+        pool = self._pool(backend)
+        stats = ExecStats(backend=backend)
+        submitted = time.perf_counter()
+        self._bump(backend, "queued", 1)
+
+        def call() -> Any:
+            started = time.perf_counter()
+            stats.queue_wait = started - submitted
+            self._bump(backend, "queued", -1)
+            self._bump(backend, "running", 1)
+            try:
+                return fn(*args)
+            finally:
+                stats.exec_time = time.perf_counter() - started
+                self._bump(backend, "running", -1)
+                self._bump(backend, "completed", 1)
+                self._bump(backend, "queue_wait_total", stats.queue_wait)
+                self._bump(backend, "exec_total", stats.exec_time)
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(pool, call)
+        return result, stats
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {b: dict(c) for b, c in self._counters.items()}
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
+
+_EXECUTOR: Optional[AgentExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_executor() -> AgentExecutor:
+    """Process-wide executor, sized from CONFIG["executor"]."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            cfg = CONFIG.get("executor", {})
+            _EXECUTOR = AgentExecutor(
+                max_workers=cfg.get("max_workers", 4),
+                backends=cfg.get("backends", {}),
+            )
+        return _EXECUTOR
+
+
+def backend_of(agent_obj: Any) -> str:
+    return str(getattr(agent_obj, "backend", "") or "default")
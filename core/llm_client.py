@@ -0,0 +1,199 @@
+# core/llm_client.py
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from config import CONFIG
+
+
+class PooledLLMClient:
+    """
+    Process-wide pooled async HTTP client for the OpenAI-compatible backend.
+
+    - one httpx.AsyncClient per (event loop, host): keep-alive connections are reused
+      by every agent and every run on that loop
+    - HTTP/1.1 only, max_connections_per_host caps concurrent sockets per host
+    - explicit connect / read / write / pool timeouts
+    - a client is closed on its own loop when that loop shuts down (asyncio.run
+      cancels the leftover tasks before closing the loop, which wakes the closer task)
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 8,
+        max_keepalive: int = 8,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 120.0,
+        write_timeout: float = 30.0,
+        pool_timeout: float = 60.0,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max(1, int(max_connections_per_host)),
+            max_keepalive_connections=max(0, int(max_keepalive)),
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            pool=pool_timeout,
+        )
+        self._clients: Dict[Tuple[int, str], Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient, asyncio.Task]] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host(base_url: str) -> str:
+        parts = urlsplit(base_url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def client(self, base_url: str) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        host = self._host(base_url)
+        key = (id(loop), host)
+        with self._lock:
+            # a loop closed without cancelling its tasks never ran the closer: forget those clients
+            for k in [k for k, (lp, _, _) in self._clients.items() if lp.is_closed()]:
+                del self._clients[k]
+
+            entry = self._clients.get(key)
+            if entry is None:
+                c = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, http1=True, http2=False)
+                entry = (loop, c, loop.create_task(self._close_with_loop(key, c)))
+                self._clients[key] = entry
+            return entry[1]
+
+    async def _close_with_loop(self, key: Tuple[int, str], c: httpx.AsyncClient) -> None:
+        try:
+            await asyncio.Event().wait()  # until cancelled (loop shutdown or aclose)
+        finally:
+            with self._lock:
+                entry = self._clients.get(key)
+                if entry is not None and entry[1] is c:
+                    del self._clients[key]
+            await c.aclose()
+
+    def _track(self, host: str, delta: int) -> None:
+        with self._lock:
+            self._in_flight[host] = self._in_flight.get(host, 0) + delta
+            if delta > 0:
+                self._requests[host] = self._requests.get(host, 0) + 1
+
+    @staticmethod
+    def _headers(api_key: str) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {api_key}"} if api_key else {}
+
+    async def chat(self, base_url: str, payload: Dict[str, Any], api_key: str = "") -> Dict[str, Any]:
+        """POST {base_url}/chat/completions and return the JSON body."""
+        host = self._host(base_url)
+        self._track(host, 1)
+        try:
+            resp = await self.client(base_url).post(
+                base_url.rstrip("/") + "/chat/completions",
+                json={**payload, "stream": False},
+                headers=self._headers(api_key),
+            )
+            resp.raise_for_status()
+            return resp.json()
+        finally:
+            self._track(host, -1)
+
+    async def stream_chat(self, base_url: str, payload: Dict[str, Any], api_key: str = "") -> AsyncIterator[str]:
+        """Same request with stream=True; yields content deltas from the SSE stream."""
+        host = self._host(base_url)
+        self._track(host, 1)
+        try:
+            async with self.client(base_url).stream(
+                "POST",
+                base_url.rstrip("/") + "/chat/completions",
+                json={**payload, "stream": True},
+                headers=self._headers(api_key),
+            ) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        delta = json.loads(data)["choices"][0].get("delta", {})
+                    except (ValueError, KeyError, IndexError):
+                        continue
+                    if delta.get("content"):
+                        yield delta["content"]
+        finally:
+            self._track(host, -1)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Per host: active / idle connections (summed over loops), waiting requests
+        (in flight but not holding a connection yet), total requests.
+        """
+        with self._lock:
+            clients = list(self._clients.items())
+            in_flight = dict(self._in_flight)
+            requests = dict(self._requests)
+
+        out: Dict[str, Dict[str, int]] = {}
+        for (_, host), (_, c, _) in clients:
+            s = out.setdefault(host, {"active": 0, "idle": 0, "waiting": 0, "requests": 0})
+            for conn in _pool_connections(c):
+                try:
+                    s["idle" if conn.is_idle() else "active"] += 1
+                except Exception:
+                    pass
+        for host, n in in_flight.items():
+            s = out.setdefault(host, {"active": 0, "idle": 0, "waiting": 0, "requests": 0})
+            s["waiting"] = max(0, n - s["active"])
+            s["requests"] = requests.get(host, 0)
+        for s in out.values():
+            s["max_connections"] = int(self.limits.max_connections or 0)
+        return out
+
+    async def aclose(self) -> None:
+        """Closes the clients that belong to the running loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            closers = [t for lp, _, t in self._clients.values() if lp is loop]
+        for t in closers:
+            t.cancel()
+        await asyncio.gather(*closers, return_exceptions=True)
+
+
+def _pool_connections(c: httpx.AsyncClient) -> List[Any]:
+    # httpx does not expose pool state publicly; read the httpcore pool best-effort.
+    try:
+        return list(c._transport._pool.connections)  # type: ignore[attr-defined]
+    except Exception:
+        return []
+
+
+_CLIENT: Optional[PooledLLMClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_llm_client() -> PooledLLMClient:
+    """Process-wide pooled client, configured from CONFIG["http"]."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            cfg = CONFIG.get("http", {})
+            _CLIENT = PooledLLMClient(
+                max_connections_per_host=cfg.get("max_connections_per_host", 8),
+                max_keepalive=cfg.get("max_keepalive", 8),
+                keepalive_expiry=cfg.get("keepalive_expiry", 30.0),
+                connect_timeout=cfg.get("connect_timeout", 5.0),
+                read_timeout=cfg.get("read_timeout", 120.0),
+                write_timeout=cfg.get("write_timeout", 30.0),
+                pool_timeout=cfg.get("pool_timeout", 60.0),
+            )
+        return _CLIENT
@@ -0,0 +1,318 @@
+# core/metrics.py
+from __future__ import annotations
+
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import CONFIG
+
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _fmt(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("counters only go up")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """
+    Set/inc/dec gauge, or a callback gauge: `fn` is called at scrape time and
+    returns {label_values_tuple: value} (use () as the key for an unlabelled gauge).
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Tuple[str, ...] = (),
+        fn: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._fn = fn
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        if self._fn is not None:
+            return float(self._collect().get(self._key(labels), 0.0))
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _collect(self) -> Dict[LabelValues, float]:
+        try:
+            return dict(self._fn() or {})
+        except Exception:
+            return {}  # a broken callback must not break the scrape
+
+    def _samples(self) -> List[str]:
+        if self._fn is not None:
+            items = sorted(self._collect().items())
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets)) + (math.inf,)
+        # per label set: [bucket counts (non-cumulative)..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        i = next(i for i, b in enumerate(self.buckets) if value <= b)
+        with self._lock:
+            row = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            row = self._values.get(self._key(labels))
+        return int(row[-1]) if row else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        out = []
+        for key, row in items:
+            cumulative = 0.0
+            for b, n in zip(self.buckets, row):
+                cumulative += n
+                le = 'le="%s"' % _fmt(b)
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {_fmt(cumulative)}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(row[-2])}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, key)} {_fmt(row[-1])}")
+        return out
+
+
+class Registry:
+    """Named metrics; asking again for an existing name returns the same object."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, *args: Any, **kwargs: Any):
+        with self._lock:
+            m = self._metrics.get(name)
+            if m is None:
+                m = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(m, cls):
+                raise ValueError(f"metric {name} already registered as a {m.kind}")
+            return m
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Tuple[str, ...] = (), fn=None) -> Gauge:
+        return self._get(Gauge, name, help, labelnames, fn=fn)
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: List[str] = []
+        for m in metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# ----------------------------
+# Callback gauges (read the live objects at scrape time)
+# ----------------------------
+def _storage_queue_depth() -> Dict[LabelValues, float]:
+    from core.storage import queue_depth
+
+    return {(): float(queue_depth())}
+
+
+def _executor_queued() -> Dict[LabelValues, float]:
+    from core.executor import get_executor
+
+    return {(b,): float(c.get("queued", 0)) for b, c in get_executor().stats().items()}
+
+
+# ----------------------------
+# Application metrics
+# ----------------------------
+_BUCKETS = tuple(CONFIG.get("metrics", {}).get("latency_buckets") or DEFAULT_BUCKETS)
+
+RUNS_STARTED = REGISTRY.counter("aidt_runs_started_total", "Runs started by run_agents.")
+RUNS_FINISHED = REGISTRY.counter("aidt_runs_finished_total", "Runs finished, by final status.", ("status",))
+RUNS_IN_FLIGHT = REGISTRY.gauge("aidt_runs_in_flight", "Runs currently inside run_agents.")
+RUN_DURATION = REGISTRY.histogram("aidt_run_duration_seconds", "Wall time of a run.", buckets=_BUCKETS)
+AGENT_DURATION = REGISTRY.histogram(
+    "aidt_agent_duration_seconds", "Time per agent stage (queue wait + retries + execution).", ("agent", "status"), _BUCKETS
+)
+STAGES_PRUNED = REGISTRY.counter(
+    "aidt_stages_pruned_total",
+    "Stages not run by the adaptive pipeline, by kind (skip_director | early_exit | near_duplicate).",
+    ("agent", "kind"),
+)
+SIMILARITY_LOOKUPS = REGISTRY.counter(
+    "aidt_similarity_lookups_total", "Near-duplicate goal lookups, by result (reuse | warm_start | miss).", ("result",)
+)
+CACHE_LOOKUPS = REGISTRY.counter("aidt_cache_lookups_total", "Response cache lookups, by result (hit | miss).", ("result",))
+SANDBOX_EXECUTIONS = REGISTRY.counter(
+    "aidt_sandbox_executions_total", "Sandbox executions, by mode and status (ok | err | timeout | unsafe).", ("mode", "status")
+)
+SANDBOX_DURATION = REGISTRY.histogram("aidt_sandbox_duration_seconds", "Wall time of a sandbox execution.", ("mode",), _BUCKETS)
+ARTIFACT_WRITES = REGISTRY.counter("aidt_artifact_writes_total", "Agent outputs saved to run folders.")
+ARTIFACT_BYTES = REGISTRY.counter("aidt_artifact_bytes_total", "Bytes of agent outputs saved to run folders.")
+STORAGE_QUEUE_DEPTH = REGISTRY.gauge("aidt_storage_queue_depth", "Artifact writes waiting in the writer queues.", fn=_storage_queue_depth)
+EXECUTOR_QUEUED = REGISTRY.gauge(
+    "aidt_executor_queued", "Sync agent calls waiting for a thread, by backend.", ("backend",), fn=_executor_queued
+)
+
+
+# ----------------------------
+# HTTP endpoint
+# ----------------------------
+def _handler(registry: Registry):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt: str, *args: Any) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0].rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            data = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+class MetricsServer:
+    """GET /metrics on a daemon thread; port=0 picks a free port."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9464, registry: Optional[Registry] = None):
+        self.httpd = ThreadingHTTPServer((host, port), _handler(registry or REGISTRY))
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+_SERVER: Optional[MetricsServer] = None
+_SERVER_LOCK = threading.Lock()
+
+
+def start_metrics_server(host: Optional[str] = None, port: Optional[int] = None) -> Optional[MetricsServer]:
+    """
+    Process-wide endpoint (CONFIG["metrics"] host/port unless given); started once.
+    Returns None when the port is 0 / disabled or already taken by another process.
+    """
+    global _SERVER
+    cfg = CONFIG.get("metrics", {})
+    host = host or cfg.get("host", "127.0.0.1")
+    port = int(cfg.get("port", 0) if port is None else port)
+    with _SERVER_LOCK:
+        if _SERVER is None and port > 0:
+            try:
+                _SERVER = MetricsServer(host, port)
+            except OSError:
+                return None
+        return _SERVER
@@ -0,0 +1,175 @@
+# core/model_router.py
+from __future__ import annotations
+
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from config import CONFIG
+from core.router import Intents
+
+
+# rough reply length per agent (tokens); simple factual goals need about half
+EXPECTED_TOKENS = {
+    "Director": 300,
+    "Planner": 400,
+    "Researcher": 250,
+    "Coder": 800,
+    "Designer": 400,
+    "Scribe": 600,
+    "QA": 300,
+}
+
+
+@dataclass
+class ModelChoice:
+    model: str
+    reason: str  # "default" | "policy[i]" | "fastest of policy[i]" ... + " -> fallback (saturated)"
+    expected_tokens: int = 0
+    fallback_from: str = ""
+    max_tokens: Optional[int] = None  # per-call override from the matching rule
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if v not in ("", None)}
+
+
+@dataclass
+class _ModelStats:
+    in_flight: int = 0
+    calls: int = 0
+    errors: int = 0
+    ewma_sec: Optional[float] = None
+
+
+def _intent_names(intents: Optional[Intents]) -> List[str]:
+    if intents is None:
+        return []
+    names = [n for n in ("code", "ui", "factual") if getattr(intents, n)]
+    if intents.simple_factual:
+        names.append("simple_factual")
+    return names
+
+
+class ModelRouter:
+    """
+    Picks the model of every agent call:
+      1. the first CONFIG["model_router"]["policy"] rule that matches the agent,
+         the goal's intents and the expected reply length; a rule with "models"
+         takes the one with the lowest observed latency (unobserved models first);
+      2. otherwise the run's model;
+      3. if that model is saturated (too many calls in flight, or its latency EWMA
+         over latency_slo_sec), the fallback model when that one is not.
+    Latency is fed back per model by begin()/end() around every call.
+    """
+
+    def __init__(self, cfg: Optional[Dict[str, Any]] = None):
+        self.cfg = dict(cfg if cfg is not None else CONFIG.get("model_router", {}))
+        self.alpha = float(self.cfg.get("ewma_alpha", 0.3))
+        self._stats: Dict[str, _ModelStats] = {}
+        self._lock = threading.Lock()
+
+    # ---- observations ----
+    def begin(self, model: str) -> None:
+        with self._lock:
+            self._stats.setdefault(model, _ModelStats()).in_flight += 1
+
+    def end(self, model: str, latency_sec: Optional[float], sample: bool = True) -> None:
+        """
+        latency_sec=None: the call failed (counted, latency not sampled).
+        sample=False: it was answered by someone else (a hedge on another backend):
+        counted, but its latency says nothing about this model.
+        """
+        with self._lock:
+            s = self._stats.setdefault(model, _ModelStats())
+            s.in_flight = max(0, s.in_flight - 1)
+            s.calls += 1
+            if latency_sec is None:
+                s.errors += 1
+            elif not sample:
+                return
+            elif s.ewma_sec is None:
+                s.ewma_sec = float(latency_sec)
+            else:
+                s.ewma_sec = self.alpha * float(latency_sec) + (1 - self.alpha) * s.ewma_sec
+
+    def latency(self, model: str) -> Optional[float]:
+        with self._lock:
+            s = self._stats.get(model)
+            return s.ewma_sec if s else None
+
+    def saturated(self, model: str) -> bool:
+        sat = self.cfg.get("saturation", {}) or {}
+        max_in_flight = sat.get("max_in_flight")
+        slo = sat.get("latency_slo_sec")
+        with self._lock:
+            s = self._stats.get(model) or _ModelStats()
+            if max_in_flight and s.in_flight >= int(max_in_flight):
+                return True
+            return bool(slo and s.ewma_sec is not None and s.ewma_sec > float(slo))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {m: asdict(s) for m, s in self._stats.items()}
+
+    # ---- decision ----
+    def expected_tokens(self, agent: str, intents: Optional[Intents]) -> int:
+        n = int((self.cfg.get("expected_tokens") or {}).get(agent, EXPECTED_TOKENS.get(agent, 400)))
+        return n // 2 if intents is not None and intents.simple_factual else n
+
+    def _matches(self, rule: Dict[str, Any], agent: str, intents: List[str], expected: int) -> bool:
+        agents = rule.get("agent")
+        if agents and agent not in ([agents] if isinstance(agents, str) else agents):
+            return False
+        wanted = rule.get("intent")
+        if wanted and not set([wanted] if isinstance(wanted, str) else wanted) & set(intents):
+            return False
+        if rule.get("max_expected_tokens") is not None and expected > int(rule["max_expected_tokens"]):
+            return False
+        if rule.get("min_expected_tokens") is not None and expected < int(rule["min_expected_tokens"]):
+            return False
+        return True
+
+    def _fastest(self, models: List[str]) -> str:
+        # not saturated first, then unobserved (so each one gets sampled), then lowest EWMA
+        return min(models, key=lambda m: (self.saturated(m), self.latency(m) is not None, self.latency(m) or 0.0))
+
+    def choose(self, agent: str, default_model: str, intents: Optional[Intents] = None) -> ModelChoice:
+        expected = self.expected_tokens(agent, intents)
+        if not self.cfg.get("enabled", True):
+            return ModelChoice(default_model, "default", expected)
+
+        choice = ModelChoice(default_model, "default", expected)
+        fallback = str(self.cfg.get("fallback_model") or "")
+        names = _intent_names(intents)
+        for i, rule in enumerate(self.cfg.get("policy") or []):
+            if not self._matches(rule, agent, names, expected):
+                continue
+            models = [m for m in (rule.get("models") or [rule.get("model")]) if m]
+            if not models:
+                continue
+            if len(models) == 1:
+                choice = ModelChoice(models[0], f"policy[{i}]", expected)
+            else:
+                choice = ModelChoice(self._fastest(models), f"fastest of policy[{i}]", expected)
+            choice.max_tokens = rule.get("max_tokens")
+            fallback = str(rule.get("fallback_model") or fallback)
+            break
+
+        if fallback and fallback != choice.model and self.saturated(choice.model) and not self.saturated(fallback):
+            choice.fallback_from = choice.model
+            choice.model = fallback
+            choice.reason += " -> fallback (saturated)"
+        return choice
+
+
+_ROUTER: Optional[ModelRouter] = None
+_ROUTER_LOCK = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Process-wide router (latency EWMAs are shared by every run), from CONFIG["model_router"]."""
+    global _ROUTER
+    with _ROUTER_LOCK:
+        if _ROUTER is None:
+            _ROUTER = ModelRouter()
+        return _ROUTER
@@ -0,0 +1,177 @@
+# core/profiling.py
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import CONFIG
+from core.storage import atomic_write_text
+
+
+ENV_VAR = "AIDT_PROFILE"
+
+# cProfile hooks the whole interpreter on 3.12+ and the loop thread before that:
+# one profiled run at a time, a second one is recorded as skipped.
+_PROFILE_LOCK = threading.Lock()
+
+
+def profiling_enabled(flag: Optional[bool] = None) -> bool:
+    """Explicit flag (CLI / dashboard) wins, then AIDT_PROFILE=1, then CONFIG["profiling"]["enabled"]."""
+    if flag is not None:
+        return bool(flag)
+    env = os.environ.get(ENV_VAR, "").strip().lower()
+    if env:
+        return env not in ("0", "false", "no", "off")
+    return bool(CONFIG.get("profiling", {}).get("enabled", False))
+
+
+def _frame_label(frame) -> str:
+    co = frame.f_code
+    return f"{os.path.basename(co.co_filename)}:{co.co_name}".replace(";", ":")
+
+
+def _stack(frame) -> List[str]:
+    """Root-first frame labels."""
+    out = []
+    while frame is not None:
+        out.append(_frame_label(frame))
+        frame = frame.f_back
+    out.reverse()
+    return out
+
+
+class RunProfiler:
+    """
+    Profiles one run_agents call:
+      - cProfile (deterministic) on the event-loop thread -> profile.pstats
+      - a sampler thread that records the stacks of every thread every
+        sample_interval_ms -> profile.collapsed (flamegraph.pl / speedscope input)
+      - a loop heartbeat: when the loop misses it by more than block_threshold_ms
+        the sampler records the loop thread's stack as a blocking call.
+    Other work on the same loop / threads while the run is profiled shows up too.
+    """
+
+    def __init__(self, runs_dir: Path, sample_interval_ms: Optional[float] = None,
+                 block_threshold_ms: Optional[float] = None, top_n: Optional[int] = None):
+        cfg = CONFIG.get("profiling", {})
+        self.runs_dir = Path(runs_dir)
+        self.interval = float(sample_interval_ms or cfg.get("sample_interval_ms", 5)) / 1000.0
+        self.block_sec = float(block_threshold_ms or cfg.get("block_threshold_ms", 100)) / 1000.0
+        self.top_n = int(top_n or cfg.get("top_n", 25))
+        self.samples: Counter = Counter()
+        self.blocking: List[Dict[str, Any]] = []
+        self._profiler = cProfile.Profile()
+        self._beat = 0.0
+        self._beat_interval = min(0.01, self.block_sec / 4)
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread = 0
+        self._started = 0.0
+        self._wall = 0.0
+        self._active = False
+
+    def start(self) -> bool:
+        """Call on the event loop. False if another run is being profiled."""
+        if not _PROFILE_LOCK.acquire(blocking=False):
+            return False
+        self._active = True
+        try:
+            self._loop_thread = threading.get_ident()
+            self._started = self._beat = time.perf_counter()
+            self._heartbeat = asyncio.ensure_future(self._beat_loop())
+            self._sampler = threading.Thread(target=self._sample_loop, name="run-profiler", daemon=True)
+            self._sampler.start()
+            self._profiler.enable()  # ValueError when another profiler / debugger holds the hook
+        except BaseException:
+            self.stop()  # releases the lock
+            raise
+        return True
+
+    def stop(self) -> None:
+        """Call on the event loop (the thread that called start)."""
+        if not self._active:
+            return
+        self._active = False
+        try:
+            self._profiler.disable()
+            self._wall = time.perf_counter() - self._started
+            self._stop.set()
+            if self._heartbeat is not None:
+                self._heartbeat.cancel()
+            if self._sampler is not None:
+                self._sampler.join(timeout=1.0)
+        finally:
+            _PROFILE_LOCK.release()
+
+    async def _beat_loop(self) -> None:
+        while True:
+            self._beat = time.perf_counter()
+            await asyncio.sleep(self._beat_interval)
+
+    def _sample_loop(self) -> None:
+        me = threading.get_ident()
+        names = {}
+        episode: Optional[Dict[str, Any]] = None
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for tid, frame in frames.items():
+                if tid == me:
+                    continue
+                if tid not in names:
+                    names.update({t.ident: t.name for t in threading.enumerate()})
+                    names.setdefault(tid, str(tid))
+                self.samples[";".join([names[tid]] + _stack(frame))] += 1
+
+            late = time.perf_counter() - self._beat - self._beat_interval
+            if late > self.block_sec:
+                if episode is None:
+                    stack = _stack(frames.get(self._loop_thread))
+                    episode = {
+                        "at": round(self._beat - self._started, 4),
+                        "where": stack[-1] if stack else "",
+                        "stack": stack[-8:],
+                    }
+                    if len(self.blocking) < 50:
+                        self.blocking.append(episode)
+                episode["ms"] = round(late * 1000, 1)
+            else:
+                episode = None
+
+    def top(self) -> List[Dict[str, Any]]:
+        """Hottest functions by own time."""
+        stats = pstats.Stats(self._profiler)
+        rows = []
+        for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():  # type: ignore[attr-defined]
+            rows.append({
+                "function": f"{os.path.basename(filename)}:{line}({func})" if line else func,
+                "calls": nc,
+                "tottime": round(tt, 6),
+                "cumtime": round(ct, 6),
+            })
+        rows.sort(key=lambda r: -r["tottime"])
+        return rows[: self.top_n]
+
+    def save(self) -> Dict[str, Any]:
+        """Writes profile.pstats + profile.collapsed into the run folder; returns the summary for run_context.json."""
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        self._profiler.dump_stats(str(self.runs_dir / "profile.pstats"))
+        collapsed = "".join(f"{stack} {n}\n" for stack, n in self.samples.most_common())
+        atomic_write_text(self.runs_dir / "profile.collapsed", collapsed)
+        return {
+            "pstats": "profile.pstats",
+            "collapsed": "profile.collapsed",
+            "wall_sec": round(self._wall, 4),
+            "samples": sum(self.samples.values()),
+            "block_threshold_ms": round(self.block_sec * 1000, 1),
+            "blocking": self.blocking,
+            "top": self.top(),
+        }
@@ -0,0 +1,164 @@
+# core/resilience.py
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from config import CONFIG
+from core.stats import percentile
+
+
+class AgentTimeoutError(Exception):
+    pass
+
+
+@dataclass
+class CallPolicy:
+    timeout_sec: float = 120.0
+    retries: int = 2            # extra attempts after the first one
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    hedge: bool = False
+    hedge_after_sec: Optional[float] = None  # fixed delay; otherwise observed p95
+    hedge_min_samples: int = 20
+
+
+def policy_for(agent_name: str) -> CallPolicy:
+    """
+    CONFIG["resilience"] defaults, overridden by CONFIG["resilience"]["per_agent"][agent_name].
+    """
+    cfg = dict(CONFIG.get("resilience", {}))
+    per_agent = cfg.pop("per_agent", {}) or {}
+    hedge = dict(cfg.pop("hedge", {}) or {})
+    cfg.update(per_agent.get(agent_name, {}) or {})
+
+    return CallPolicy(
+        timeout_sec=float(cfg.get("timeout_sec", 120.0)),
+        retries=max(0, int(cfg.get("retries", 2))),
+        backoff_base=float(cfg.get("backoff_base", 0.5)),
+        backoff_max=float(cfg.get("backoff_max", 8.0)),
+        hedge=bool(cfg.get("hedge_enabled", hedge.get("enabled", False))),
+        hedge_after_sec=hedge.get("after_sec"),
+        hedge_min_samples=int(hedge.get("min_samples", 20)),
+    )
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full jitter: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0.0, min(cap, base * (2 ** attempt)))
+
+
+class LatencyTracker:
+    """Rolling per-key latency window (seconds), used for p95-based hedging."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._data: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            self._data.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def count(self, key: str) -> int:
+        with self._lock:
+            return len(self._data.get(key, ()))
+
+    def p(self, key: str, pct: float) -> Optional[float]:
+        with self._lock:
+            values = list(self._data.get(key, ()))
+        return percentile(values, pct)
+
+
+LATENCY = LatencyTracker()
+
+
+async def _first_of(
+    primary: Awaitable[Any],
+    hedge_factory: Optional[Callable[[], Awaitable[Any]]],
+    hedge_after: Optional[float],
+    info: Dict[str, Any],
+) -> Any:
+    """
+    Runs primary; if it is still running after hedge_after seconds, also starts the hedge.
+    First successful result wins, the loser is cancelled.
+    """
+    p_task = asyncio.ensure_future(primary)
+    tasks = {p_task: "primary"}
+    try:
+        if hedge_factory is None or hedge_after is None:
+            return await p_task
+
+        done, _ = await asyncio.wait({p_task}, timeout=max(0.0, hedge_after))
+        if done:
+            return p_task.result()
+
+        info["hedged"] = True
+        tasks[asyncio.ensure_future(hedge_factory())] = "hedge"
+        pending = set(tasks)
+        last_error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                if t.exception() is None:
+                    info["winner"] = tasks[t]
+                    return t.result()
+                last_error = t.exception()
+        assert last_error is not None
+        raise last_error
+    finally:
+        for t in tasks:
+            if not t.done():
+                t.cancel()
+
+
+async def call_with_policy(
+    key: str,
+    call: Callable[[], Awaitable[Any]],
+    policy: CallPolicy,
+    hedge_call: Optional[Callable[[], Awaitable[Any]]] = None,
+    tracker: LatencyTracker = LATENCY,
+) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Deadline per attempt + retries with jittered backoff + optional hedging.
+    Returns (result, info) where info = {"attempts", "hedged", "winner", "errors"}.
+    Raises the last error when every attempt failed.
+
+    Note: a timed-out sync call keeps running in its worker thread; we only stop waiting for it.
+    """
+    loop = asyncio.get_running_loop()
+    info: Dict[str, Any] = {"attempts": 0, "hedged": False, "winner": "primary", "errors": []}
+
+    hedge_after: Optional[float] = None
+    if policy.hedge and hedge_call is not None:
+        if policy.hedge_after_sec is not None:
+            hedge_after = float(policy.hedge_after_sec)
+        elif tracker.count(key) >= policy.hedge_min_samples:
+            hedge_after = tracker.p(key, 95)
+
+    last_error: Optional[BaseException] = None
+    for attempt in range(policy.retries + 1):
+        info.update(attempts=attempt + 1, hedged=False, winner="primary")  # describe the attempt that answered
+        started = loop.time()
+        try:
+            result = await asyncio.wait_for(
+                _first_of(call(), hedge_call, hedge_after, info),
+                timeout=policy.timeout_sec,
+            )
+            tracker.record(key, loop.time() - started)
+            return result, info
+        except asyncio.TimeoutError:
+            last_error = AgentTimeoutError(f"{key} timed out after {policy.timeout_sec:g}s")
+        except Exception as e:
+            last_error = e
+        info["errors"].append(f"{type(last_error).__name__}: {last_error}")
+
+        if attempt < policy.retries:
+            await asyncio.sleep(backoff_delay(attempt, policy.backoff_base, policy.backoff_max))
+
+    assert last_error is not None
+    raise last_error
@@ -0,0 +1,158 @@
+# core/router.py
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from config import CONFIG
+
+
+DEFAULT_KEYWORDS: Dict[str, List[str]] = {
+    "code": [
+        "code", "script", "python", "streamlit", "html", "css", "javascript", "js",
+        "react", "api", "bug", "debug", "error", "fix", "build", "implement", "template",
+    ],
+    "ui": ["ui", "ux", "design", "layout", "page", "screen", "dashboard", "frontend"],
+    "factual": [
+        "days of week", "day of week",
+        "capital of", "meaning of", "define", "definition",
+        "what is", "who is", "list of", "tell me",
+    ],
+}
+
+
+@dataclass
+class Intents:
+    code: bool = False
+    ui: bool = False
+    factual: bool = False  # a factual trigger phrase is present
+    words: int = 0
+    matches: Tuple[Tuple[str, str], ...] = ()  # (intent, keyword)
+
+    @property
+    def simple_factual(self) -> bool:
+        """Same rules as the original _is_simple_factual()."""
+        if self.words == 0:
+            return True
+        if self.words <= 6 and not self.code and not self.ui:
+            return True
+        return self.factual and not self.code
+
+
+# inflections a single-word keyword may carry ("build" -> "building", "debug" ->
+# "debugging" with the doubled consonant, "implement" -> "implementation", "fix" ->
+# "fixes"); anything else ends the match, so "react" misses "reaction", "fix" misses
+# "fixture" and "page" misses "pageant". Phrases only take a plural s / es.
+SUFFIXES = r"(?:e?s|e?d|[bdglmnprt]?(?:ing|ed|ers?)|ations?|ments?)"
+
+_SPACE = re.compile(r"\s+")
+
+
+def _norm(keyword: str) -> str:
+    return " ".join(str(keyword).lower().split())
+
+
+class IntentRouter:
+    """
+    Classifies a goal into every intent in ONE pass over the text: all keywords of
+    all intents are one compiled alternation anchored at word starts (\\b), run once
+    with findall over the lowercased goal.
+
+    Matching rules:
+      - phrases: whole words, plural s / es allowed
+      - single words: whole words, optionally inflected with one of SUFFIXES
+        ("building", "debugging", "implementation"); never a bare prefix
+      - at each word start the longest keyword wins
+    Differences from the legacy substring scan: "ui" no longer fires inside "build"
+    or "quicksort", "api" inside "capital", "js" inside "json"; a keyword only matches
+    at the start of a word ("bug" no longer matches inside "debugging", hence the
+    explicit "debug" keyword).
+    """
+
+    def __init__(self, keywords: Optional[Dict[str, Iterable[str]]] = None):
+        kw = keywords if keywords is not None else DEFAULT_KEYWORDS
+        table: Dict[str, Set[str]] = {}
+        for intent, items in kw.items():
+            for item in items:
+                k = _norm(item)
+                if k:
+                    table.setdefault(k, set()).add(intent)
+        self.keywords: Dict[str, FrozenSet[str]] = {k: frozenset(v) for k, v in table.items()}
+        self.intents: FrozenSet[str] = frozenset(kw)
+
+        def alt(words: List[str]) -> str:
+            # longest first: the regex takes the first alternative that matches
+            words = sorted(words, key=len, reverse=True)
+            return "|".join(r"\s+".join(map(re.escape, w.split())) for w in words)
+
+        phrases = [k for k in self.keywords if " " in k]
+        words = [k for k in self.keywords if " " not in k]
+        # never-matching placeholders keep the three groups of findall
+        parts = [
+            r"(" + alt(phrases) + r")(?:e?s)?\b" if phrases else r"()(?!)",
+            r"(" + alt(words) + r")(" + SUFFIXES + r"?)\b" if words else r"()()(?!)",
+        ]
+        self.pattern = re.compile(r"\b(?:" + "|".join(parts) + r")")
+
+    def classify(self, goal: str) -> Intents:
+        g = (goal or "").lower()
+        found: Set[str] = set()
+        matches: List[Tuple[str, str]] = []
+        for phrase, word, suffix in self.pattern.findall(g):
+            k = word or phrase
+            intents = self.keywords.get(k)
+            if intents is None:
+                k = _SPACE.sub(" ", k)  # phrase matched across several spaces / newlines
+                intents = self.keywords.get(k, frozenset())
+            for intent in intents:
+                found.add(intent)
+                matches.append((intent, k + "*" if suffix else k))
+
+        return Intents(
+            code="code" in found,
+            ui="ui" in found,
+            factual="factual" in found,
+            words=len(g.split()),
+            matches=tuple(matches),
+        )
+
+
+_ROUTER: Optional[IntentRouter] = None
+_ROUTER_SRC: object = None  # the CONFIG["router"]["keywords"] object _ROUTER was built from
+_ROUTER_LOCK = threading.Lock()
+
+
+def get_router() -> IntentRouter:
+    """
+    Default keywords + extra keyword sets from CONFIG["router"]["keywords"]
+    ({"code": [...], "ui": [...], "factual": [...]}). Cached on the identity of that
+    dict: assign a new dict to change the keywords at runtime (or call reset_router()
+    after editing it in place).
+    """
+    global _ROUTER, _ROUTER_SRC
+    extra = (CONFIG.get("router") or {}).get("keywords")
+    router = _ROUTER
+    if router is not None and extra is _ROUTER_SRC:
+        return router
+    with _ROUTER_LOCK:
+        if _ROUTER is None or extra is not _ROUTER_SRC:
+            merged: Dict[str, List[str]] = {k: list(v) for k, v in DEFAULT_KEYWORDS.items()}
+            for intent, words in (extra or {}).items():
+                merged.setdefault(intent, []).extend(words)
+            _ROUTER = IntentRouter(merged)
+            _ROUTER_SRC = extra
+        return _ROUTER
+
+
+def reset_router() -> None:
+    """Drops the cached router (next route() rebuilds it from CONFIG)."""
+    global _ROUTER, _ROUTER_SRC
+    with _ROUTER_LOCK:
+        _ROUTER = None
+        _ROUTER_SRC = None
+
+
+def route(goal: str) -> Intents:
+    return get_router().classify(goal)
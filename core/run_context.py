@@ -1,10 +1,11 @@
 # core/run_context.py
 from __future__ import annotations
 
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
 import re
-from typing import List, Literal, Dict, Any
+import threading
+from typing import List, Literal, Dict, Any, Set
 
 
 Status = Literal["running", "completed", "failed"]
@@ -18,9 +19,26 @@ def slugify(name: str) -> str:
     return name or "default"
 
 
+# ids handed out during the current second (older seconds cannot collide any more)
+_ISSUED: Set[str] = set()
+_ISSUED_LOCK = threading.Lock()
+
+
 def new_run_id(now: datetime | None = None) -> str:
+    """
+    Timestamp id; concurrent runs in the same second get a -2, -3, ... suffix.
+    """
     now = now or datetime.now()
-    return now.strftime("%Y-%m-%d_%H-%M-%S")
+    base = now.strftime("%Y-%m-%d_%H-%M-%S")
+    with _ISSUED_LOCK:
+        if not any(r.startswith(base) for r in _ISSUED):
+            _ISSUED.clear()
+        rid, n = base, 1
+        while rid in _ISSUED:
+            n += 1
+            rid = f"{base}-{n}"
+        _ISSUED.add(rid)
+    return rid
 
 
 @dataclass
@@ -33,6 +51,28 @@ class RunContext:
     agents: List[str]
     start_time: str
     status: Status = "running"
+    # {agent: {"start", "end", "duration", "status"}} in seconds since run start
+    timings: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # chain of agents that bounded the wall-clock time of the run
+    critical_path: List[str] = field(default_factory=list)
+    # {agent: "ErrorType: message"} for agents that failed after retries / were skipped
+    errors: Dict[str, str] = field(default_factory=dict)
+    # model router decision per agent: {"model", "reason", "expected_tokens", "latency_sec", ...}
+    models: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # stages pruned by the adaptive pipeline: {agent: {"kind", "reason", "est_saved_sec"}}
+    skipped: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # agent whose output is the run's answer: "Scribe", or the agent that answered on an early exit
+    final_agent: str = ""
+    # near-duplicate previous run: {"run_id", "goal", "similarity", "action": "reuse" | "warm_start"}
+    similar: Dict[str, Any] = field(default_factory=dict)
+    # response cache usage for this run: {"hits", "misses", "bypass"}
+    cache: Dict[str, Any] = field(default_factory=dict)
+    # run_id of the in-flight run this request attached to (singleflight), "" if it ran itself
+    coalesced_with: str = ""
+    # span digest (counts / totals per kind, slowest spans); full timeline in trace.json
+    trace: Dict[str, Any] = field(default_factory=dict)
+    # opt-in profiling digest (top functions, blocking calls); files in the run folder
+    profile: Dict[str, Any] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
@@ -0,0 +1,267 @@
+# core/run_index.py
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import CONFIG
+from core.run_context import slugify
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    project     TEXT NOT NULL,
+    run_id      TEXT NOT NULL,
+    goal        TEXT NOT NULL DEFAULT '',
+    mode        TEXT NOT NULL DEFAULT '',
+    model       TEXT NOT NULL DEFAULT '',
+    status      TEXT NOT NULL DEFAULT '',
+    start_time  TEXT NOT NULL DEFAULT '',
+    wall_sec    REAL,
+    timings     TEXT NOT NULL DEFAULT '{}',
+    runs_dir    TEXT NOT NULL DEFAULT '',
+    coalesced_with TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (project, run_id)
+);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (start_time DESC, run_id DESC);
+CREATE INDEX IF NOT EXISTS runs_by_project ON runs (project, start_time DESC, run_id DESC);
+
+-- project = '' / run_id = '' for legacy memory/scribe_log_*.md files
+CREATE TABLE IF NOT EXISTS artifacts (
+    project  TEXT NOT NULL,
+    run_id   TEXT NOT NULL,
+    name     TEXT NOT NULL,
+    path     TEXT NOT NULL,
+    bytes    INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (project, run_id, name)
+);
+CREATE INDEX IF NOT EXISTS artifacts_by_name ON artifacts (name, project, run_id DESC);
+"""
+
+_RUN_COLUMNS = (
+    "project", "run_id", "goal", "mode", "model", "status",
+    "start_time", "wall_sec", "timings", "runs_dir", "coalesced_with",
+)
+
+
+def _scan_artifacts(runs_dir: Path) -> List[Tuple[str, str, int]]:
+    """(name, path, bytes) of the files in a run folder (temp files skipped)."""
+    out: List[Tuple[str, str, int]] = []
+    try:
+        with os.scandir(runs_dir) as it:
+            for e in it:
+                if e.name.startswith(".") or not e.is_file():
+                    continue
+                out.append((e.name, os.path.join(str(runs_dir), e.name), e.stat().st_size))
+    except OSError:
+        pass
+    return out
+
+
+def _legacy_logs(legacy_dir: Path, since: str = "") -> List[Tuple[str, str, int]]:
+    """
+    memory/scribe_log_{%Y-%m-%d_%H-%M-%S}.md files (ScribeAgent still writes one per run);
+    since="2026-01-31_12-00-00" keeps only the ones named at or after that time (no stat for the rest).
+    """
+    out: List[Tuple[str, str, int]] = []
+    floor = f"scribe_log_{since}" if since else ""
+    try:
+        with os.scandir(legacy_dir) as it:
+            for e in it:
+                n = e.name
+                if not (n.startswith("scribe_log_") and n.endswith(".md")) or n < floor:
+                    continue
+                try:
+                    out.append((n, os.path.join(str(legacy_dir), n), e.stat().st_size))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return out
+
+
+def _wall_sec(timings: Dict[str, Any]) -> Optional[float]:
+    ends = [t.get("end") for t in (timings or {}).values() if isinstance(t, dict) and t.get("end") is not None]
+    return round(max(ends), 3) if ends else None
+
+
+class RunIndex:
+    """
+    Embedded SQLite index of runs and their artifacts, so the dashboard can list
+    recent runs / scribe logs with one query instead of globbing projects/.
+
+    The index is derived data: run_context.json stays the source of truth and
+    rebuild() recreates everything from it.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=10.0)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+    def _upsert(self, ctx: Dict[str, Any], runs_dir: Path) -> None:
+        timings = ctx.get("timings") or {}
+        row = (
+            slugify(ctx.get("project", "")),  # keyed like the projects/ folders
+            ctx.get("run_id", ""),
+            ctx.get("goal", ""),
+            ctx.get("mode", ""),
+            ctx.get("model", ""),
+            ctx.get("status", ""),
+            ctx.get("start_time", ""),
+            _wall_sec(timings),
+            json.dumps(timings, ensure_ascii=False),
+            str(runs_dir),
+            ctx.get("coalesced_with", ""),
+        )
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO runs ({', '.join(_RUN_COLUMNS)}) VALUES ({', '.join('?' * len(row))})",
+            row,
+        )
+        self._conn.execute(
+            "DELETE FROM artifacts WHERE project = ? AND run_id = ?",
+            (row[0], row[1]),
+        )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO artifacts (project, run_id, name, path, bytes) VALUES (?, ?, ?, ?, ?)",
+            [(row[0], row[1], name, path, size) for name, path, size in _scan_artifacts(runs_dir)],
+        )
+
+    def record_run(self, ctx: Dict[str, Any], runs_dir: str | Path, legacy_dir: Optional[str | Path] = "memory") -> None:
+        """
+        Insert / update one run and the files currently in its folder, plus the
+        legacy scribe logs written since the run started.
+        """
+        since = str(ctx.get("start_time") or "").replace("T", "_").replace(":", "-")
+        legacy = _legacy_logs(Path(legacy_dir), since) if legacy_dir and since else []
+        with self._lock, self._conn:
+            self._upsert(ctx, Path(runs_dir))
+            self._insert_legacy(legacy)
+
+    def _insert_legacy(self, logs: List[Tuple[str, str, int]]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO artifacts (project, run_id, name, path, bytes) VALUES ('', '', ?, ?, ?)",
+            logs,
+        )
+
+    def rebuild(self, root: str | Path = "projects", legacy_dir: str | Path = "memory") -> int:
+        """
+        Drops the index and backfills it from every projects/*/runs/*/run_context.json
+        (plus legacy memory/scribe_log_*.md). Returns the number of runs indexed.
+        """
+        contexts: List[Tuple[Dict[str, Any], Path]] = []
+        for fp in Path(root).glob("*/runs/*/run_context.json"):
+            try:
+                ctx = json.loads(fp.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            if isinstance(ctx, dict):
+                ctx["project"] = fp.parent.parent.parent.name
+                ctx.setdefault("run_id", fp.parent.name)
+                contexts.append((ctx, fp.parent))
+
+        legacy = _legacy_logs(Path(legacy_dir))
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM runs")
+            self._conn.execute("DELETE FROM artifacts")
+            for ctx, runs_dir in contexts:
+                self._upsert(ctx, runs_dir)
+            self._insert_legacy(legacy)
+        return len(contexts)
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def recent_runs(self, project: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        sql = "SELECT * FROM runs"
+        args: List[Any] = []
+        if project:
+            sql += " WHERE project = ?"
+            args.append(slugify(project))
+        sql += " ORDER BY start_time DESC, run_id DESC LIMIT ?"
+        args.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        out = []
+        for r in rows:
+            d = dict(r)
+            d["timings"] = json.loads(d.get("timings") or "{}")
+            out.append(d)
+        return out
+
+    def artifacts(self, project: str, run_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, path, bytes FROM artifacts WHERE project = ? AND run_id = ? ORDER BY name",
+                (slugify(project), run_id),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def scribe_files(self, project: Optional[str] = None, run_id: Optional[str] = None, limit: int = 10) -> List[str]:
+        """
+        Paths of scribe logs, newest first: projects/{project}/runs/{run_id or any}/scribe*.md,
+        then legacy memory/scribe_log_*.md (so the current run's scribe.md is never cut by LIMIT).
+        """
+        sql = (
+            "SELECT path FROM artifacts WHERE name LIKE 'scribe%.md' AND ("
+            "(project = '' AND run_id = '')"
+        )
+        args: List[Any] = []
+        if project:
+            sql += " OR (project = ?" + (" AND run_id = ?" if run_id else "") + ")"
+            args.append(slugify(project))
+            if run_id:
+                args.append(run_id)
+        sql += ") ORDER BY project = '' ASC, run_id DESC, name DESC LIMIT ?"
+        args.append(int(limit))
+        with self._lock:
+            return [r[0] for r in self._conn.execute(sql, args).fetchall()]
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0])
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_INDEX: Optional[RunIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_run_index() -> Optional[RunIndex]:
+    """Process-wide index from CONFIG["run_index"]; None when disabled."""
+    global _INDEX
+    cfg = CONFIG.get("run_index", {})
+    if not cfg.get("enabled", True):
+        return None
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            _INDEX = RunIndex(cfg.get("path", "projects/runs.sqlite3"))
+        return _INDEX
+
+
+def record_run(ctx: Dict[str, Any], dirs: Dict[str, Path]) -> None:
+    """Index a finished run; artifacts are taken from dirs["runs"]."""
+    index = get_run_index()
+    if index is not None:
+        index.record_run(ctx, dirs["runs"])
+
+
+def reindex(root: str | Path = "projects", legacy_dir: str | Path = "memory") -> int:
+    index = get_run_index()
+    return index.rebuild(root, legacy_dir) if index is not None else 0
@@ -2,11 +2,30 @@
 from __future__ import annotations
 
 import ast
+import asyncio
+import atexit
 import io
+import json
+import multiprocessing as mp
+import os
+import signal
+import sys
+import threading
+import time
 import traceback
-from multiprocessing import Process, Queue
 from contextlib import redirect_stdout, redirect_stderr
-from typing import Tuple, Optional, List
+from dataclasses import dataclass, asdict
+from multiprocessing.connection import Connection
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Tuple, Optional, List
+
+try:  # POSIX only
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+from config import CONFIG
+from core.metrics import SANDBOX_DURATION, SANDBOX_EXECUTIONS
 
 
 BLOCKED_IMPORTS = {
@@ -59,59 +78,676 @@ def _scan(code: str) -> None:
                     raise UnsafeCodeError(f"Blocked call: {base}.{attr}()")
 
 
-def _child_exec(code: str, q: Queue) -> None:
-    out = io.StringIO()
-    err = io.StringIO()
+SAFE_BUILTINS = {
+    "print": print,
+    "range": range,
+    "len": len,
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "dict": dict,
+    "list": list,
+    "set": set,
+    "tuple": tuple,
+    "min": min,
+    "max": max,
+    "sum": sum,
+    "abs": abs,
+    "enumerate": enumerate,
+    "zip": zip,
+}
+
+
+@dataclass
+class SandboxResult:
+    status: str  # "ok" | "err" | "timeout" | "unsafe"
+    stdout: str = ""
+    stderr: str = ""
+    truncated: bool = False  # stdout / stderr hit max_output_bytes
+    wall_sec: float = 0.0
+    cpu_sec: float = 0.0  # CPU time the snippet used
+    peak_rss_kb: int = 0  # high-water RSS of the process that ran the snippet (0 = unknown)
+
+    def as_tuple(self) -> Tuple[str, str, str]:
+        return (self.status, self.stdout, self.stderr)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class Limits:
+    timeout_sec: float = 5
+    max_output_bytes: int = 64 * 1024  # per stream; the rest is dropped
+    chunk_bytes: int = 4096  # stdout / stderr are shipped to the parent in chunks of this size
+    cpu_sec: Optional[float] = None  # RLIMIT_CPU for the snippet (None = timeout_sec)
+    memory_mb: Optional[int] = 256  # extra address space the snippet may map (RLIMIT_AS)
+
+
+def limits_from_config(trusted: bool = False, **overrides: Any) -> Limits:
+    """CONFIG["sandbox"] limits (+ its "trusted" section for trusted runs), then per-call overrides."""
+    cfg = dict(CONFIG.get("sandbox", {}))
+    if trusted:
+        cfg.update(cfg.get("trusted", {}))
+    lim = Limits(
+        timeout_sec=cfg.get("timeout_sec", 5),
+        max_output_bytes=int(cfg.get("max_output_kb", 64)) * 1024,
+        chunk_bytes=int(cfg.get("chunk_kb", 4)) * 1024,
+        cpu_sec=cfg.get("cpu_sec"),
+        memory_mb=cfg.get("memory_mb", 256),
+    )
+    for k, v in overrides.items():
+        setattr(lim, k, v)
+    return lim
+
+
+def _make_result(
+    status: str,
+    stdout: bytes,
+    stderr: bytes,
+    t0: float,
+    extra_err: str = "",
+    usage: Optional[Dict[str, Any]] = None,
+) -> SandboxResult:
+    usage = usage or {}
+    err_text = stderr.decode("utf-8", "ignore") + extra_err
+    dropped = int(usage.get("dropped", 0))
+    if dropped:
+        err_text += f"\n… [output truncated: {dropped} bytes dropped]"
+    return SandboxResult(
+        status=status,
+        stdout=stdout.decode("utf-8", "ignore"),
+        stderr=err_text,
+        truncated=bool(dropped),
+        wall_sec=round(time.perf_counter() - t0, 4),
+        cpu_sec=float(usage.get("cpu_sec", 0.0)),
+        peak_rss_kb=int(usage.get("peak_rss_kb", 0)),
+    )
+
+
+# ----------------------------
+# Worker side
+# ----------------------------
+class _CpuLimitExceeded(BaseException):
+    pass
+
+
+def _on_sigxcpu(signum, frame):  # pragma: no cover - signal handler
+    raise _CpuLimitExceeded()
+
+
+class _ChunkStream(io.TextIOBase):
+    """
+    stdout / stderr replacement in the worker: text goes to the parent in
+    chunk_bytes pieces (or every 50ms) while the snippet runs; everything past
+    `cap` is counted, not kept.
+    """
+
+    def __init__(self, conn: Connection, name: str, cap: int, chunk: int):
+        self.conn, self.name, self.cap, self.chunk = conn, name, max(0, cap), max(1, chunk)
+        self._buf: List[bytes] = []
+        self._buffered = 0
+        self._last = time.monotonic()
+        self.sent = 0
+        self.dropped = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        s = str(s)
+        room = self.cap - self.sent - self._buffered
+        if room <= 0:  # past the cap: only count
+            self.dropped += len(s) if s.isascii() else len(s.encode("utf-8", "replace"))
+            return len(s)
+        data = s.encode("utf-8", "replace")
+        if len(data) > room:
+            self.dropped += len(data) - room
+            data = data[:room]
+        self._buf.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self.chunk or time.monotonic() - self._last >= 0.05:
+            self.flush()
+        return len(s)
+
+    def flush(self) -> None:
+        if self._buf:
+            data = b"".join(self._buf)
+            self._buf, self._buffered = [], 0
+            self.sent += len(data)
+            self.conn.send((self.name, data))
+        self._last = time.monotonic()
+
+
+def _max_rss_kb() -> int:
+    if resource is None:
+        return 0
+    return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)  # KiB on Linux
+
 
+def _proc_rss_kb(pid: int) -> int:
+    """Current RSS of another process (Linux /proc; 0 = unknown)."""
     try:
-        _scan(code)
+        with open(f"/proc/{pid}/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def _vm_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _apply_limits(lim: Limits) -> List[Tuple[int, Tuple[int, int]]]:
+    """
+    Sets per-run soft limits in the (long-lived) worker; returns what to restore.
+    RLIMIT_CPU counts for the whole process, so the soft limit is "used so far + budget".
+    """
+    saved: List[Tuple[int, Tuple[int, int]]] = []
+    if resource is None:
+        return saved
+
+    def cap(value: int, hard: int) -> int:
+        return value if hard == resource.RLIM_INFINITY else min(value, hard)
+
+    cpu = lim.cpu_sec if lim.cpu_sec is not None else lim.timeout_sec
+    if cpu:
+        old = resource.getrlimit(resource.RLIMIT_CPU)
+        ru = resource.getrusage(resource.RUSAGE_SELF)
+        soft = int(ru.ru_utime + ru.ru_stime + float(cpu)) + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (cap(soft, old[1]), old[1]))
+        saved.append((resource.RLIMIT_CPU, old))
+
+    vm = _vm_bytes()
+    if lim.memory_mb and vm:  # no reliable baseline (or no enforcement) off Linux
+        old = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (cap(vm + int(lim.memory_mb) * 1024 * 1024, old[1]), old[1]))
+        saved.append((resource.RLIMIT_AS, old))
+    return saved
+
+
+def _restore_limits(saved: List[Tuple[int, Tuple[int, int]]]) -> None:
+    for which, old in reversed(saved):
+        resource.setrlimit(which, old)
+
 
-        safe_globals = {
-            "__builtins__": {
-                "print": print,
-                "range": range,
-                "len": len,
-                "str": str,
-                "int": int,
-                "float": float,
-                "bool": bool,
-                "dict": dict,
-                "list": list,
-                "set": set,
-                "tuple": tuple,
-                "min": min,
-                "max": max,
-                "sum": sum,
-                "abs": abs,
-                "enumerate": enumerate,
-                "zip": zip,
-            }
-        }
-
-        with redirect_stdout(out), redirect_stderr(err):
-            exec(code, safe_globals, {})
-        q.put(("ok", out.getvalue(), err.getvalue()))
+def _exec_one(conn: Connection, code: str, lim: Limits) -> None:
+    """Runs one snippet, streaming its output; ends with ("end", status, usage)."""
+    out = _ChunkStream(conn, "stdout", lim.max_output_bytes, lim.chunk_bytes)
+    err = _ChunkStream(conn, "stderr", lim.max_output_bytes, lim.chunk_bytes)
+    cpu0 = time.process_time()
+    status, exc = "ok", None
+
+    try:
+        compiled = compile(code, "<snippet>", "exec")  # syntax errors are "err", not "unsafe"
+        _scan(code)
+        saved = _apply_limits(lim)
+        try:
+            with redirect_stdout(out), redirect_stderr(err):
+                exec(compiled, {"__builtins__": dict(SAFE_BUILTINS)}, {})
+        finally:
+            _restore_limits(saved)
+    except UnsafeCodeError as e:
+        status = "unsafe"
+        err.write(str(e))
+    except _CpuLimitExceeded:
+        status = "timeout"
+        err.write(f"\nCPU time limit exceeded ({lim.cpu_sec or lim.timeout_sec}s)")
     except Exception as e:
-        q.put(("err", out.getvalue(), err.getvalue() + "\n" + traceback.format_exc()))
+        status, exc = "err", e
 
+    if exc is not None:  # formatted outside the limits (MemoryError needs headroom)
+        err.write("\n" + "".join(traceback.format_exception(type(exc), exc, exc.__traceback__)))
+    out.flush()
+    err.flush()
+    conn.send(("end", status, {
+        "cpu_sec": round(time.process_time() - cpu0, 4),
+        "peak_rss_kb": _max_rss_kb(),
+        "dropped": out.dropped + err.dropped,
+    }))
 
-def run_python_sandbox(code: str, timeout_sec: int = 5) -> Tuple[str, str, str]:
+
+# Snippets can reach the worker's module globals (SAFE_BUILTINS, BLOCKED_IMPORTS, ...)
+# through object introspection, so a warm worker never runs one itself: it forks a
+# child per snippet and stays a clean template. Without fork the worker is retired
+# after every run instead.
+_FORK_PER_RUN = hasattr(os, "fork")
+
+
+def _fork_one(conn: Connection, code: str, lim: Limits) -> None:
+    """Runs one snippet in a forked child; whatever the snippet changes dies with it."""
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover - runs in the child
+        rc = 1
+        try:
+            _exec_one(conn, code, lim)
+            rc = 0
+        finally:
+            os._exit(rc)
+    _, wstatus = os.waitpid(pid, 0)
+    if wstatus:  # died before its "end" message (signal, broken pipe, ...)
+        conn.send(("stderr", f"\nSandbox child exited abnormally (wait status {wstatus})".encode()))
+        conn.send(("end", "err", {"cpu_sec": 0.0, "peak_rss_kb": 0, "dropped": 0}))
+
+
+def _worker_main(conn: Connection) -> None:
     """
-    Returns: (status, stdout, stderr)
-      status: "ok" | "err" | "timeout" | "unsafe"
+    Long-lived sandbox worker: receives (code, Limits) over the pipe and streams
+    back ("stdout" | "stderr", bytes) chunks, then ("end", status, usage).
+    Stops on None or when the pipe closes.
+    """
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()  # the parent kills the worker and its snippet child as one group
+    if resource is not None and hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, _on_sigxcpu)
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            break
+        if msg is None:
+            break
+        code, lim = msg
+        (_fork_one if _FORK_PER_RUN else _exec_one)(conn, code, lim)
+    conn.close()
+
+
+# ----------------------------
+# Parent side
+# ----------------------------
+class _Worker:
+    def __init__(self, ctx: mp.context.BaseContext):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_main, args=(child,), daemon=True)
+        self.proc.start()
+        child.close()
+        self.runs = 0
+        self.base_rss_kb: Optional[int] = None
+
+    def kill(self) -> None:
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        if hasattr(os, "killpg") and self.proc.pid:
+            try:
+                os.killpg(self.proc.pid, signal.SIGKILL)  # worker + the child running the snippet
+            except OSError:
+                pass  # group not set up yet / already gone
+        if self.proc.is_alive():
+            self.proc.kill()
+        self.proc.join(timeout=1)
+
+    def retire(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.proc.join(timeout=1)
+        self.kill()
+
+
+class SandboxPool:
     """
-    q: Queue = Queue()
-    p = Process(target=_child_exec, args=(code, q))
-    p.start()
-    p.join(timeout=timeout_sec)
+    Pre-forked sandbox workers that take code over a pipe, so a snippet costs one
+    round trip instead of a process spawn.
+
+    - at most `size` workers; callers block while all are busy
+    - a worker is recycled after `max_runs` executions, or when its own RSS (not
+      the snippet child's) grew more than `max_rss_growth_mb` above what it had
+      after its first run (Linux only)
+    - on timeout the worker is killed (its state is unknown)
+    - a recycled or killed worker is replaced by a fresh warm one right away
+    - each snippet runs in a child forked from the worker, so nothing one snippet
+      changes is seen by the next (no fork: the worker is retired after each run)
+    """
+
+    def __init__(self, size: int = 2, max_runs: int = 50, max_rss_growth_mb: int = 64):
+        self.size = max(1, int(size))
+        self.max_runs = max(1, int(max_runs))
+        self.max_rss_growth_kb = max(0, int(max_rss_growth_mb)) * 1024
+        self._ctx = mp.get_context()
+        self._idle: List[_Worker] = []
+        self._count = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self.counters = {"runs": 0, "spawned": 0, "recycled": 0, "killed": 0}
+
+    def warm(self) -> None:
+        """Starts workers up to `size` ahead of the first call."""
+        with self._cond:
+            while self._count < self.size:
+                self._idle.append(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        self._count += 1
+        self.counters["spawned"] += 1
+        return _Worker(self._ctx)
+
+    def _acquire(self) -> _Worker:
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("sandbox pool is closed")
+                while self._idle:
+                    w = self._idle.pop()
+                    if w.proc.is_alive():
+                        return w
+                    self._count -= 1
+                if self._count < self.size:
+                    return self._spawn()
+                self._cond.wait()
+
+    def _release(self, w: _Worker, reusable: bool, *counters: str) -> None:
+        with self._cond:
+            for c in counters:
+                self.counters[c] += 1
+            if reusable and not self._closed:
+                self._idle.append(w)
+            else:
+                self._count -= 1
+            self._cond.notify()
+        if not reusable:
+            self._replace()
+
+    def _replace(self) -> None:
+        """Starts a warm worker in place of a dropped one (outside the lock: a spawn is slow)."""
+        with self._cond:
+            if self._closed or self._count >= self.size:
+                return
+            self._count += 1
+            self.counters["spawned"] += 1
+        try:
+            w = _Worker(self._ctx)
+        except Exception:
+            with self._cond:
+                self._count -= 1  # the next caller spawns one on demand
+                self._cond.notify()
+            return
+        with self._cond:
+            if not self._closed:
+                self._idle.append(w)
+                self._cond.notify()
+                return
+            self._count -= 1
+        w.retire()
+
+    def execute(self, code: str, limits: Optional[Limits] = None) -> SandboxResult:
+        """
+        Runs one snippet on a pool worker. Output is read while it is produced,
+        so a chatty snippet can neither fill the pipe nor grow past max_output_bytes.
+        """
+        lim = limits or limits_from_config()
+        chunks: Dict[str, List[bytes]] = {"stdout": [], "stderr": []}
+        t0 = time.perf_counter()
+
+        def result(status: str, extra_err: str = "", usage: Optional[Dict[str, Any]] = None) -> SandboxResult:
+            return _make_result(status, b"".join(chunks["stdout"]), b"".join(chunks["stderr"]), t0, extra_err, usage)
+
+        w = self._acquire()
+        deadline = time.monotonic() + float(lim.timeout_sec)
+        try:
+            w.conn.send((code, lim))
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not w.conn.poll(remaining):
+                    w.kill()
+                    self._release(w, False, "killed")
+                    return result("timeout", f"Execution timed out after {lim.timeout_sec}s")
+                msg = w.conn.recv()
+                if msg[0] == "end":
+                    break
+                chunks[msg[0]].append(msg[1])
+        except (EOFError, OSError) as e:
+            w.kill()
+            self._release(w, False, "killed")
+            return result("err", f"Sandbox worker died: {type(e).__name__}: {e}")
+
+        _, status, usage = msg
+        w.runs += 1
+        worn = not _FORK_PER_RUN or w.runs >= self.max_runs
+        if not worn and self.max_rss_growth_kb:
+            # the worker's own footprint: usage["peak_rss_kb"] is the snippet child's
+            rss_kb = _proc_rss_kb(w.proc.pid)
+            if w.base_rss_kb is None:
+                w.base_rss_kb = rss_kb
+            worn = bool(rss_kb and rss_kb - w.base_rss_kb > self.max_rss_growth_kb)
+        if worn:
+            w.retire()
+        self._release(w, not worn, *(("runs", "recycled") if worn else ("runs",)))
+        return result(status, usage=usage)
+
+    def run(self, code: str, timeout_sec: float = 5) -> Tuple[str, str, str]:
+        return self.execute(code, limits_from_config(timeout_sec=timeout_sec)).as_tuple()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {**self.counters, "workers": self._count, "idle": len(self._idle)}
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+            self._cond.notify_all()
+        for w in idle:
+            w.retire()
+
+
+_POOL: Optional[SandboxPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_sandbox_pool() -> SandboxPool:
+    """Process-wide pool from CONFIG["sandbox"], warmed on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            cfg = CONFIG.get("sandbox", {})
+            _POOL = SandboxPool(
+                size=cfg.get("pool_size", 2),
+                max_runs=cfg.get("max_runs_per_worker", 50),
+                max_rss_growth_mb=cfg.get("max_rss_growth_mb", 64),
+            )
+            _POOL.warm()
+            atexit.register(_POOL.close)
+        return _POOL
+
+
+# ----------------------------
+# Trusted mode: full interpreter in a fresh process, same limits and metrics
+# ----------------------------
+# Bootstrap run with `python -c`: reads the snippet from stdin (no temp file), applies
+# the limits to itself, and on exit writes its usage as JSON to the inherited fd argv[1].
+_TRUSTED_BOOT = r"""
+import json, os, sys, time
+_fd, _cpu, _mem = int(sys.argv[1]), float(sys.argv[2]), int(sys.argv[3])
+_code = sys.stdin.read()
+try:
+    import resource
+except ImportError:
+    resource = None
+if resource is not None:
+    def _cap(v, hard):
+        return v if hard == resource.RLIM_INFINITY else min(v, hard)
+    if _cpu > 0:
+        _h = resource.getrlimit(resource.RLIMIT_CPU)[1]
+        resource.setrlimit(resource.RLIMIT_CPU, (_cap(int(time.process_time() + _cpu) + 1, _h), _h))
+    if _mem > 0:
+        try:
+            with open("/proc/self/statm", "rb") as f:
+                _vm = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            _vm = 0
+        if _vm:
+            _h = resource.getrlimit(resource.RLIMIT_AS)[1]
+            resource.setrlimit(resource.RLIMIT_AS, (_cap(_vm + _mem * 1024 * 1024, _h), _h))
+def _report():
+    if _fd >= 0:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource is not None else 0
+        os.write(_fd, json.dumps({"cpu_sec": round(time.process_time(), 4), "peak_rss_kb": rss}).encode())
+import atexit
+atexit.register(_report)
+sys.argv = ["-"]
+exec(compile(_code, "<snippet>", "exec"), {"__name__": "__main__", "__builtins__": __builtins__})
+"""
+
+
+class _CappedSink:
+    def __init__(self, cap: int):
+        self.cap = max(0, cap)
+        self.parts: List[bytes] = []
+        self.kept = 0
+        self.dropped = 0
+
+    def feed(self, data: bytes) -> None:
+        room = self.cap - self.kept
+        if len(data) > room:
+            self.dropped += len(data) - max(0, room)
+            data = data[:max(0, room)]
+        if data:
+            self.parts.append(data)
+            self.kept += len(data)
 
-    if p.is_alive():
-        p.terminate()
-        p.join()
-        return ("timeout", "", f"Execution timed out after {timeout_sec}s")
+    def value(self) -> bytes:
+        return b"".join(self.parts)
 
-    if not q.empty():
-        status, stdout, stderr = q.get()
-        return (status, stdout, stderr)
 
-    return ("err", "", "Unknown execution error (no output returned)")
+async def _execute_trusted(code: str, lim: Limits) -> SandboxResult:
+    t0 = time.perf_counter()
+    cpu = lim.cpu_sec if lim.cpu_sec is not None else lim.timeout_sec
+    usage_r, usage_w = os.pipe() if os.name == "posix" else (-1, -1)
+    if usage_r >= 0:
+        # read once the child is gone; a grandchild may still hold the write end,
+        # so an empty pipe must not block the event loop
+        os.set_blocking(usage_r, False)
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-c", _TRUSTED_BOOT, str(usage_w), str(float(cpu or 0)), str(int(lim.memory_mb or 0)),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            pass_fds=(usage_w,) if usage_w >= 0 else (),
+        )
+    except BaseException:
+        if usage_r >= 0:
+            os.close(usage_r)
+        raise
+    finally:
+        if usage_w >= 0:
+            os.close(usage_w)
+
+    out, err = _CappedSink(lim.max_output_bytes), _CappedSink(lim.max_output_bytes)
+
+    async def feed() -> None:
+        try:
+            proc.stdin.write((code or "").encode("utf-8"))
+            await proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            proc.stdin.close()
+
+    async def pump(stream: asyncio.StreamReader, sink: _CappedSink) -> None:
+        while True:
+            chunk = await stream.read(max(1, lim.chunk_bytes))
+            if not chunk:
+                break
+            sink.feed(chunk)
+
+    status, extra = "ok", ""
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(feed(), pump(proc.stdout, out), pump(proc.stderr, err), proc.wait()),
+            timeout=float(lim.timeout_sec),
+        )
+        if proc.returncode != 0:
+            status = "err"
+            if hasattr(signal, "SIGXCPU") and proc.returncode == -signal.SIGXCPU:
+                status, extra = "timeout", f"\nCPU time limit exceeded ({cpu}s)"
+    except asyncio.TimeoutError:
+        status, extra = "timeout", f"Execution timed out after {lim.timeout_sec}s"
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+
+    usage: Dict[str, Any] = {"dropped": out.dropped + err.dropped}
+    if usage_r >= 0:
+        try:
+            raw = os.read(usage_r, 65536)  # non-blocking: nothing written -> BlockingIOError
+            if raw:
+                usage.update(json.loads(raw))
+        except (OSError, ValueError):
+            pass
+        finally:
+            os.close(usage_r)
+    return _make_result(status, out.value(), err.value(), t0, extra, usage)
+
+
+def _run_sync(coro: Any) -> Any:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # called synchronously from code that is already inside an event loop
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, coro).result()
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+def _observe(result: SandboxResult, trusted: bool) -> SandboxResult:
+    mode = "trusted" if trusted else "restricted"
+    SANDBOX_EXECUTIONS.inc(mode=mode, status=result.status)
+    SANDBOX_DURATION.observe(result.wall_sec, mode=mode)
+    return result
+
+
+async def execute_async(code: str, timeout_sec: Optional[float] = None, trusted: bool = False, **limits: Any) -> SandboxResult:
+    """
+    Runs a snippet without blocking the event loop.
+
+    trusted=False: restricted builtins + AST scan, on a warm SandboxPool worker.
+    trusted=True:  full interpreter in a fresh process, code passed over stdin.
+    Both use the Limits from CONFIG["sandbox"] (timeout_sec and max_output_bytes,
+    chunk_bytes, cpu_sec, memory_mb can be overridden per call) and return a SandboxResult.
+    """
+    if timeout_sec is not None:
+        limits["timeout_sec"] = timeout_sec
+    lim = limits_from_config(trusted=trusted, **limits)
+    if trusted:
+        return _observe(await _execute_trusted(code, lim), trusted)
+    return _observe(await asyncio.to_thread(get_sandbox_pool().execute, code, lim), trusted)
+
+
+async def execute_many(codes: Iterable[str], **kwargs: Any) -> List[SandboxResult]:
+    """Runs several snippets concurrently (same kwargs as execute_async), results in input order."""
+    return list(await asyncio.gather(*(execute_async(c, **kwargs) for c in codes)))
+
+
+def execute(code: str, timeout_sec: Optional[float] = None, trusted: bool = False, **limits: Any) -> SandboxResult:
+    """Blocking form of execute_async."""
+    if timeout_sec is not None:
+        limits["timeout_sec"] = timeout_sec
+    if trusted:
+        return _observe(_run_sync(_execute_trusted(code, limits_from_config(trusted=True, **limits))), trusted)
+    return _observe(get_sandbox_pool().execute(code, limits_from_config(**limits)), trusted)
+
+
+def run_python_sandbox(code: str, timeout_sec: int = 5) -> Tuple[str, str, str]:
+    """
+    Returns: (status, stdout, stderr)
+      status: "ok" | "err" | "timeout" | "unsafe"
+    Thin wrapper over execute() (warm SandboxPool worker).
+    """
+    return execute(code, timeout_sec).as_tuple()
@@ -0,0 +1,213 @@
+# core/scheduler.py
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional
+
+
+NodeStatus = Literal["ok", "failed", "skipped", "cancelled"]
+
+# A node receives {input_name: value} for every input that finished OK.
+NodeFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass
+class Node:
+    name: str
+    fn: NodeFn
+    requires: List[str] = field(default_factory=list)
+    optional: List[str] = field(default_factory=list)
+
+
+@dataclass
+class NodeResult:
+    name: str
+    status: NodeStatus = "ok"
+    value: Any = None
+    error: str = ""
+    start: float = 0.0
+    end: float = 0.0
+    missing: List[str] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return max(0.0, self.end - self.start)
+
+
+class DagScheduler:
+    """
+    Runs a small dependency graph of async nodes.
+    Each node starts as soon as its own inputs are done (no phase barriers).
+
+    - requires: node is skipped if any of these did not finish OK
+    - optional: node waits for them, but runs anyway with whatever succeeded
+      (missing ones are listed in NodeResult.missing -> "partial" drafts)
+
+    on_result is called with every NodeResult as it is recorded; it may call
+    cancel() to stop the rest of the graph (e.g. an early answer was good enough).
+    """
+
+    def __init__(
+        self,
+        nodes: List[Node],
+        origin: Optional[float] = None,
+        on_result: Optional[Callable[[NodeResult], None]] = None,
+    ):
+        self.nodes: Dict[str, Node] = {}
+        for n in nodes:
+            if n.name in self.nodes:
+                raise ValueError(f"Duplicate node: {n.name}")
+            self.nodes[n.name] = n
+
+        for n in self.nodes.values():
+            for dep in n.requires:
+                if dep not in self.nodes:
+                    raise ValueError(f"Node {n.name} requires unknown node: {dep}")
+            # optional inputs that are not part of this graph are simply missing
+            n.optional = [d for d in n.optional if d in self.nodes and d not in n.requires]
+
+        self._check_cycles()
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.results: Dict[str, NodeResult] = {}
+        self.on_result = on_result
+        self.cancel_reason = ""
+        self._tasks: Dict[str, asyncio.Future] = {}
+
+    def _deps(self, name: str) -> List[str]:
+        n = self.nodes[name]
+        return list(n.requires) + list(n.optional)
+
+    def _check_cycles(self) -> None:
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError("Dependency cycle: " + " -> ".join(path + [name]))
+            state[name] = 1
+            for dep in self._deps(name):
+                visit(dep, path + [name])
+            state[name] = 2
+
+        for name in self.nodes:
+            visit(name, [])
+
+    def _now(self) -> float:
+        return time.perf_counter() - self.origin
+
+    def cancel(self, reason: str) -> List[str]:
+        """
+        Stops every node that has not finished (running ones are cancelled);
+        they end with status "cancelled" and error=reason. Returns their names.
+        """
+        if self.cancel_reason:
+            return []
+        self.cancel_reason = reason or "cancelled"
+        pending = [name for name in self.nodes if name not in self.results]
+        for name in pending:
+            task = self._tasks.get(name)
+            if task is not None and not task.done():
+                task.cancel()
+        return pending
+
+    async def run(self) -> Dict[str, NodeResult]:
+        loop = asyncio.get_running_loop()
+        done: Dict[str, asyncio.Future] = {name: loop.create_future() for name in self.nodes}
+        starts: Dict[str, float] = {}
+
+        def record(res: NodeResult) -> None:
+            self.results[res.name] = res
+            if not done[res.name].done():
+                done[res.name].set_result(res)
+            if self.on_result is not None:
+                try:
+                    self.on_result(res)
+                except Exception:
+                    pass  # a broken callback must not break the graph
+
+        def cancelled(name: str) -> NodeResult:
+            now = self._now()
+            return NodeResult(name=name, status="cancelled", error=self.cancel_reason, start=starts.get(name, now), end=now)
+
+        async def run_node(node: Node) -> None:
+            try:
+                deps = self._deps(node.name)
+                # shield: cancelling a waiting node must not cancel the futures other nodes wait on
+                finished = list(await asyncio.gather(*(asyncio.shield(done[d]) for d in deps))) if deps else []
+            except asyncio.CancelledError:
+                if not self.cancel_reason:
+                    raise  # the run itself was cancelled
+                record(cancelled(node.name))
+                return
+            by_name = {r.name: r for r in finished}
+
+            failed_required = [d for d in node.requires if by_name[d].status != "ok"]
+            if self.cancel_reason:
+                res = cancelled(node.name)
+            elif failed_required:
+                now = self._now()
+                res = NodeResult(
+                    name=node.name,
+                    status="skipped",
+                    error=f"Required input(s) not available: {', '.join(failed_required)}",
+                    start=now,
+                    end=now,
+                )
+            else:
+                inputs = {r.name: r.value for r in finished if r.status == "ok"}
+                missing = [d for d in node.optional if by_name[d].status != "ok"]
+                starts[node.name] = self._now()
+                res = NodeResult(name=node.name, start=starts[node.name], missing=missing)
+                try:
+                    res.value = await node.fn(inputs)
+                except asyncio.CancelledError:
+                    if not self.cancel_reason:
+                        raise
+                    res = cancelled(node.name)
+                except Exception as e:
+                    res.status = "failed"
+                    res.error = f"{type(e).__name__}: {e}"
+                if res.status != "cancelled":
+                    res.end = self._now()
+
+            record(res)
+
+        self._tasks = {n.name: asyncio.ensure_future(run_node(n)) for n in self.nodes.values()}
+        try:
+            await asyncio.gather(*self._tasks.values())
+        finally:
+            for task in self._tasks.values():
+                task.cancel()  # no-op for finished ones; stops the rest if the run is cancelled
+        return self.results
+
+    def critical_path(self) -> List[str]:
+        """
+        Walks back from the last node to finish, always through the input that
+        finished last. That chain is what bounded the wall-clock time of the run.
+        Cancelled nodes are left out.
+        """
+        ran = {n: r for n, r in self.results.items() if r.status != "cancelled"}
+        if not ran:
+            return []
+
+        cur: Optional[NodeResult] = max(ran.values(), key=lambda r: r.end)
+        path: List[str] = []
+        while cur is not None:
+            path.append(cur.name)
+            deps = [ran[d] for d in self._deps(cur.name) if d in ran]
+            cur = max(deps, key=lambda r: r.end) if deps else None
+        return list(reversed(path))
+
+    def timings(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "start": round(r.start, 4),
+                "end": round(r.end, 4),
+                "duration": round(r.duration, 4),
+                "status": r.status,
+            }
+            for name, r in self.results.items()
+        }
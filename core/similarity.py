@@ -0,0 +1,362 @@
+# core/similarity.py
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import re
+import struct
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import CONFIG
+from core.run_context import slugify
+
+
+# canonical word -> words that mean the same thing in a goal
+DEFAULT_SYNONYMS: Dict[str, List[str]] = {
+    "build": ["create", "make", "generate", "develop", "implement", "write", "produce", "code"],
+    "app": ["application", "webapp", "program", "tool"],
+    "page": ["screen", "view"],
+    "login": ["signin", "logon", "auth", "authentication"],
+    "signup": ["register", "registration"],
+    "fix": ["repair", "debug", "resolve"],
+    "explain": ["describe", "summarize", "summarise"],
+    "python": ["py"],
+}
+
+# multi-word spellings folded before tokenizing
+PHRASES: Dict[str, str] = {
+    "sign in": "signin",
+    "log in": "login",
+    "sign up": "signup",
+    "web app": "app",
+}
+
+STOPWORDS = frozenset(
+    "a an the and or of for to in on with by from into using use me my our your "
+    "i we you it this that these those please can could would should some simple small new "
+    "is are be do does".split()
+)
+
+# the only words a repeated goal may add or drop and still count as the same task
+FILLER = frozenset("a an the please".split())
+
+# jsonl row format; rows of another format are re-derived from their goal on load
+FORMAT = 2
+
+_WORD = re.compile(r"[a-z0-9]+")
+_MASK64 = (1 << 64) - 1
+_FNV = 0x100000001B3
+_WORDS16 = struct.Struct("<16I")
+
+
+class Normalizer:
+    """
+    Two views of a goal:
+      key(goal)       exact-reuse key: lowercase words in order, phrases folded, plurals
+                      stripped, only FILLER dropped and no synonyms, so "celsius to
+                      fahrenheit" and "fahrenheit to celsius" stay different tasks
+      features(goal)  warm-start shingles: content words (stopwords dropped, synonyms
+                      mapped) plus their ordered bigrams, so word order still counts
+    """
+
+    def __init__(self, synonyms: Optional[Dict[str, List[str]]] = None, stopwords: Iterable[str] = STOPWORDS):
+        self.stopwords = frozenset(stopwords)
+        self.synonyms: Dict[str, str] = {}
+        for canon, words in (DEFAULT_SYNONYMS if synonyms is None else synonyms).items():
+            for w in words:
+                self.synonyms[w] = canon
+        self._phrases = re.compile(r"\b(" + "|".join(re.escape(p) for p in PHRASES) + r")\b")
+
+    @staticmethod
+    def _stem(w: str) -> str:
+        if len(w) > 4 and w.endswith("ies"):
+            return w[:-3] + "y"
+        if len(w) > 3 and w.endswith("s") and not w.endswith("ss"):
+            return w[:-1]
+        return w
+
+    def _words(self, text: str) -> List[str]:
+        return _WORD.findall(self._phrases.sub(lambda m: PHRASES[m.group(1)], (text or "").lower()))
+
+    def key(self, text: str) -> str:
+        return " ".join(self._stem(w) for w in self._words(text) if w not in FILLER)
+
+    def features(self, text: str) -> Tuple[str, ...]:
+        seq = [self.synonyms.get(w, w) for w in (self._stem(w) for w in self._words(text) if w not in self.stopwords)]
+        out = set(seq)
+        out.update(f"{a} {b}" for a, b in zip(seq, seq[1:]))
+        return tuple(sorted(out))
+
+
+class MinHasher:
+    """
+    MinHash signature of a token set, cut into `bands` LSH keys of num_perm / bands
+    rows each: two sets share at least one key with probability 1 - (1 - J^rows)^bands.
+    The num_perm hash functions of a token are the 32-bit words of salted blake2b
+    digests (16 per digest), cached per token.
+    """
+
+    def __init__(self, num_perm: int = 48, bands: int = 12, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = int(num_perm)
+        self.bands = int(bands)
+        self.rows = self.num_perm // self.bands
+        self._persons = [f"aidt{seed}.{i}".encode("ascii")[:16] for i in range(-(-self.num_perm // 16))]
+        self.layout = f"{self.num_perm}x{self.bands}s{seed}"  # stored next to the keys
+        self.token_hashes = functools.lru_cache(maxsize=65536)(self._token_hashes)
+
+    def _token_hashes(self, token: str) -> Tuple[int, ...]:
+        data = token.encode("utf-8")
+        words: Tuple[int, ...] = ()
+        for person in self._persons:
+            words += _WORDS16.unpack(hashlib.blake2b(data, digest_size=64, person=person).digest())
+        return words[: self.num_perm]
+
+    def signature(self, tokens: Iterable[str]) -> List[int]:
+        return list(map(min, zip(*map(self.token_hashes, tokens))))
+
+    def band_keys(self, tokens: Iterable[str]) -> List[int]:
+        sig = self.signature(tokens)
+        keys = []
+        for i in range(0, len(sig), self.rows):
+            k = i
+            for v in sig[i : i + self.rows]:
+                k = ((k ^ v) * _FNV) & _MASK64
+            keys.append(k)
+        return keys
+
+
+def jaccard(a: Tuple[str, ...], b: Tuple[str, ...]) -> float:
+    if not a and not b:
+        return 1.0
+    sa, sb = set(a), set(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+@dataclass
+class SimilarRun:
+    run_id: str
+    goal: str
+    mode: str
+    path: str  # final Scribe output of that run
+    tokens: Tuple[str, ...]  # Normalizer.features
+    created: float = 0.0
+    key: str = ""  # Normalizer.key
+
+
+@dataclass
+class Match:
+    run_id: str
+    goal: str
+    mode: str
+    path: str
+    similarity: float  # Jaccard over Normalizer.features
+    candidates: int = 0  # entries that shared an LSH band (how much work the lookup did)
+    exact: bool = False  # same Normalizer.key: the same task, worded the same way
+    created: float = 0.0
+
+    @property
+    def age_sec(self) -> float:
+        return max(0.0, time.time() - self.created)
+
+    def read_output(self) -> str:
+        """The matched run's final output ("" if the run folder is gone)."""
+        try:
+            return Path(self.path).read_text(encoding="utf-8")
+        except OSError:
+            return ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        d = asdict(self)
+        d["similarity"] = round(self.similarity, 4)
+        return d
+
+
+class _ProjectIndex:
+    """
+    One project's entries + LSH buckets (band key -> entry positions) + exact keys
+    (Normalizer.key -> entry positions), backed by an append-only jsonl.
+    """
+
+    def __init__(self, path: Path, hasher: MinHasher, normalizer: Normalizer):
+        self.path = path
+        self.hasher = hasher
+        self.normalizer = normalizer
+        self.entries: List[SimilarRun] = []
+        self.buckets: Dict[int, List[int]] = {}
+        self.keys: Dict[str, List[int]] = {}
+        self.run_ids = set()
+        self._load()
+
+    def _insert(self, run: SimilarRun, keys: List[int]) -> None:
+        pos = len(self.entries)
+        self.entries.append(run)
+        self.run_ids.add(run.run_id)
+        for k in keys:
+            self.buckets.setdefault(k, []).append(pos)
+        if run.key:
+            self.keys.setdefault(run.key, []).append(pos)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                    current = row.get("v") == FORMAT
+                    run = SimilarRun(
+                        row["run_id"], row["goal"], row.get("mode", ""), row["path"],
+                        tuple(row["tokens"]) if current else self.normalizer.features(row["goal"]),
+                        float(row.get("created", 0.0)),
+                        row.get("key", "") if current else self.normalizer.key(row["goal"]),
+                    )
+                except (ValueError, KeyError, TypeError):
+                    continue  # torn last line of a crashed writer
+                if run.run_id in self.run_ids or not run.tokens:
+                    continue
+                keys = row.get("bands") if current and row.get("layout") == self.hasher.layout else None
+                self._insert(run, keys or self.hasher.band_keys(run.tokens))
+
+    def add(self, run: SimilarRun) -> bool:
+        if run.run_id in self.run_ids or not run.tokens:
+            return False
+        keys = self.hasher.band_keys(run.tokens)
+        row = {**asdict(run), "tokens": list(run.tokens), "v": FORMAT, "layout": self.hasher.layout, "bands": keys}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self._insert(run, keys)
+        return True
+
+    @staticmethod
+    def _match(run: SimilarRun, sim: float, exact: bool = False) -> Match:
+        return Match(run.run_id, run.goal, run.mode, run.path, sim, exact=exact, created=run.created)
+
+    def lookup(self, tokens: Tuple[str, ...], key: str, mode: Optional[str], max_candidates: int) -> Optional[Match]:
+        # the same goal again: newest such run, no LSH needed
+        for pos in reversed(self.keys.get(key, ())):
+            run = self.entries[pos]
+            if not (mode and run.mode and run.mode != mode):
+                return self._match(run, jaccard(tokens, run.tokens), exact=True)
+
+        hits: Dict[int, int] = {}
+        for k in self.hasher.band_keys(tokens):
+            for pos in self.buckets.get(k, ()):
+                hits[pos] = hits.get(pos, 0) + 1
+        if not hits:
+            return None
+        # more shared bands ~ higher similarity; newest first on ties; exact Jaccard on the best few
+        ranked = sorted(hits, key=lambda p: (-hits[p], -p))
+        best: Optional[Match] = None
+        checked = 0
+        for pos in ranked:
+            run = self.entries[pos]
+            if mode and run.mode and run.mode != mode:
+                continue
+            sim = jaccard(tokens, run.tokens)
+            if best is None or sim > best.similarity:
+                best = self._match(run, sim)
+            checked += 1
+            if sim == 1.0 or checked >= max_candidates:
+                break
+        if best is not None:
+            best.candidates = len(hits)
+        return best
+
+
+class SimilarityIndex:
+    """
+    Near-duplicate lookup over the goals of past runs, one index per project
+    under CONFIG["similarity"]["dir"] ({project}.jsonl, appended to as runs finish).
+    A goal whose Normalizer.key was seen before is an exact match (reusable);
+    otherwise candidates come from MinHash LSH buckets over Normalizer.features and
+    are scored by exact Jaccard (good enough for a warm start, never for reuse).
+    A project's file is read on its first lookup / add, or up front by preload().
+    """
+
+    def __init__(self, cfg: Optional[Dict[str, Any]] = None):
+        self.cfg = dict(cfg if cfg is not None else CONFIG.get("similarity", {}))
+        self.dir = Path(self.cfg.get("dir") or "cache/similarity")
+        self.max_candidates = int(self.cfg.get("max_candidates", 50))
+        self.normalizer = Normalizer(
+            {**DEFAULT_SYNONYMS, **(self.cfg.get("synonyms") or {})},
+            STOPWORDS | set(self.cfg.get("stopwords") or ()),
+        )
+        self.hasher = MinHasher(int(self.cfg.get("num_perm", 48)), int(self.cfg.get("bands", 16)))
+        self._projects: Dict[str, _ProjectIndex] = {}
+        self._loading: Dict[str, threading.Lock] = {}
+        self._lock = threading.RLock()
+
+    def _project(self, project: str) -> _ProjectIndex:
+        slug = slugify(project)
+        with self._lock:
+            idx = self._projects.get(slug)
+            if idx is not None:
+                return idx
+            loading = self._loading.setdefault(slug, threading.Lock())
+        # the file is read outside self._lock: lookups of loaded projects (on the
+        # event loop) must not wait seconds for another project's load
+        with loading:
+            with self._lock:
+                idx = self._projects.get(slug)
+            if idx is None:
+                idx = _ProjectIndex(self.dir / f"{slug}.jsonl", self.hasher, self.normalizer)
+                with self._lock:
+                    self._projects[slug] = idx
+                    self._loading.pop(slug, None)
+            return idx
+
+    def loaded(self, project: str) -> bool:
+        return slugify(project) in self._projects
+
+    def load(self, project: str) -> int:
+        """Reads the project's index now (it can take a while at 100k runs); returns its size."""
+        return len(self._project(project).entries)
+
+    def preload(self) -> int:
+        """Reads every project index under `dir` (see CONFIG["similarity"]["preload"]); returns the entries read."""
+        try:
+            slugs = sorted(p.stem for p in self.dir.glob("*.jsonl"))
+        except OSError:
+            return 0
+        return sum(self.load(slug) for slug in slugs)
+
+    def lookup(self, project: str, goal: str, mode: Optional[str] = None) -> Optional[Match]:
+        """Most similar previous run of the project (same mode when given), or None."""
+        tokens = self.normalizer.features(goal)
+        if not tokens:
+            return None
+        idx = self._project(project)
+        with self._lock:
+            return idx.lookup(tokens, self.normalizer.key(goal), mode, self.max_candidates)
+
+    def add(self, project: str, run_id: str, goal: str, mode: str, path: str) -> bool:
+        n = self.normalizer
+        run = SimilarRun(run_id, goal, mode, str(path), n.features(goal), time.time(), n.key(goal))
+        idx = self._project(project)
+        with self._lock:
+            return idx.add(run)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {slug: len(idx.entries) for slug, idx in self._projects.items()}
+
+
+_INDEX: Optional[SimilarityIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """Process-wide index from CONFIG["similarity"]."""
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            _INDEX = SimilarityIndex()
+        return _INDEX
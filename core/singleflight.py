@@ -0,0 +1,58 @@
+# core/singleflight.py
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key starts the
+    work, every caller that arrives while it is in flight awaits the same result.
+    Keys are scoped per event loop (futures cannot cross loops).
+
+    The shared execution is shielded: if one caller is cancelled, the others still get the result.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {"calls": 0, "executions": 0, "saved": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Returns (result, shared). shared=False for the caller that actually ran fn.
+        Exceptions from fn propagate to every attached caller.
+        """
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            self.counters["calls"] += 1
+            fut = self._inflight.get(loop_key)
+            shared = fut is not None
+            if shared:
+                self.counters["saved"] += 1
+            else:
+                self.counters["executions"] += 1
+                fut = asyncio.ensure_future(fn())
+                self._inflight[loop_key] = fut
+                fut.add_done_callback(lambda _f: self._forget(loop_key, _f))
+
+        return await asyncio.shield(fut), shared
+
+    def _forget(self, loop_key: Tuple[int, Hashable], fut: asyncio.Future) -> None:
+        with self._lock:
+            if self._inflight.get(loop_key) is fut:
+                del self._inflight[loop_key]
+        if not fut.cancelled():
+            fut.exception()  # mark as retrieved even if every caller went away
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self.counters)
+            out["in_flight"] = len(self._inflight)
+            return out
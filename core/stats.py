@@ -0,0 +1,35 @@
+# core/stats.py
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, List, Optional
+
+
+def percentile(values: Iterable[float], p: float) -> Optional[float]:
+    """
+    Nearest-rank percentile (p in 0..100). Returns None for no data.
+    """
+    data: List[float] = sorted(values)
+    if not data:
+        return None
+    p = min(100.0, max(0.0, float(p)))
+    rank = max(1, math.ceil(p / 100.0 * len(data)))
+    return data[rank - 1]
+
+
+def summarize(values: Iterable[float], ps: Iterable[float] = (50, 95, 99)) -> Dict[str, float]:
+    """
+    {"count", "min", "max", "mean", "p50", "p95", "p99"} (rounded, seconds in -> seconds out).
+    """
+    data = sorted(values)
+    if not data:
+        return {"count": 0}
+    out: Dict[str, float] = {
+        "count": len(data),
+        "min": round(data[0], 4),
+        "max": round(data[-1], 4),
+        "mean": round(sum(data) / len(data), 4),
+    }
+    for p in ps:
+        out[f"p{int(p)}"] = round(percentile(data, p) or 0.0, 4)
+    return out
@@ -1,12 +1,18 @@
 # core/storage.py
 from __future__ import annotations
 
+import asyncio
 import json
 import os
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+from config import CONFIG
+from core.metrics import ARTIFACT_BYTES, ARTIFACT_WRITES
 from core.run_context import slugify
+from core.tracing import current_span, current_tracer
 
 
 def ensure_dirs(project: str, run_id: str) -> Dict[str, Path]:
@@ -29,14 +35,54 @@ def ensure_dirs(project: str, run_id: str) -> Dict[str, Path]:
     }
 
 
-def write_json(path: Path, data: Dict[str, Any]) -> None:
+def atomic_write_text(path: Path, content: str, fsync: str = "never") -> int:
+    """
+    Write to a hidden temp file in the same folder, then rename over the target,
+    so readers (dashboard) never see a half-written file.
+    fsync: "never" | "file" (fsync data before rename) | "dir" (file + folder entry).
+    Returns bytes written.
+    """
+    path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    data = (content or "").encode("utf-8")
+    tmp = path.parent / f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            if fsync in ("file", "dir"):
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+    if fsync == "dir" and hasattr(os, "O_DIRECTORY"):
+        fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    return len(data)
+
+
+def _json_text(data: Dict[str, Any]) -> str:
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def write_json(path: Path, data: Dict[str, Any]) -> None:
+    atomic_write_text(path, _json_text(data), fsync=_fsync_policy())
 
 
 def write_text(path: Path, content: str) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content or "", encoding="utf-8")
+    atomic_write_text(path, content or "", fsync=_fsync_policy())
+
+
+def _fsync_policy() -> str:
+    return str(CONFIG.get("storage", {}).get("fsync", "never"))
 
 
 def save_run_context(dirs: Dict[str, Path], run_context: Dict[str, Any]) -> None:
@@ -48,4 +94,169 @@ def save_agent_output(dirs: Dict[str, Path], agent_output: Dict[str, Any]) -> Pa
     content = agent_output.get("content", "")
     out_path = dirs["runs"] / filename
     write_text(out_path, content)
+    _count_artifact(content)
+    return out_path
+
+
+# ----------------------------
+# Async batched writer (keeps storage off the agent critical path)
+# ----------------------------
+def _write_batch(items: List[Tuple[Path, str]], fsync: str) -> Dict[Path, Any]:
+    """Runs in a worker thread. Returns {path: bytes_written | Exception}."""
+    out: Dict[Path, Any] = {}
+    for path, content in items:
+        try:
+            out[path] = atomic_write_text(path, content, fsync=fsync)
+        except Exception as e:
+            out[path] = e
+    return out
+
+
+class ArtifactWriter:
+    """
+    Background task + bounded queue. Writes are batched (up to batch_size per
+    thread hop), a path queued twice in one batch is written once (last wins),
+    and every file is written atomically.
+
+    submit() applies backpressure when the queue is full; flush(run_key) waits
+    until everything submitted for that run is on disk (and raises the first error).
+    One writer per event loop (see get_writer).
+    """
+
+    def __init__(self, queue_size: int = 256, batch_size: int = 32, fsync: str = "never"):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, int(queue_size)))
+        self.batch_size = max(1, int(batch_size))
+        self.fsync = fsync
+        self._pending: Dict[str, Set[asyncio.Future]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.counters: Dict[str, int] = {"writes": 0, "batches": 0, "coalesced": 0, "bytes": 0, "errors": 0}
+
+    async def submit(self, path: Path, content: str, run_key: str = "") -> asyncio.Future:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+        fut = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(run_key, set())
+        pending.add(fut)
+        fut.add_done_callback(pending.discard)
+        tracer = current_tracer()  # the write is traced on the run that queued it
+        trace = (tracer, current_span()) if tracer is not None else None
+        await self.queue.put((Path(path), content or "", fut, trace))
+        return fut
+
+    async def flush(self, run_key: Optional[str] = None) -> None:
+        if run_key is None:
+            futs = [f for group in self._pending.values() for f in group]
+        else:
+            futs = list(self._pending.get(run_key, ()))
+        if not futs:
+            return
+        results = await asyncio.gather(*futs, return_exceptions=True)
+        if run_key is not None and not self._pending.get(run_key):
+            self._pending.pop(run_key, None)
+        for r in results:
+            if isinstance(r, BaseException):
+                raise r
+
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            latest: Dict[Path, str] = {}
+            for path, content, _, _ in batch:
+                latest[path] = content  # last write per path wins
+            self.counters["coalesced"] += len(batch) - len(latest)
+
+            results: Dict[Path, Any] = {}
+            started = time.perf_counter()
+            try:
+                results = await asyncio.to_thread(_write_batch, list(latest.items()), self.fsync)
+            except BaseException as e:
+                for _, _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(e if isinstance(e, Exception) else RuntimeError("writer stopped"))
+                raise
+            ended = time.perf_counter()
+
+            self.counters["batches"] += 1
+            for path, content, fut, trace in batch:
+                if trace is not None:
+                    tracer, parent = trace
+                    tracer.add(f"write {path.name}", "storage", started, ended, parent=parent,
+                               bytes_out=len(content.encode("utf-8")), batch=len(batch))
+                r = results.get(path)
+                if isinstance(r, Exception):
+                    self.counters["errors"] += 1
+                    if not fut.done():
+                        fut.set_exception(r)
+                else:
+                    if not fut.done():
+                        fut.set_result(path)
+            for r in results.values():
+                if not isinstance(r, Exception):
+                    self.counters["writes"] += 1
+                    self.counters["bytes"] += int(r)
+
+
+_WRITERS: Dict[int, Tuple[asyncio.AbstractEventLoop, ArtifactWriter]] = {}
+_WRITERS_LOCK = threading.Lock()
+
+
+def get_writer() -> ArtifactWriter:
+    """The writer of the running event loop (created on first use from CONFIG["storage"])."""
+    loop = asyncio.get_running_loop()
+    with _WRITERS_LOCK:
+        for key in [k for k, (lp, _) in _WRITERS.items() if lp.is_closed()]:
+            del _WRITERS[key]
+        entry = _WRITERS.get(id(loop))
+        if entry is None:
+            cfg = CONFIG.get("storage", {})
+            entry = (loop, ArtifactWriter(
+                queue_size=cfg.get("queue_size", 256),
+                batch_size=cfg.get("batch_size", 32),
+                fsync=str(cfg.get("fsync", "never")),
+            ))
+            _WRITERS[id(loop)] = entry
+        return entry[1]
+
+
+def queue_depth() -> int:
+    """Writes waiting across every live writer (all event loops)."""
+    with _WRITERS_LOCK:
+        writers = [w for lp, w in _WRITERS.values() if not lp.is_closed()]
+    return sum(w.depth() for w in writers)
+
+
+def _count_artifact(content: Optional[str]) -> None:
+    ARTIFACT_WRITES.inc()
+    ARTIFACT_BYTES.inc(len((content or "").encode("utf-8")))
+
+
+def _run_key(dirs: Dict[str, Path]) -> str:
+    return str(dirs["runs"])
+
+
+async def save_run_context_async(dirs: Dict[str, Path], run_context: Dict[str, Any]) -> None:
+    await get_writer().submit(dirs["runs"] / "run_context.json", _json_text(run_context), _run_key(dirs))
+
+
+async def save_agent_output_async(dirs: Dict[str, Path], agent_output: Dict[str, Any]) -> Path:
+    filename = agent_output.get("save_as", "output.txt")
+    out_path = dirs["runs"] / filename
+    content = agent_output.get("content", "")
+    await get_writer().submit(out_path, content, _run_key(dirs))
+    _count_artifact(content)
     return out_path
+
+
+async def flush_run(dirs: Dict[str, Path]) -> None:
+    """Returns once every artifact queued for this run is on disk."""
+    await get_writer().flush(_run_key(dirs))
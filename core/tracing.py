@@ -0,0 +1,131 @@
+# core/tracing.py
+from __future__ import annotations
+
+import contextvars
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+
+@dataclass
+class Span:
+    id: int
+    name: str
+    kind: str  # run | director | routing | agent | queue | exec | normalize | storage
+    start: float  # perf_counter
+    end: Optional[float] = None
+    parent: Optional[int] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+
+_CURRENT_TRACER: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar("tracer", default=None)
+_CURRENT_SPAN: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("span", default=None)
+
+
+class Tracer:
+    """
+    In-process span recorder for one run. Parents follow the asyncio task
+    context, so spans opened inside concurrently running agents nest correctly.
+    Times are perf_counter; to_list() reports them in seconds since `origin`.
+    """
+
+    def __init__(self, origin: Optional[float] = None):
+        self.origin = origin if origin is not None else time.perf_counter()
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()  # storage spans are added from the writer
+
+    @contextmanager
+    def span(self, name: str, kind: str = "", **attrs: Any) -> Iterator[Span]:
+        sp = self.start(name, kind, **attrs)
+        token = _CURRENT_SPAN.set(sp.id)
+        try:
+            yield sp
+        except BaseException as e:
+            sp.attrs["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _CURRENT_SPAN.reset(token)
+            sp.end = time.perf_counter()
+
+    def start(self, name: str, kind: str = "", **attrs: Any) -> Span:
+        sp = Span(id=next(self._ids), name=name, kind=kind or name, start=time.perf_counter(),
+                  parent=_CURRENT_SPAN.get(), attrs=dict(attrs))
+        with self._lock:
+            self.spans.append(sp)
+        return sp
+
+    def add(self, name: str, kind: str, start: float, end: float, parent: Optional[int] = None, **attrs: Any) -> Span:
+        """Records a span measured elsewhere (e.g. executor queue wait, a storage batch)."""
+        sp = Span(id=next(self._ids), name=name, kind=kind, start=start, end=end,
+                  parent=parent if parent is not None else _CURRENT_SPAN.get(), attrs=dict(attrs))
+        with self._lock:
+            self.spans.append(sp)
+        return sp
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            spans = list(self.spans)
+        now = time.perf_counter()
+        out = []
+        for sp in sorted(spans, key=lambda s: s.start):
+            end = sp.end if sp.end is not None else now
+            out.append({
+                "id": sp.id,
+                "parent": sp.parent,
+                "name": sp.name,
+                "kind": sp.kind,
+                "start": round(sp.start - self.origin, 6),
+                "end": round(end - self.origin, 6),
+                "duration": round(end - sp.start, 6),
+                **({"attrs": sp.attrs} if sp.attrs else {}),
+            })
+        return out
+
+    def summary(self, top: int = 5) -> Dict[str, Any]:
+        """Small digest for run_context.json: totals per kind + the slowest spans."""
+        spans = self.to_list()
+        by_kind: Dict[str, Dict[str, float]] = {}
+        for s in spans:
+            k = by_kind.setdefault(s["kind"], {"count": 0, "total_sec": 0.0})
+            k["count"] += 1
+            k["total_sec"] = round(k["total_sec"] + s["duration"], 6)
+        slowest = sorted((s for s in spans if s["kind"] != "run"), key=lambda s: -s["duration"])[:top]
+        return {
+            "spans": len(spans),
+            "wall_sec": round(max((s["end"] for s in spans), default=0.0), 6),
+            "by_kind": by_kind,
+            "slowest": [{"name": s["name"], "duration": s["duration"]} for s in slowest],
+            "file": "trace.json",
+        }
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _CURRENT_TRACER.get()
+
+
+def current_span() -> Optional[int]:
+    return _CURRENT_SPAN.get()
+
+
+def activate(tracer: Optional[Tracer]) -> contextvars.Token:
+    """Makes `tracer` the tracer of this task (and the tasks it spawns)."""
+    return _CURRENT_TRACER.set(tracer)
+
+
+def deactivate(token: contextvars.Token) -> None:
+    _CURRENT_TRACER.reset(token)
+
+
+@contextmanager
+def span(name: str, kind: str = "", **attrs: Any) -> Iterator[Optional[Span]]:
+    """Span on the current tracer; a no-op outside a traced run."""
+    tracer = _CURRENT_TRACER.get()
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(name, kind, **attrs) as sp:
+        yield sp
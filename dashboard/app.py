@@ -2,8 +2,6 @@
 import sys
 import os
 import time
-import asyncio
-import re
 import html
 import glob
 import json
@@ -13,10 +11,13 @@ from datetime import datetime
 # Ensure root path is included for imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from dashboard.orchestrator import run_agents
-from agents.coder import coder  # used only if you ever want local-only fast mode (not used in Phase 2 path)
+from dashboard.service import get_service
 from state import init_session, log_message
 from config import CONFIG
+from core.run_index import get_run_index
+from core.contracts import parse_code_blocks
+from core.profiling import profiling_enabled
+from preview import extract_app, get_preview_manager
 
 # ----------------------------
 # Page setup
@@ -84,22 +85,6 @@ emoji_map = {
 }
 
 
-def parse_code_blocks(text: str):
-    """
-    Returns list of dicts:
-    [{"lang": "python", "code": "...", "raw": "```python ...```"}, ...]
-    plus remaining plain text.
-    """
-    blocks = []
-    pattern = r"```(\w+)?\s*([\s\S]*?)```"
-    for m in re.finditer(pattern, text or ""):
-        lang = (m.group(1) or "").strip() or "text"
-        code = (m.group(2) or "").strip()
-        blocks.append({"lang": lang, "code": code, "raw": m.group(0)})
-    plain = re.sub(pattern, "", text or "").strip()
-    return blocks, plain
-
-
 def get_last_output(prefer=("Scribe", "Coder", "Planner", "Designer", "Researcher", "QA", "Director", "System")):
     for name, msg_obj in reversed(st.session_state.get("messages", [])):
         if name in prefer:
@@ -108,21 +93,35 @@ def get_last_output(prefer=("Scribe", "Coder", "Planner", "Designer", "Researche
     return None, ""
 
 
+@st.cache_resource
+def run_index():
+    """Shared run index; backfilled from run_context.json files the first time it is empty."""
+    index = get_run_index()
+    if index is not None and index.count() == 0:
+        index.rebuild()
+    return index
+
+
 def list_scribe_files(limit=10, project_slug=None, run_id=None):
     """
     Supports BOTH legacy: memory/scribe_log_*.md
     AND new: projects/{project}/runs/{run_id}/scribe.md (or any scribe*.md)
+    Served from the run index (one query); globs only when the index is disabled.
     """
+    index = run_index()
+    if index is not None:
+        return [f for f in index.scribe_files(project=project_slug, run_id=run_id, limit=limit) if os.path.isfile(f)]
+
     files = []
-    # Legacy
-    files.extend(sorted(glob.glob(os.path.join("memory", "scribe_log_*.md")), reverse=True))
-    # Project-based
+    # Project-based first (same order as the index)
     if project_slug:
         base = os.path.join("projects", project_slug, "runs")
         if run_id:
             files.extend(sorted(glob.glob(os.path.join(base, run_id, "scribe*.md")), reverse=True))
         else:
             files.extend(sorted(glob.glob(os.path.join(base, "*", "scribe*.md")), reverse=True))
+    # Legacy
+    files.extend(sorted(glob.glob(os.path.join("memory", "scribe_log_*.md")), reverse=True))
     # De-dupe while preserving order
     seen = set()
     out = []
@@ -133,6 +132,57 @@ def list_scribe_files(limit=10, project_slug=None, run_id=None):
     return out[:limit]
 
 
+def list_run_files(project, run_id, run_folder, limit=18):
+    """File names of one run, from the index (falls back to listing the folder)."""
+    index = run_index()
+    if index is not None:
+        return [a["name"] for a in index.artifacts(project, run_id)][:limit]
+    return [os.path.basename(fp) for fp in sorted(glob.glob(os.path.join(run_folder, "*")))][:limit]
+
+
+TRACE_COLORS = {
+    "director": "#c678dd",
+    "routing": "#56b6c2",
+    "agent": "#61afef",
+    "queue": "#5c6370",
+    "exec": "#98c379",
+    "normalize": "#e5c07b",
+    "storage": "#d19a66",
+}
+
+
+def load_trace(run_folder):
+    """Spans of a saved run (trace.json in the run folder), [] if it has none."""
+    try:
+        with open(os.path.join(run_folder, "trace.json"), "r", encoding="utf-8") as f:
+            return json.load(f).get("spans") or []
+    except Exception:
+        return []
+
+
+def waterfall_html(spans):
+    """One row per span, bar offset/width as a share of the run's wall time; children indented."""
+    wall = max((float(s.get("end", 0)) for s in spans), default=0.0) or 1.0
+    depth = {}
+    rows = []
+    for s in spans:  # sorted by start, so a parent is always seen before its children
+        depth[s["id"]] = depth.get(s.get("parent"), -1) + 1 if s.get("parent") in depth else 0
+        left = 100.0 * float(s["start"]) / wall
+        width = max(0.4, 100.0 * float(s["duration"]) / wall)
+        attrs = s.get("attrs") or {}
+        tip = f"{s['name']} [{s['kind']}] {s['duration'] * 1000:.1f} ms " + " ".join(f"{k}={v}" for k, v in attrs.items())
+        rows.append(
+            f"<div style='display:flex;align-items:center;gap:6px;font-size:0.78rem;margin:1px 0' title='{html.escape(tip)}'>"
+            f"<div class='mono' style='width:38%;padding-left:{depth[s['id']] * 10}px;white-space:nowrap;overflow:hidden;"
+            f"text-overflow:ellipsis'>{html.escape(s['name'])}</div>"
+            f"<div style='position:relative;flex:1;height:10px;background:#22262b;border-radius:3px'>"
+            f"<div style='position:absolute;left:{left:.2f}%;width:{width:.2f}%;height:100%;border-radius:3px;"
+            f"background:{TRACE_COLORS.get(s['kind'], '#abb2bf')}'></div></div>"
+            f"<div class='mono' style='width:58px;text-align:right'>{s['duration'] * 1000:.0f} ms</div></div>"
+        )
+    return "".join(rows)
+
+
 def render_message(name, text, timestamp, is_user):
     align = "flex-end" if is_user else "flex-start"
     bubble_class = "user" if is_user else "agent"
@@ -193,21 +243,54 @@ def safe_read_text(fp: str) -> str:
         return ""
 
 
-def run_agents_sync(goal: str, project: str, mode: str, model: str):
-    """
-    Safe runner for async orchestrator from Streamlit.
-    Prefer asyncio.run, but protect against environments that already have a loop.
+@st.cache_resource
+def orchestrator_service():
+    """One orchestrator loop per Streamlit server, shared by every session."""
+    return get_service()
+
+
+def live_bubble_html(name: str, text: str, status: str) -> str:
+    avatar = emoji_map.get(name, "🤖")
+    return f"""
+    <div class='bubble agent {html.escape(name)}'>
+      <div class="avatar {html.escape(name)}">{html.escape(avatar)}</div>
+      <div class='bubble-inner'>
+        <div style='font-weight:800; margin-bottom: 0.35em;'>{html.escape(name)} <span class='small'>{html.escape(status)}</span></div>
+        <div style='white-space: pre-wrap;'>{html.escape(text)}</div>
+      </div>
+    </div>
     """
+
+
+def render_live_job(snap, live):
+    """Draws one bubble per agent of an in-flight job into `live` (an st.empty)."""
+    with live.container():
+        st.caption(f"🧠 Thinking… {snap['elapsed']:.1f}s")
+        for name, text, status in snap["agents"]:
+            st.markdown(live_bubble_html(name, text, status), unsafe_allow_html=True)
+
+
+def finish_job(snap):
+    """Moves a finished job's result into the session (conversation + saved run)."""
+    if snap["status"] == "failed" or not snap["result"]:
+        now = datetime.now().strftime("%H:%M:%S")
+        log_message("System", {"text": f"❌ Error during agent execution: {snap['error']}", "timestamp": now})
+        return
+
+    ctx, dirs, logs = snap["result"]
+    st.session_state["last_run_context"] = ctx
     try:
-        loop = asyncio.get_running_loop()
-        # If already inside an event loop, schedule task and wait
-        task = loop.create_task(run_agents(goal=goal, project=project, mode=mode, model=model))
-        return loop.run_until_complete(task)  # type: ignore[attr-defined]
-    except RuntimeError:
-        return asyncio.run(run_agents(goal=goal, project=project, mode=mode, model=model))
+        st.session_state["last_run_dirs"] = {k: str(v) for k, v in dirs.items()}
     except Exception:
-        # Final fallback
-        return asyncio.run(run_agents(goal=goal, project=project, mode=mode, model=model))
+        st.session_state["last_run_dirs"] = None
+
+    # Stable ordering in UI
+    order = ["Director", "Planner", "Researcher", "Coder", "Designer", "Scribe", "QA", "System"]
+    for name in order:
+        if name in logs:
+            now = datetime.now().strftime("%H:%M:%S")
+            content = logs[name].get("content", "")
+            log_message(name, {"text": str(content), "timestamp": now})
 
 
 # ----------------------------
@@ -221,6 +304,8 @@ if "last_run_dirs" not in st.session_state:
     st.session_state["last_run_dirs"] = None  # dict
 if "_copy_last" not in st.session_state:
     st.session_state["_copy_last"] = ""
+if "job_id" not in st.session_state:
+    st.session_state["job_id"] = None  # in-flight OrchestratorService job of this session
 
 # ----------------------------
 # Layout: Left / Center / Right
@@ -238,11 +323,17 @@ with left:
         help="Project slug (folder name). Saves to projects/{project}/runs/{run_id}/",
     )
 
+    # per session: the run gets it as its model; CONFIG["llm_config"] is shared by every session
     model_choice = st.selectbox("🧠 Choose Model", ["phi3:latest", "gemma3:latest", "tinyllama:latest"])
-    CONFIG["llm_config"]["model"] = model_choice
 
     mode = st.radio("🚀 Execution Mode", ["Team Mode", "Fast Mode (Coder Only)"], horizontal=False)
 
+    profile_runs = st.checkbox(
+        "🔬 Profile runs",
+        value=profiling_enabled(),
+        help="Saves profile.pstats + profile.collapsed in the run folder and lists the hottest functions.",
+    )
+
     st.markdown("<hr/>", unsafe_allow_html=True)
 
     # Run status badge
@@ -307,38 +398,29 @@ with center:
         now = datetime.now().strftime("%H:%M:%S")
         log_message("User", {"text": goal, "timestamp": now})
 
-        with st.spinner("🧠 Thinking..."):
-            start = time.time()
-
-            try:
-                # Phase 2: ALWAYS run orchestrator (even fast mode) so everything gets saved
-                ctx, dirs, logs = run_agents_sync(
-                    goal=goal,
-                    project=st.session_state["project"],
-                    mode=mode,  # orchestrator decides "fast" vs "team"
-                    model=CONFIG["llm_config"]["model"],
-                )
-
-                st.session_state["last_run_context"] = ctx
-                try:
-                    st.session_state["last_run_dirs"] = {k: str(v) for k, v in dirs.items()}
-                except Exception:
-                    st.session_state["last_run_dirs"] = None
-
-                # Stable ordering in UI
-                order = ["Director", "Planner", "Researcher", "Coder", "Designer", "Scribe", "QA", "System"]
-                for name in order:
-                    if name in logs:
-                        now = datetime.now().strftime("%H:%M:%S")
-                        content = logs[name].get("content", "")
-                        log_message(name, {"text": str(content), "timestamp": now})
-
-            except Exception as e:
-                now = datetime.now().strftime("%H:%M:%S")
-                log_message("System", {"text": f"❌ Error during agent execution: {e}", "timestamp": now})
-
-            duration = time.time() - start
-            st.success(f"✅ Done in {duration:.2f}s")
+        # Phase 2: ALWAYS run orchestrator (even fast mode) so everything gets saved.
+        # The run happens on the shared service loop; this script only polls it.
+        job = orchestrator_service().submit(
+            goal=goal,
+            project=st.session_state["project"],
+            mode=mode,  # orchestrator decides "fast" vs "team"
+            model=model_choice,
+            profile=profile_runs,
+        )
+        st.session_state["job_id"] = job.id
+
+    job_id = st.session_state.get("job_id")
+    job = orchestrator_service().job(job_id) if job_id else None
+    if job_id and job is None:
+        st.session_state["job_id"] = None  # server restarted / job expired
+    elif job is not None:
+        snap = job.snapshot()
+        if snap["status"] in ("done", "failed"):
+            st.session_state["job_id"] = None
+            finish_job(snap)
+            st.success(f"✅ Done in {snap['elapsed']:.2f}s")
+        else:
+            render_live_job(snap, st.empty())
 
     # Conversation
     st.markdown("### 📜 Conversation")
@@ -374,19 +456,78 @@ with right:
         st.markdown(f"- **Run ID:** `{ctx.get('run_id','')}`")
         st.markdown(f"- **Project:** `{ctx.get('project','')}`")
         st.markdown(f"- **Runs folder:** `{dirs.get('runs','')}`")
+        similar = ctx.get("similar") or {}
+        if similar:
+            verb = "♻️ Reused" if similar.get("action") == "reuse" else "🔥 Warm start from"
+            st.markdown(f"- **{verb}:** `{similar.get('run_id','')}` (similarity {similar.get('similarity', 0):.2f})")
 
         run_folder = dirs.get("runs", "")
         try:
-            files = sorted(glob.glob(os.path.join(run_folder, "*")))
+            files = list_run_files(ctx.get("project", ""), ctx.get("run_id", ""), run_folder)
             if files:
                 st.markdown("**Files:**")
-                for fp in files[:18]:
-                    st.caption(os.path.basename(fp))
+                for name in files:
+                    st.caption(name)
             else:
                 st.caption("No files found in run folder yet.")
         except Exception:
             st.caption("Could not list run files.")
 
+    # Profile of the last run (only when profiling was on for it)
+    prof = ctx.get("profile") or {}
+    if prof.get("top"):
+        st.markdown("<hr/>", unsafe_allow_html=True)
+        st.markdown("### 🔬 Profile")
+        st.caption(f"{prof.get('samples', 0)} stack samples · {prof.get('wall_sec', 0)}s · files: {prof['pstats']}, {prof['collapsed']}")
+        st.dataframe(prof["top"][:15], use_container_width=True, hide_index=True)
+        for b in prof.get("blocking") or []:
+            st.caption(f"⚠️ loop blocked {b.get('ms', 0)} ms at +{b['at']}s in {b['where']}")
+    elif prof.get("skipped"):
+        st.caption(f"🔬 Profile skipped: {prof['skipped']}")
+
+    # Previews of generated apps (one streamlit server per file, reused / reaped by the manager)
+    previews = get_preview_manager()
+    coder_file = os.path.join(dirs.get("runs", ""), "coder_output.py") if dirs else ""
+    if coder_file and os.path.isfile(coder_file):
+        if st.button("🖥️ Preview Coder output", use_container_width=True):
+            try:
+                previews.launch(extract_app(coder_file))  # coder_output.py is markdown with fences
+            except Exception as e:
+                st.caption(f"❌ Failed to launch preview: {e}")
+
+    running = previews.status()
+    if running:
+        st.markdown("<hr/>", unsafe_allow_html=True)
+        st.markdown("### 🖥️ Previews")
+        for p in running:
+            previews.touch(str(p["app"]))  # shown on an open dashboard: not idle
+            st.markdown(
+                f"<div class='small'><a href='{html.escape(p['url'])}' target='_blank'>{html.escape(p['url'])}</a> "
+                f"<span class='badge mono'>{html.escape(os.path.basename(str(p['app'])))}</span> "
+                f"idle {int(p['idle_sec'])}s</div>",
+                unsafe_allow_html=True,
+            )
+            if st.button("⏹ Stop", key=f"stop_preview_{p['port']}"):
+                previews.stop(str(p["app"]))
+                st.rerun()
+
+    # Trace waterfall of any saved run of the project (trace.json written by run_agents)
+    trace_project = (ctx.get("project") or st.session_state.get("project") or "").strip()
+    index = run_index()
+    saved_runs = index.recent_runs(project=trace_project or None, limit=20) if index is not None else []
+    if saved_runs:
+        st.markdown("<hr/>", unsafe_allow_html=True)
+        st.markdown("### 🕒 Trace")
+        labels = {f"{r['run_id']} · {r['status']} · {(r['goal'] or '')[:40]}": r for r in saved_runs}
+        picked = labels[st.selectbox("Run", list(labels), key="trace_run")]
+        spans = load_trace(picked["runs_dir"])
+        if spans:
+            st.markdown(waterfall_html(spans), unsafe_allow_html=True)
+            legend = " · ".join(f"<span style='color:{c}'>■</span> {k}" for k, c in TRACE_COLORS.items())
+            st.markdown(f"<div class='small'>{legend}</div>", unsafe_allow_html=True)
+        else:
+            st.caption("No trace recorded for this run.")
+
     st.markdown("<hr/>", unsafe_allow_html=True)
     st.markdown("### 📝 Recent Scribe Logs")
 
@@ -409,3 +550,8 @@ with right:
             )
 
     st.markdown("</div>", unsafe_allow_html=True)
+
+# Poll the in-flight job: rerun until the service reports it done.
+if st.session_state.get("job_id"):
+    time.sleep(float(CONFIG.get("service", {}).get("poll_sec", 0.5)))
+    st.rerun()
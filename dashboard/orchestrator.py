@@ -2,74 +2,106 @@
 from __future__ import annotations
 
 import asyncio
+import copy
+import inspect
 import json
 import re
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Tuple, Optional
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple, Optional
 
-from agents.director import director
-from agents.planner import planner
-from agents.coder import coder
-from agents.researcher import researcher
-from agents.scribe import scribe
-from agents.designer import designer
-from agents.qa import qa
-
-from core.run_context import RunContext, new_run_id
+from agents.registry import get_registry
+from core.run_context import RunContext, new_run_id, slugify
 from core.contracts import normalize_output
-from core.storage import ensure_dirs, save_run_context, save_agent_output
+from core.storage import (
+    ensure_dirs,
+    flush_run,
+    save_agent_output,
+    save_agent_output_async,
+    save_run_context,
+    save_run_context_async,
+)
+from core.run_index import record_run
+from core.sandbox import execute_many
+from core.scheduler import DagScheduler, Node, NodeResult
+from core.executor import ExecStats, backend_of, get_executor
+from core.resilience import call_with_policy, policy_for
+from core.cache import get_cache, make_key
+from core.router import Intents, route
+from core.model_router import ModelChoice, get_model_router
+from core.similarity import Match, get_similarity_index
+from core.singleflight import SingleFlight
+from core.metrics import (
+    AGENT_DURATION,
+    CACHE_LOOKUPS,
+    RUN_DURATION,
+    RUNS_FINISHED,
+    RUNS_IN_FLIGHT,
+    RUNS_STARTED,
+    SIMILARITY_LOOKUPS,
+    STAGES_PRUNED,
+)
+from core.profiling import RunProfiler, profiling_enabled
+from core.tracing import Tracer, activate, current_tracer, deactivate, span
+from config import CONFIG
 
 
-AGENTS = {
-    "Planner": planner,
-    "Researcher": researcher,
-    "Coder": coder,
-    "Designer": designer,
-    "Scribe": scribe,
-    "QA": qa,
-}
+# name -> agent, instantiated on first lookup (built-ins + "aidt.agents" entry points)
+AGENTS = get_registry()
 
 ORDER = ["Director", "Planner", "Researcher", "Coder", "Designer", "Scribe", "QA", "System"]
 
+CORE_AGENTS = ["Planner", "Researcher", "Coder", "Designer"]
+
+DEFAULT_FILES = {
+    "Planner": "planner.json",
+    "Researcher": "researcher.json",
+    "Designer": "designer.json",
+    "Coder": "coder_output.py",
+    "Scribe": "scribe.md",
+    "QA": "qa.json",
+}
+
+# stage label attached to streamed events
+STAGES = {"Director": "director", "Scribe": "scribe", "QA": "qa"}
+
+# Event callback: receives {"type": ..., "agent": ..., "stage": ..., ...}
+EventFn = Callable[[Dict[str, Any]], None]
+
+DEFAULT_TITLES = {
+    "Scribe": "Final Summary",
+    "QA": "QA Review",
+}
+
+# Input edges used when a subtask does not declare its own ("inputs" / "optional_inputs").
+# Optional inputs are waited for, but a failed one does not block the node (partial draft).
+DEFAULT_INPUTS: Dict[str, Dict[str, List[str]]] = {
+    "Scribe": {"requires": [], "optional": CORE_AGENTS},
+    "QA": {"requires": ["Scribe"], "optional": CORE_AGENTS},
+}
+
 
 # ----------------------------
 # Intent Router (CRITICAL)
 # ----------------------------
+# One compiled, word-boundary pass per goal (core.router); these wrappers keep the old API.
 def _needs_code(goal: str) -> bool:
-    g = (goal or "").lower()
-    keywords = [
-        "code", "script", "python", "streamlit", "html", "css", "javascript", "js",
-        "react", "api", "bug", "error", "fix", "build", "implement", "template"
-    ]
-    return any(k in g for k in keywords)
+    return route(goal).code
 
 
 def _needs_ui(goal: str) -> bool:
-    g = (goal or "").lower()
-    keywords = ["ui", "ux", "design", "layout", "page", "screen", "dashboard", "frontend"]
-    return any(k in g for k in keywords)
+    return route(goal).ui
 
 
 def _is_simple_factual(goal: str) -> bool:
-    g = (goal or "").strip().lower()
-    if not g:
-        return True
-
-    # short/simple
-    if len(g.split()) <= 6 and not _needs_code(g) and not _needs_ui(g):
-        return True
-
-    factual_triggers = [
-        "days of week", "day of week",
-        "capital of", "meaning of", "define", "definition",
-        "what is", "who is", "list of", "tell me"
-    ]
-    return any(t in g for t in factual_triggers) and not _needs_code(g)
+    return route(goal).simple_factual
 
 
-def build_subtasks(goal: str, mode: str) -> List[Dict[str, str]]:
+def build_subtasks(goal: str, mode: str) -> List[Dict[str, Any]]:
     """
-    Returns list of {"agent": "...", "task": "..."}.
+    Returns list of {"agent": "...", "task": "...", "inputs": [...], "optional_inputs": [...]}.
+    "inputs"/"optional_inputs" are the explicit input edges of the agent (optional keys).
     Ensures we do not run pointless agents for simple questions.
     """
     g = goal or ""
@@ -78,29 +110,50 @@ def build_subtasks(goal: str, mode: str) -> List[Dict[str, str]]:
     if "fast" in (mode or "").lower():
         return [{"agent": "Coder", "task": g}]
 
+    intents = route(g)
+
     # Simple factual: answer directly, no code unless requested
-    if _is_simple_factual(g):
+    if intents.simple_factual:
         return [
             {"agent": "Planner", "task": f"Answer the user directly and clearly: {g}"},
             {"agent": "Researcher", "task": f"Add 2–4 helpful facts/examples ONLY if relevant: {g}"},
-            {"agent": "Scribe", "task": f"Write the FINAL answer for the user. Put the direct answer first. Goal: {g}"},
-            {"agent": "QA", "task": f"Check the final answer is correct and not generic. If wrong, correct it. Goal: {g}"},
+            {
+                "agent": "Scribe",
+                "task": f"Write the FINAL answer for the user. Put the direct answer first. Goal: {g}",
+                "optional_inputs": ["Planner", "Researcher"],
+            },
+            {
+                "agent": "QA",
+                "task": f"Check the final answer is correct and not generic. If wrong, correct it. Goal: {g}",
+                "inputs": ["Scribe"],
+                "optional_inputs": ["Planner", "Researcher"],
+            },
         ]
 
     # Normal mode: structured + tips
-    subtasks: List[Dict[str, str]] = [
+    subtasks: List[Dict[str, Any]] = [
         {"agent": "Planner", "task": f"Create a structured answer or plan for: {g}"},
         {"agent": "Researcher", "task": f"Add best practices, pitfalls, and tips for: {g}"},
     ]
 
-    if _needs_code(g):
+    if intents.code:
         subtasks.append({"agent": "Coder", "task": f"Provide working code/templates for: {g}. Return code where possible."})
 
-    if _needs_ui(g):
+    if intents.ui:
         subtasks.append({"agent": "Designer", "task": f"Suggest UI/UX layout and components for: {g}."})
 
-    subtasks.append({"agent": "Scribe", "task": f"Write the FINAL answer for the user. Put the answer first, then details. Goal: {g}"})
-    subtasks.append({"agent": "QA", "task": f"Review outputs and final draft for: {g}. Correct mistakes and tighten."})
+    core = [s["agent"] for s in subtasks]
+    subtasks.append({
+        "agent": "Scribe",
+        "task": f"Write the FINAL answer for the user. Put the answer first, then details. Goal: {g}",
+        "optional_inputs": core,
+    })
+    subtasks.append({
+        "agent": "QA",
+        "task": f"Review outputs and final draft for: {g}. Correct mistakes and tighten.",
+        "inputs": ["Scribe"],
+        "optional_inputs": core,
+    })
     return subtasks
 
 
@@ -148,28 +201,413 @@ def _extract_director_payload(director_reply: Any) -> Optional[Dict[str, Any]]:
     return None
 
 
-async def _run_agent(agent_obj: Any, message: str) -> Tuple[str, Any]:
-    if asyncio.iscoroutinefunction(agent_obj.generate_reply):
-        reply = await agent_obj.generate_reply([{"role": "user", "content": message}])
+async def _run_agent(
+    agent_obj: Any,
+    message: str,
+    on_chunk: Optional[Callable[[str], None]] = None,
+) -> Tuple[str, Any, ExecStats]:
+    """
+    Streaming agents (async-generator `stream_reply(messages)`) are iterated and
+    every chunk goes to on_chunk; the reply is the joined chunks.
+    Async agents are awaited on the loop; sync agents run in the executor's
+    per-backend thread pool so they never block the event loop.
+    """
+    messages = [{"role": "user", "content": message}]
+    submitted = time.perf_counter()
+    stream = getattr(agent_obj, "stream_reply", None)
+    if stream is not None and inspect.isasyncgenfunction(stream):
+        started = time.perf_counter()
+        parts: List[str] = []
+        async for chunk in stream(messages):
+            chunk = str(chunk or "")
+            parts.append(chunk)
+            if on_chunk is not None and chunk:
+                on_chunk(chunk)
+        reply = "".join(parts)
+        stats = ExecStats(backend="stream", exec_time=time.perf_counter() - started)
+    elif asyncio.iscoroutinefunction(agent_obj.generate_reply):
+        started = time.perf_counter()
+        reply = await agent_obj.generate_reply(messages)
+        stats = ExecStats(backend="async", exec_time=time.perf_counter() - started)
     else:
-        reply = agent_obj.generate_reply([{"role": "user", "content": message}])
-    return agent_obj.name, reply
+        reply, stats = await get_executor().run(agent_obj.generate_reply, messages, backend=backend_of(agent_obj))
+    _trace_call(stats, submitted)
+    return agent_obj.name, reply, stats
+
+
+def _trace_call(stats: ExecStats, submitted: float) -> None:
+    """queue-wait and execution of one attempt as child spans of the calling agent's span."""
+    tracer = current_tracer()
+    if tracer is None:
+        return
+    picked = submitted + stats.queue_wait
+    if stats.queue_wait > 0:
+        tracer.add("queue", "queue", submitted, picked, backend=stats.backend)
+    tracer.add("exec", "exec", picked, picked + stats.exec_time, backend=stats.backend)
+
+
+_HEDGE_AGENTS: Dict[Tuple[str, str], Any] = {}
+
+
+def _hedge_agent(name: str, agent_obj: Any) -> Optional[Any]:
+    """
+    Clone of the (already routed) agent pointed at the second backend: its own llm
+    config (model / max_tokens the router chose) + CONFIG["resilience"]["hedge"]["llm_config"].
+    """
+    overrides = (CONFIG.get("resilience", {}).get("hedge", {}) or {}).get("llm_config") or {}
+    if not overrides or not hasattr(agent_obj, "with_llm_config"):
+        return None
+    llm = getattr(agent_obj, "llm", None)
+    cfg = {**(llm if isinstance(llm, dict) else CONFIG.get("llm_config", {})), **overrides}
+    key = (name, json.dumps(cfg, sort_keys=True, default=str))
+    if key not in _HEDGE_AGENTS:
+        _HEDGE_AGENTS[key] = agent_obj.with_llm_config(**cfg)
+    return _HEDGE_AGENTS[key]
+
+
+_ROUTED_AGENTS: Dict[Tuple[int, str, Any], Any] = {}
+
+
+def _routed_agent(agent_obj: Any, choice: ModelChoice) -> Any:
+    """The agent pointed at the chosen model (same backend); a cached clone when the model differs."""
+    llm = getattr(agent_obj, "llm", None)
+    if not isinstance(llm, dict) or not hasattr(agent_obj, "with_llm_config"):
+        return agent_obj
+    if llm.get("model") == choice.model and choice.max_tokens in (None, llm.get("max_tokens")):
+        return agent_obj
+    key = (id(agent_obj), choice.model, choice.max_tokens)
+    if key not in _ROUTED_AGENTS:
+        overrides = {**llm, "model": choice.model}
+        if choice.max_tokens is not None:
+            overrides["max_tokens"] = choice.max_tokens
+        _ROUTED_AGENTS[key] = agent_obj.with_llm_config(**overrides)
+    return _ROUTED_AGENTS[key]
+
+
+def _cache_key(name: str, agent_obj: Any, message: str, model: str) -> str:
+    llm = getattr(agent_obj, "llm", None) or CONFIG.get("llm_config", {})
+    return make_key(
+        agent=name,
+        system_message=str(getattr(agent_obj, "system_message", "") or ""),
+        task=message,
+        model=model,
+        temperature=llm.get("temperature"),
+        max_tokens=llm.get("max_tokens"),
+    )
+
+
+async def _call_agent(
+    name: str,
+    agent_obj: Any,
+    message: str,
+    model: str = "",
+    use_cache: bool = True,
+    on_event: Optional[EventFn] = None,
+) -> Tuple[Any, ExecStats, Dict[str, Any]]:
+    """
+    Response cache -> _run_agent + per-agent deadline, jittered retries and optional hedging.
+    Returns (reply, exec_stats, call_info); raises once every attempt failed.
+    Streamed chunks are sent to on_event; a retry first sends a "reset" event.
+    Hedging is off for streaming agents (two interleaved streams would be garbage).
+    """
+    cache = get_cache() if use_cache else None
+    key = ""
+    if cache is not None:
+        key = _cache_key(name, agent_obj, message, model)
+        hit = await cache.aget(key)
+        if hit is not None:
+            return hit, ExecStats(backend="cache"), {"attempts": 0, "hedged": False, "winner": "cache", "errors": []}
+
+    stage = STAGES.get(name, "core")
+    on_chunk: Optional[Callable[[str], None]] = None
+    if on_event is not None:
+        def on_chunk(chunk: str) -> None:
+            on_event({"type": "chunk", "agent": name, "stage": stage, "chunk": chunk})
+
+    attempts = {"n": 0}
+
+    def primary():
+        attempts["n"] += 1
+        if attempts["n"] > 1 and on_event is not None:
+            on_event({"type": "reset", "agent": name, "stage": stage})
+        return _run_agent(agent_obj, message, on_chunk)
+
+    policy = policy_for(name)
+    streaming = hasattr(agent_obj, "stream_reply")
+    hedge_obj = _hedge_agent(name, agent_obj) if policy.hedge and not streaming else None
+    router = get_model_router()
+    router.begin(model)
+    stats: Optional[ExecStats] = None
+    info: Dict[str, Any] = {}
+    try:
+        (_, reply, stats), info = await call_with_policy(
+            name,
+            primary,
+            policy,
+            hedge_call=(lambda: _run_agent(hedge_obj, message)) if hedge_obj is not None else None,
+        )
+    finally:
+        # a hedge's exec time is the other backend's: not a sample of this model
+        router.end(model, stats.exec_time if stats is not None else None, sample=info.get("winner") != "hedge")
+    if cache is not None and reply is not None:
+        await cache.aput(key, reply)
+    return reply, stats, info
+
+
+# ----------------------------
+# Helpers: dependency graph
+# ----------------------------
+def _clean_subtasks(director_payload: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Validates Director subtasks: known agent + non-empty task.
+    Keeps explicit input edges if they are lists of agent names.
+    """
+    cleaned: List[Dict[str, Any]] = []
+    if not director_payload or not isinstance(director_payload.get("subtasks"), list):
+        return cleaned
+
+    for stask in director_payload["subtasks"]:
+        if not isinstance(stask, dict):
+            continue
+        a = str(stask.get("agent") or "").strip()
+        t = str(stask.get("task") or "").strip()
+        if a == "Director" or a not in AGENTS or not t:
+            continue
+        item: Dict[str, Any] = {"agent": a, "task": t}
+        for key in ("inputs", "optional_inputs"):
+            if isinstance(stask.get(key), list):
+                item[key] = [str(n) for n in stask[key] if str(n) != "Director" and str(n) in AGENTS]
+        cleaned.append(item)
+    return cleaned
+
+
+def _edges_for(stask: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    default = DEFAULT_INPUTS.get(stask["agent"], {})
+    requires = stask.get("inputs")
+    optional = stask.get("optional_inputs")
+    return (
+        list(requires) if isinstance(requires, list) else list(default.get("requires", [])),
+        list(optional) if isinstance(optional, list) else list(default.get("optional", [])),
+    )
+
+
+def _format_sections(inputs: Dict[str, Dict[str, Any]], skip: Tuple[str, ...] = ()) -> str:
+    names = [k for k in CORE_AGENTS if k in inputs] + [k for k in inputs if k not in CORE_AGENTS]
+    out = ""
+    for k in names:
+        if k in skip:
+            continue
+        out += f"\n## {k}\n{inputs[k].get('content','')}\n"
+    return out
+
+
+def _graph_plan(subtasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    One entry per agent (first subtask wins), Scribe + QA always present.
+    Edges pointing at agents that are not in the plan are dropped.
+    """
+    plan: Dict[str, Dict[str, Any]] = {}
+    for stask in subtasks:
+        if stask["agent"] not in plan:
+            plan[stask["agent"]] = stask
+    for name in ("Scribe", "QA"):
+        plan.setdefault(name, {"agent": name, "task": ""})
+
+    out: List[Dict[str, Any]] = []
+    for name, stask in plan.items():
+        requires, optional = _edges_for(stask)
+        out.append({
+            "agent": name,
+            "task": stask.get("task", ""),
+            "requires": [d for d in dict.fromkeys(requires) if d in plan and d != name],
+            "optional": [d for d in dict.fromkeys(optional) if d in plan and d != name],
+        })
+    return out
+
+
+_PY_FENCE = re.compile(r"```(?:python|py)[ \t]*\n([\s\S]*?)```", re.IGNORECASE)
+
+
+def _python_blocks(output: Dict[str, Any]) -> List[str]:
+    """Fenced python blocks of an agent output (or the whole content if it is bare python)."""
+    content = str(output.get("content") or "")
+    blocks = [b.strip() for b in _PY_FENCE.findall(content) if b.strip()]
+    if not blocks and output.get("language") == "python" and "```" not in content and content.strip():
+        blocks = [content.strip()]
+    return blocks
+
+
+async def _run_code_blocks(dirs: Dict[str, Any], output: Dict[str, Any]) -> None:
+    """Runs the blocks concurrently in the sandbox; results go to meta["runs"] + coder_runs.json."""
+    blocks = _python_blocks(output)
+    if not blocks:
+        return
+    runs = [r.to_dict() for r in await execute_many(blocks)]
+    output["meta"]["runs"] = runs
+    await save_agent_output_async(dirs, {"save_as": "coder_runs.json", "content": json.dumps(runs, indent=2)})
 
 
 # ----------------------------
 # Main Orchestrator
 # ----------------------------
+_CHEAP_QA_MARKERS = ("❌", "failed:", "i don't know", "i do not know", "as an ai", "i cannot", "i can't")
+_CHEAP_QA_STOPWORDS = {"tell", "what", "which", "give", "show", "list", "define", "explain", "about", "with", "from", "that", "this", "please"}
+
+
+def _trivial_reason(intents: Intents, mode: str) -> str:
+    """Why the router's own plan is good enough without the Director ("" = ask the Director)."""
+    if "fast" in (mode or "").lower():
+        return "Fast Mode (Coder only)"
+    if intents.simple_factual:
+        return "simple factual goal"
+    return ""
+
+
+def _answer_body(content: str, task: str = "") -> str:
+    """
+    The part of a reply that answers: agents echo their task back (the "task" key of
+    the JSON templates, or the prompt quoted in prose), which says nothing about the answer.
+    """
+    data = _extract_json_obj(content) if content.lstrip().startswith("{") else None
+    if isinstance(data, dict):
+        parts: List[str] = []
+        for key, value in data.items():
+            if key == "task":
+                continue
+            for v in value if isinstance(value, list) else [value]:
+                parts.append(v if isinstance(v, str) else json.dumps(v, ensure_ascii=False))
+        content = "\n".join(parts)
+    if task.strip():
+        content = content.replace(task.strip(), "")
+    return content.strip()
+
+
+def _cheap_qa(goal: str, output: Dict[str, Any], cfg: Dict[str, Any], task: str = "") -> Tuple[bool, str]:
+    """
+    String checks standing in for the Scribe + QA round trip on trivial goals, on the
+    answer body (the echoed task dropped): non-empty, sane length, not an error/refusal,
+    not just the goal repeated, on topic.
+    """
+    content = _answer_body(str(output.get("content") or ""), task)
+    if (output.get("meta") or {}).get("error"):
+        return False, "error"
+    if len(content) < int(cfg.get("min_answer_chars", 20)):
+        return False, "too short"
+    if len(content) > int(cfg.get("max_answer_chars", 2000)):
+        return False, "too long"
+    low = content.lower()
+    if any(m in low for m in _CHEAP_QA_MARKERS):
+        return False, "error or refusal"
+    if (goal or "").strip().lower() in low:
+        return False, "echoes the goal"
+    words = {w for w in re.findall(r"[a-z0-9]+", (goal or "").lower()) if len(w) > 3 and w not in _CHEAP_QA_STOPWORDS}
+    if words and not any(w in low for w in words):
+        return False, "off topic"
+    return True, f"{len(content)} chars, on topic"
+
+
+def _prune(
+    ctx: RunContext,
+    name: str,
+    kind: str,
+    reason: str,
+    model: str,
+    emit: EventFn,
+    elapsed: float = 0.0,
+) -> None:
+    """Records a stage that did not run (or was stopped) and the latency that saved, estimated from the model's EWMA."""
+    ewma = get_model_router().latency((ctx.models.get(name) or {}).get("model", model))
+    ctx.skipped[name] = {
+        "kind": kind,
+        "reason": reason,
+        "est_saved_sec": round(max(0.0, ewma - elapsed), 4) if ewma is not None else None,
+    }
+    STAGES_PRUNED.inc(agent=name, kind=kind)
+    emit({"type": "pruned", "agent": name, "stage": STAGES.get(name, "core"), "reason": reason})
+
+
+def _choose_model(ctx: RunContext, name: str, model: str, intents: Intents) -> ModelChoice:
+    choice = get_model_router().choose(name, model, intents)
+    ctx.models[name] = choice.to_dict()
+    return choice
+
+
+def _nbytes(content: Any) -> int:
+    if content is None:
+        return 0
+    if not isinstance(content, str):
+        content = json.dumps(content, ensure_ascii=False, default=str)
+    return len(content.encode("utf-8"))
+
+
+def _trace_artifact(run_id: str, tracer: Tracer) -> Dict[str, Any]:
+    return {"save_as": "trace.json", "content": json.dumps({"run_id": run_id, "spans": tracer.to_list()}, indent=2)}
+
+
+def _record_metrics(ctx: RunContext, wall: float) -> None:
+    RUNS_FINISHED.inc(status=ctx.status)
+    RUN_DURATION.observe(wall)
+    for name, tm in ctx.timings.items():
+        AGENT_DURATION.observe(float(tm.get("duration") or 0.0), agent=name, status=tm.get("status", "ok"))
+    if ctx.cache and not ctx.cache.get("bypass"):
+        CACHE_LOOKUPS.inc(ctx.cache.get("hits", 0), result="hit")
+        CACHE_LOOKUPS.inc(ctx.cache.get("misses", 0), result="miss")
+
+
+async def _find_similar(project: str, goal: str, mode: str) -> Optional[Match]:
+    index = get_similarity_index()
+    try:
+        if not index.loaded(project):
+            await asyncio.to_thread(index.load, project)  # first lookup of the project reads its jsonl
+        return index.lookup(project, goal, mode=mode)
+    except Exception:
+        return None  # derived data: a broken index only costs the shortcut
+
+
+def _index_similar(ctx: Dict[str, Any], dirs: Dict[str, Any], scribe: Dict[str, Any]) -> None:
+    try:
+        path = Path(dirs["runs"]) / (scribe.get("save_as") or "scribe.md")
+        get_similarity_index().add(ctx["project"], ctx["run_id"], ctx["goal"], ctx["mode"], str(path))
+    except Exception:
+        pass
+
+
+def _index_run(ctx: Dict[str, Any], dirs: Dict[str, Any]) -> None:
+    # the index is derived data (`main.py --reindex` rebuilds it): never fail a run over it
+    try:
+        record_run(ctx, dirs)
+    except Exception:
+        pass
+
+
 async def run_agents(
     goal: str,
     project: str = "general",
     mode: str = "Team Mode",
     model: str = "phi3:latest",
+    use_cache: bool = True,
+    on_event: Optional[EventFn] = None,
+    profile: Optional[bool] = None,
 ):
     """
     Returns: (ctx_dict, dirs_dict, logs_dict)
     logs_dict: {agent_name: normalized_output_dict, ...}
+    use_cache=False bypasses the response cache for this run (no reads, no writes).
+    on_event receives progress events as they happen (see stream_run).
+    profile=True writes profile.pstats / profile.collapsed into the run folder
+    (None: AIDT_PROFILE / CONFIG["profiling"]["enabled"] decide).
+    A Team Mode goal asked before in the project reuses that run's Scribe output,
+    a similar one starts from it (CONFIG["similarity"]).
     """
 
+    def emit(event: Dict[str, Any]) -> None:
+        if on_event is None:
+            return
+        try:
+            on_event(event)
+        except Exception:
+            pass  # a broken listener must never break the run
+
     # 1) RunContext + dirs
     rid = new_run_id()
     ctx = RunContext(
@@ -184,91 +622,287 @@ async def run_agents(
     )
 
     dirs = ensure_dirs(project=project, run_id=rid)
-    save_run_context(dirs, ctx.to_dict())
+    t0 = time.perf_counter()
+    tracer = Tracer(origin=t0)
+    RUNS_STARTED.inc()
+    profiler: Optional[RunProfiler] = None
+    # nothing may await (or raise) between here and the try: the finally undoes both
+    RUNS_IN_FLIGHT.inc()
+    trace_token = activate(tracer)
+    try:
+        if profiling_enabled(profile):
+            profiler = RunProfiler(dirs["runs"])
+            if not profiler.start():
+                ctx.profile = {"skipped": "another run was being profiled"}
+                profiler = None
+        # artifacts go through the background writer (atomic, batched); flushed before returning
+        await save_run_context_async(dirs, ctx.to_dict())
 
-    logs: Dict[str, Dict[str, Any]] = {}
+        logs: Dict[str, Dict[str, Any]] = {}
+        exec_stats: Dict[str, ExecStats] = {}
+        call_info: Dict[str, Dict[str, Any]] = {}
 
-    # 2) Director (kept for visibility, but NOT trusted blindly)
-    try:
-        director_reply = director.generate_reply([{"role": "user", "content": goal}])
-    except Exception as e:
-        director_reply = {"error": f"Director failed: {e}"}
-
-    director_out = normalize_output("Director", director_reply, "Director Output", "director.json")
-    save_agent_output(dirs, director_out.to_dict())
-    logs["Director"] = director_out.to_dict()
-
-    # 3) Decide subtasks
-    director_payload = _extract_director_payload(director_reply)
-
-    # If Director payload looks valid AND matches expected schema, we can use it.
-    # BUT: We still protect against dumb subtasks by falling back when needed.
-    subtasks: List[Dict[str, str]]
-    if director_payload and isinstance(director_payload.get("subtasks"), list):
-        # validate subtasks shape
-        cleaned: List[Dict[str, str]] = []
-        for stask in director_payload["subtasks"]:
-            if not isinstance(stask, dict):
+        # 2) Director (kept for visibility, but NOT trusted blindly).
+        # Skipped when the router alone is confident about the plan (trivial goals / Fast Mode).
+        director_status = "ok"
+        director_stats: Optional[ExecStats] = None
+        director_reply: Any = None
+        director_end = 0.0
+        intents = route(goal)
+        prune = CONFIG.get("pruning", {})
+        trivial = _trivial_reason(intents, mode) if prune.get("enabled", True) else ""
+
+        # Near-duplicate of an earlier run of this project: reuse its final answer, or warm-start from it
+        sim_cfg = CONFIG.get("similarity", {})
+        sim_enabled = bool(sim_cfg.get("enabled", True)) and ctx.mode == "team"
+        similar: Optional[Match] = None
+        prior = ""
+        if sim_enabled and use_cache:
+            with span("similarity", "routing") as sp:
+                similar = await _find_similar(project, goal, ctx.mode)
+                if similar is not None and similar.similarity >= float(sim_cfg.get("warm_start_threshold", 0.5)):
+                    prior = await asyncio.to_thread(similar.read_output)
+                sp.attrs["similarity"] = round(similar.similarity, 4) if similar is not None else 0.0
+        # reuse only the same goal (Normalizer.key, word order kept, no synonyms) answered recently;
+        # a merely similar goal is a warm start at most
+        max_age = sim_cfg.get("reuse_max_age_sec")
+        reuse = bool(prior) and similar.exact and (max_age is None or similar.age_sec <= float(max_age))
+        if prior:
+            ctx.similar = {
+                "run_id": similar.run_id,
+                "goal": similar.goal,
+                "similarity": round(similar.similarity, 4),
+                "exact": similar.exact,
+                "age_sec": round(similar.age_sec, 1),
+                "action": "reuse" if reuse else "warm_start",
+            }
+            SIMILARITY_LOOKUPS.inc(result=ctx.similar["action"])
+        elif sim_enabled and use_cache:
+            SIMILARITY_LOOKUPS.inc(result="miss")
+        similar_reason = f"repeat of run {similar.run_id} ({similar.age_sec / 3600:.1f}h old)" if reuse else ""
+        warm = ""
+        if prior and not reuse:
+            warm = (
+                f"\n\nPREVIOUS ANSWER TO A SIMILAR GOAL ({similar.goal!r}, similarity {similar.similarity:.2f}); "
+                f"reuse what still applies:\n{prior[: int(sim_cfg.get('max_warm_chars', 2000))]}"
+            )
+        warm_agents = set(sim_cfg.get("warm_start_agents") or ())
+
+        if reuse:
+            director_status = "skipped"
+            _prune(ctx, "Director", "near_duplicate", similar_reason, model, emit)
+        elif trivial and prune.get("skip_director", True):
+            director_status = "skipped"
+            _prune(ctx, "Director", "skip_director", f"router confident: {trivial}", model, emit)
+        else:
+            emit({"type": "start", "agent": "Director", "stage": "director"})
+            with span("Director", "director", bytes_in=_nbytes(goal)) as sp:
+                try:
+                    choice = _choose_model(ctx, "Director", model, intents)
+                    director_reply, director_stats, call_info["Director"] = await _call_agent(
+                        "Director", _routed_agent(AGENTS["Director"], choice), goal,
+                        model=choice.model, use_cache=use_cache, on_event=emit,
+                    )
+                except Exception as e:
+                    director_reply = {"error": f"Director failed: {e}"}
+                    director_status = "failed"
+                    ctx.errors["Director"] = f"{type(e).__name__}: {e}"
+                director_end = time.perf_counter() - t0
+
+                with span("normalize", "normalize"):
+                    director_out = normalize_output("Director", director_reply, "Director Output", "director.json")
+                sp.attrs["bytes_out"] = _nbytes(director_out.content)
+                await save_agent_output_async(dirs, director_out.to_dict())
+            logs["Director"] = director_out.to_dict()
+            emit({"type": "done", "agent": "Director", "stage": "director", "output": logs["Director"]})
+
+        # 3) Decide subtasks
+        # If Director payload looks valid AND matches expected schema, we can use it.
+        # BUT: We still protect against dumb subtasks by falling back when needed.
+        with span("routing", "routing") as sp:
+            subtasks = _clean_subtasks(_extract_director_payload(director_reply)) if director_reply is not None else []
+            sp.attrs["source"] = "director" if subtasks else "router"
+            subtasks = subtasks or build_subtasks(goal, mode)
+
+        # 4) Build the dependency graph: every agent starts as soon as its own inputs are ready
+        def make_fn(name: str, task: str):
+            async def fn(inputs: Dict[str, Any]) -> Dict[str, Any]:
+                if name == "Scribe":
+                    message = f"GOAL:\n{goal}\n\nOUTPUTS:\n" + _format_sections(inputs)
+                elif name == "QA":
+                    draft = (inputs.get("Scribe") or {}).get("content", "")
+                    message = (
+                        f"GOAL:\n{goal}\n\nFINAL DRAFT:\n{draft}\n\nTEAM OUTPUTS:\n"
+                        + _format_sections(inputs, skip=("Scribe",))
+                    )
+                else:
+                    message = task or goal
+                    if inputs:
+                        message += "\n\nINPUTS:\n" + _format_sections(inputs)
+                if warm and name in warm_agents:
+                    message += warm
+
+                emit({"type": "start", "agent": name, "stage": STAGES.get(name, "core")})
+                with span(name, "agent", stage=STAGES.get(name, "core"), bytes_in=_nbytes(message)) as sp:
+                    choice = _choose_model(ctx, name, model, intents)
+                    sp.attrs["model"] = choice.model
+                    reply, exec_stats[name], call_info[name] = await _call_agent(
+                        name, _routed_agent(AGENTS[name], choice), message,
+                        model=choice.model, use_cache=use_cache, on_event=emit,
+                    )
+                    with span("normalize", "normalize"):
+                        out = normalize_output(
+                            name,
+                            reply,
+                            DEFAULT_TITLES.get(name, f"{name} Output"),
+                            DEFAULT_FILES.get(name, f"{name.lower()}.txt"),
+                        )
+                    sp.attrs["bytes_out"] = _nbytes(out.content)
+                    await save_agent_output_async(dirs, out.to_dict())
+                    logs[name] = out.to_dict()
+                    if name == "Coder" and CONFIG.get("sandbox", {}).get("run_coder_blocks"):
+                        await _run_code_blocks(dirs, logs[name])
+                emit({"type": "done", "agent": name, "stage": STAGES.get(name, "core"), "output": logs[name]})
+                return logs[name]
+            return fn
+
+        async def reused_fn(inputs: Dict[str, Any]) -> Dict[str, Any]:
+            emit({"type": "start", "agent": "Scribe", "stage": "scribe"})
+            with span("Scribe", "agent", stage="scribe", reused_from=similar.run_id) as sp:
+                out = normalize_output("Scribe", prior, DEFAULT_TITLES["Scribe"], DEFAULT_FILES["Scribe"])
+                out.meta["reused_from"] = similar.run_id
+                out.meta["similarity"] = round(similar.similarity, 4)
+                sp.attrs["bytes_out"] = _nbytes(out.content)
+                await save_agent_output_async(dirs, out.to_dict())
+                logs["Scribe"] = out.to_dict()
+            emit({"type": "done", "agent": "Scribe", "stage": "scribe", "output": logs["Scribe"]})
+            return logs["Scribe"]
+
+        # Early exit: a trivial goal skips the Director, so subtasks come from build_subtasks
+        # and the first one is the agent told to answer (Planner, or Coder in Fast Mode)
+        early = subtasks[0] if trivial and not reuse and prune.get("early_exit", True) and subtasks else {}
+        early_agent = early.get("agent", "")
+
+        def on_result(res: NodeResult) -> None:
+            if res.name != early_agent or res.status != "ok":
+                return
+            passed, why = _cheap_qa(goal, logs.get(res.name) or {}, prune, task=early.get("task", ""))
+            if passed:
+                ctx.final_agent = res.name
+                scheduler.cancel(f"early exit: {res.name} answer passed cheap QA ({why})")
+
+        def make_scheduler(plan: List[Dict[str, Any]]) -> DagScheduler:
+            nodes = [Node(p["agent"], make_fn(p["agent"], p["task"]), p["requires"], p["optional"]) for p in plan]
+            return DagScheduler(nodes, origin=t0, on_result=on_result)
+
+        if reuse:
+            # the previous run's Scribe output stands in for the whole graph
+            for st in subtasks:
+                if st["agent"] != "Scribe":
+                    _prune(ctx, st["agent"], "near_duplicate", similar_reason, model, emit)
+            scheduler = DagScheduler([Node("Scribe", reused_fn)], origin=t0)
+        else:
+            try:
+                scheduler = make_scheduler(_graph_plan(subtasks))
+            except ValueError:
+                # e.g. Director produced a dependency cycle -> use the router
+                scheduler = make_scheduler(_graph_plan(build_subtasks(goal, mode)))
+
+        results = await scheduler.run()
+
+        for name, res in results.items():
+            if res.status == "cancelled":
+                _prune(ctx, name, "early_exit", res.error, model, emit, elapsed=res.duration)
                 continue
-            a = str(stask.get("agent") or "").strip()
-            t = str(stask.get("task") or "").strip()
-            if a in AGENTS and t:
-                cleaned.append({"agent": a, "task": t})
-        # if director gave nonsense, fallback
-        subtasks = cleaned if cleaned else build_subtasks(goal, mode)
-    else:
-        subtasks = build_subtasks(goal, mode)
-
-    # 4) Run core agents (except Scribe/QA) in parallel
-    core_names = [s["agent"] for s in subtasks if s["agent"] in ["Planner", "Researcher", "Coder", "Designer"]]
-    core_names = list(dict.fromkeys(core_names))  # unique, preserve order
-
-    tasks = []
-    for agent_name in core_names:
-        agent_obj = AGENTS[agent_name]
-        # find the task text for that agent from subtasks
-        msg = next((s["task"] for s in subtasks if s["agent"] == agent_name), goal)
-        tasks.append(_run_agent(agent_obj, msg))
-
-    results = await asyncio.gather(*tasks) if tasks else []
-
-    for name, reply in results:
-        default_file = {
-            "Planner": "planner.json",
-            "Researcher": "researcher.json",
-            "Designer": "designer.json",
-            "Coder": "coder_output.py",
-        }.get(name, f"{name.lower()}.txt")
-
-        out = normalize_output(name, reply, f"{name} Output", default_file)
-        save_agent_output(dirs, out.to_dict())
-        logs[name] = out.to_dict()
-
-    # 5) Run Scribe AFTER core outputs (Scribe is deterministic in your file)
-    scribe_input = f"GOAL:\n{goal}\n\nOUTPUTS:\n"
-    for k in ["Planner", "Researcher", "Coder", "Designer"]:
-        if k in logs:
-            scribe_input += f"\n## {k}\n{logs[k].get('content','')}\n"
+            if res.status != "ok":
+                ctx.errors[name] = res.error
+                emit({"type": res.status, "agent": name, "stage": STAGES.get(name, "core"), "error": res.error})
+            if res.status == "failed":
+                logs[name] = normalize_output(
+                    name,
+                    {"type": "text", "content": f"❌ {name} failed: {res.error}", "meta": {"error": res.error}},
+                    DEFAULT_TITLES.get(name, f"{name} Output"),
+                    DEFAULT_FILES.get(name, f"{name.lower()}.txt"),
+                ).to_dict()
+            elif res.status == "ok" and res.missing and name in logs:
+                logs[name]["meta"]["partial"] = True
+                logs[name]["meta"]["missing_inputs"] = res.missing
 
-    scribe_reply = scribe.generate_reply([{"role": "user", "content": scribe_input}])
-    scribe_out = normalize_output("Scribe", scribe_reply, "Final Summary", "scribe.md")
-    save_agent_output(dirs, scribe_out.to_dict())
-    logs["Scribe"] = scribe_out.to_dict()
+        if not ctx.final_agent and "Scribe" in logs:
+            ctx.final_agent = "Scribe"
 
-    # 6) Run QA LAST (review scribe + everything)
-    qa_input = f"GOAL:\n{goal}\n\nFINAL DRAFT:\n{logs['Scribe'].get('content','')}\n\nTEAM OUTPUTS:\n"
-    for k in ["Planner", "Researcher", "Coder", "Designer"]:
-        if k in logs:
-            qa_input += f"\n## {k}\n{logs[k].get('content','')}\n"
+        # 5) Timings + critical path (Director gates the graph when it runs)
+        ctx.timings = {}
+        if director_status != "skipped":
+            ctx.timings["Director"] = {
+                "start": 0.0,
+                "end": round(director_end, 4),
+                "duration": round(director_end, 4),
+                "status": director_status,
+            }
+        ctx.timings.update(scheduler.timings())
+        if director_stats is not None:
+            exec_stats["Director"] = director_stats
+        for name, st in exec_stats.items():
+            if name in ctx.timings:
+                ctx.timings[name]["queue_wait"] = round(st.queue_wait, 4)
+                ctx.timings[name]["exec"] = round(st.exec_time, 4)
+            winner = (call_info.get(name) or {}).get("winner", "primary")
+            if name in ctx.models:
+                if winner == "primary":
+                    ctx.models[name]["latency_sec"] = round(st.exec_time, 4)
+                else:
+                    ctx.models[name]["answered_by"] = winner  # "cache" | "hedge": no call timed on the model
+        for name, info in call_info.items():
+            if name in ctx.timings:
+                if info["winner"] == "cache":
+                    ctx.timings[name]["cached"] = True
+                    continue
+                ctx.timings[name]["attempts"] = info["attempts"]
+                if info["hedged"]:
+                    ctx.timings[name]["hedged"] = True
+                    ctx.timings[name]["winner"] = info["winner"]
+        ctx.critical_path = (["Director"] if director_status != "skipped" else []) + scheduler.critical_path()
 
-    qa_reply = qa.generate_reply([{"role": "user", "content": qa_input}])
-    qa_out = normalize_output("QA", qa_reply, "QA Review", "qa.json")
-    save_agent_output(dirs, qa_out.to_dict())
-    logs["QA"] = qa_out.to_dict()
+        hits = sum(1 for info in call_info.values() if info["winner"] == "cache")
+        ctx.cache = {"hits": hits, "misses": 0 if not use_cache else len(call_info) - hits, "bypass": not use_cache}
 
-    # 7) Mark complete
-    ctx.status = "completed"
-    save_run_context(dirs, ctx.to_dict())
+        # 6) Mark complete (failed if any graph node failed or was skipped because of a failure)
+        ctx.status = "failed" if any(r.status in ("failed", "skipped") for r in results.values()) else "completed"
+        await flush_run(dirs)  # storage spans are recorded once their batch is on disk
+        if profiler is not None:
+            profiler.stop()
+            ctx.profile = await asyncio.to_thread(profiler.save)
+        ctx.trace = tracer.summary()
+        await save_agent_output_async(dirs, _trace_artifact(rid, tracer))
+        await save_run_context_async(dirs, ctx.to_dict())
+        await flush_run(dirs)
+        await asyncio.to_thread(_index_run, ctx.to_dict(), dirs)
+        if sim_enabled and not reuse and ctx.status == "completed" and "Scribe" in logs:
+            await asyncio.to_thread(_index_similar, ctx.to_dict(), dirs, logs["Scribe"])
+    except BaseException as e:
+        # never leave a run stuck in "running" on disk
+        ctx.status = "failed"
+        ctx.errors.setdefault("System", f"{type(e).__name__}: {e}")
+        try:
+            await flush_run(dirs)  # queued writes must not land after the final context
+        except BaseException:
+            pass
+        if profiler is not None:
+            profiler.stop()
+            try:
+                ctx.profile = profiler.save()
+            except Exception:
+                pass
+        ctx.trace = tracer.summary()
+        save_agent_output(dirs, _trace_artifact(rid, tracer))
+        save_run_context(dirs, ctx.to_dict())
+        _index_run(ctx.to_dict(), dirs)
+        raise
+    finally:
+        deactivate(trace_token)
+        RUNS_IN_FLIGHT.dec()
+        _record_metrics(ctx, time.perf_counter() - t0)
 
     # Keep ordered logs for UI (optional)
     ordered_logs: Dict[str, Dict[str, Any]] = {}
@@ -280,3 +914,127 @@ async def run_agents(
             ordered_logs[k] = v
 
     return ctx.to_dict(), dirs, ordered_logs
+
+
+# ----------------------------
+# Coalescing: identical concurrent runs share one execution
+# ----------------------------
+_FLIGHTS = SingleFlight()
+_LISTENERS: Dict[Tuple[Any, ...], List[EventFn]] = {}
+
+
+def _flight_key(goal: str, project: str, mode: str, model: str, use_cache: bool) -> Tuple[Any, ...]:
+    return (
+        (goal or "").strip(),
+        slugify(project),
+        "fast" if "fast" in (mode or "").lower() else "team",
+        model,
+        bool(use_cache),
+    )
+
+
+def coalescing_stats() -> Dict[str, int]:
+    """{"calls", "executions", "saved", "in_flight"} since process start."""
+    return _FLIGHTS.stats()
+
+
+async def run_agents_coalesced(
+    goal: str,
+    project: str = "general",
+    mode: str = "Team Mode",
+    model: str = "phi3:latest",
+    use_cache: bool = True,
+    on_event: Optional[EventFn] = None,
+    profile: Optional[bool] = None,
+):
+    """
+    Same contract as run_agents, but concurrent identical requests
+    (goal / project / mode / model) attach to the one run already in flight.
+
+    Every caller still gets its own run record: followers get a fresh run_id and
+    a run_context.json in their own run folder with coalesced_with = leader run_id.
+    The returned dirs point at the leader's folder, where the artifacts are.
+    Events of the shared run are fanned out to every attached listener.
+    """
+    key = _flight_key(goal, project, mode, model, use_cache) + (profiling_enabled(profile),)
+    listeners = _LISTENERS.setdefault(key, [])
+    if on_event is not None:
+        listeners.append(on_event)
+
+    def fanout(event: Dict[str, Any]) -> None:
+        for fn in list(_LISTENERS.get(key, ())):
+            try:
+                fn(event)
+            except Exception:
+                pass
+
+    try:
+        (ctx, dirs, logs), shared = await _FLIGHTS.do(
+            key,
+            lambda: run_agents(
+                goal=goal, project=project, mode=mode, model=model, use_cache=use_cache, on_event=fanout, profile=profile
+            ),
+        )
+    finally:
+        if on_event is not None and on_event in listeners:
+            listeners.remove(on_event)
+        if not listeners and _LISTENERS.get(key) is listeners:
+            _LISTENERS.pop(key, None)
+
+    if not shared:
+        return ctx, dirs, logs
+
+    # follower: own run record, shared artifacts
+    rid = new_run_id()
+    own = copy.deepcopy(ctx)
+    own.update({
+        "run_id": rid,
+        "start_time": datetime.now().isoformat(timespec="seconds"),
+        "coalesced_with": ctx["run_id"],
+    })
+    save_run_context(ensure_dirs(project=project, run_id=rid), own)
+    _index_run(own, dirs)
+    return own, dirs, copy.deepcopy(logs)
+
+
+async def stream_run(
+    goal: str,
+    project: str = "general",
+    mode: str = "Team Mode",
+    model: str = "phi3:latest",
+    use_cache: bool = True,
+    profile: Optional[bool] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Multiplexes every agent's progress into one event stream while run_agents runs:
+      {"type": "start",   "agent", "stage"}
+      {"type": "chunk",   "agent", "stage", "chunk"}    (streaming agents only)
+      {"type": "reset",   "agent", "stage"}             (retry -> drop partial text)
+      {"type": "done",    "agent", "stage", "output"}   (normalized AgentOutput dict)
+      {"type": "failed" | "skipped", "agent", "stage", "error"}
+      {"type": "pruned",  "agent", "stage", "reason"}    (not needed: Director skipped / early exit)
+      {"type": "result",  "result": (ctx, dirs, logs)}  (always last)
+    stage: director | core | scribe | qa
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    task = asyncio.ensure_future(run_agents_coalesced(
+        goal=goal,
+        project=project,
+        mode=mode,
+        model=model,
+        use_cache=use_cache,
+        on_event=queue.put_nowait,
+        profile=profile,
+    ))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+
+    try:
+        while True:
+            event = await queue.get()
+            if event is None:
+                break
+            yield event
+        yield {"type": "result", "result": task.result()}
+    finally:
+        if not task.done():
+            task.cancel()
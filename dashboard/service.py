@@ -0,0 +1,189 @@
+# dashboard/service.py
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import CONFIG
+from core.metrics import start_metrics_server
+from core.similarity import get_similarity_index
+from dashboard.orchestrator import stream_run
+
+
+@dataclass
+class Job:
+    """
+    One submitted run. Written by the service loop, read by Streamlit reruns
+    through snapshot() (never touch the fields directly from another thread).
+    """
+
+    id: str
+    goal: str
+    project: str
+    mode: str
+    model: str
+    status: str = "queued"  # queued | running | done | failed
+    submitted: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+    # per agent: live text and status label, in first-seen order
+    texts: Dict[str, str] = field(default_factory=dict)
+    states: Dict[str, str] = field(default_factory=dict)
+    result: Optional[Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]] = None
+    error: str = ""
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def apply(self, ev: Dict[str, Any]) -> None:
+        kind, name = ev["type"], ev.get("agent", "")
+        with self._lock:
+            if kind == "result":
+                self.result = ev["result"]
+            elif kind == "start":
+                self.texts[name] = ""
+                self.states[name] = "⏳ working…"
+            elif kind == "chunk":
+                self.texts[name] = self.texts.get(name, "") + ev["chunk"]
+                self.states[name] = "✍️ streaming…"
+            elif kind == "reset":
+                self.texts[name] = ""
+                self.states[name] = "🔁 retrying…"
+            elif kind == "done":
+                self.texts[name] = str(ev["output"].get("content", ""))
+                self.states[name] = "✅"
+            elif kind == "pruned":
+                self.texts[name] = str(ev.get("reason", ""))
+                self.states[name] = "⏭ not needed"
+            elif kind in ("failed", "skipped"):
+                self.texts[name] = str(ev.get("error", ""))
+                self.states[name] = f"❌ {kind}"
+
+    def start(self) -> None:
+        with self._lock:
+            self.status = "running"
+
+    def finish(self, status: str, error: str = "") -> None:
+        with self._lock:
+            self.status = status
+            self.error = error
+            self.finished = time.time()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "id": self.id,
+                "goal": self.goal,
+                "status": self.status,
+                "elapsed": (self.finished or time.time()) - self.submitted,
+                "agents": [(n, self.texts.get(n, ""), self.states.get(n, "")) for n in self.states],
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+def _preload_similarity() -> None:
+    try:
+        get_similarity_index().preload()
+    except Exception:
+        pass  # derived data: a run then loads its project on first lookup
+
+
+class OrchestratorService:
+    """
+    Long-lived orchestrator on its own thread + event loop, shared by every
+    Streamlit session (st.cache_resource). Submissions return a Job immediately;
+    the UI polls job.snapshot() between reruns.
+
+    Because every run lives on the same loop, they share one executor, one pooled
+    HTTP client per host, the artifact writer and singleflight coalescing.
+    """
+
+    def __init__(self, keep_jobs: int = 100):
+        self.keep_jobs = max(1, int(keep_jobs))
+        self.loop = asyncio.new_event_loop()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._thread = threading.Thread(target=self._serve, name="orchestrator-loop", daemon=True)
+        self._thread.start()
+        sim = CONFIG.get("similarity", {})
+        if sim.get("enabled", True) and sim.get("preload", True):
+            # so the first run of a project does not wait for its index file
+            threading.Thread(target=_preload_similarity, name="similarity-preload", daemon=True).start()
+
+    def _serve(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(
+        self, goal: str, project: str, mode: str, model: str, use_cache: bool = True, profile: Optional[bool] = None
+    ) -> Job:
+        job = Job(id=f"job-{next(self._ids)}", goal=goal, project=project, mode=mode, model=model)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.keep_jobs:
+                oldest = next(iter(self._jobs.values()))
+                if not oldest.done:
+                    break
+                self._jobs.popitem(last=False)
+        asyncio.run_coroutine_threadsafe(self._drive(job, use_cache, profile), self.loop)
+        return job
+
+    async def _drive(self, job: Job, use_cache: bool, profile: Optional[bool] = None) -> None:
+        job.start()
+        try:
+            async for ev in stream_run(
+                goal=job.goal, project=job.project, mode=job.mode, model=job.model, use_cache=use_cache, profile=profile
+            ):
+                job.apply(ev)
+        except Exception as e:
+            job.finish("failed", f"{type(e).__name__}: {e}")
+        else:
+            job.finish("done")
+
+    def job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def active(self) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if not j.done)
+
+    async def _cancel_all(self) -> None:
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Cancels in-flight jobs (and background writers), then stops and closes the loop."""
+        if self.loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._cancel_all(), self.loop).result(timeout)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self.loop.close()
+
+
+def get_service() -> OrchestratorService:
+    """
+    Builds a service from CONFIG["service"] (the dashboard caches it with st.cache_resource)
+    and starts the metrics endpoint from CONFIG["metrics"].
+    """
+    start_metrics_server()
+    return OrchestratorService(keep_jobs=CONFIG.get("service", {}).get("keep_jobs", 100))
@@ -1,16 +1,93 @@
+import argparse
 import asyncio
-from dashboard.orchestrator import run_agents
+import os
+import sys
+
+from dashboard.orchestrator import run_agents, run_agents_coalesced, coalescing_stats
+
 
 def run_cli():
     print("🎯 Welcome to AI Director Team (Fast Orchestrator Mode)")
     goal = input("🗣 Goal:\n> ").strip()
 
-    logs = asyncio.run(run_agents(goal))
+    ctx, dirs, logs = asyncio.run(run_agents(goal))
 
     print("\n==================== RESULTS ====================")
-    for name, reply in logs.items():
+    for name, out in logs.items():
         print(f"\n--- {name} ---")
-        print(reply)
+        print(out.get("content", ""))
+    print(f"\n📦 Saved to: {dirs['runs']} ({ctx['status']})")
+
+
+def run_batch_cli(args: argparse.Namespace) -> int:
+    from core.batch import parse_goals, run_batch
+
+    src = sys.stdin if args.batch == "-" else open(args.batch, "r", encoding="utf-8")
+    try:
+        items = parse_goals(src, defaults={"project": args.project, "mode": args.mode, "model": args.model})
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    finally:
+        if src is not sys.stdin:
+            src.close()
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        summary = asyncio.run(run_batch(
+            items,
+            run_agents_coalesced,
+            out,
+            concurrency=args.concurrency,
+            use_cache=not args.no_cache,
+        ))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    lat = summary["latency_sec"]
+    print(
+        f"✅ {summary['runs']} runs in {summary['wall_sec']}s "
+        f"({summary['throughput_per_min']}/min) | "
+        f"p50 {lat.get('p50', 0)}s p95 {lat.get('p95', 0)}s p99 {lat.get('p99', 0)}s | "
+        f"failed {summary['failed']} errors {summary['errors']} | "
+        f"coalesced {coalescing_stats()['saved']}",
+        file=sys.stderr,
+    )
+    return 0 if not summary["errors"] else 1
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="AI Director Team CLI")
+    p.add_argument("--batch", metavar="FILE", help="Run goals from FILE ('-' = stdin): plain text or JSONL per line")
+    p.add_argument("--concurrency", type=int, default=4, help="Max concurrent runs in batch mode (default: 4)")
+    p.add_argument("--output", default="-", help="NDJSON output file in batch mode ('-' = stdout)")
+    p.add_argument("--project", default="general", help="Default project for batch lines")
+    p.add_argument("--mode", default="Team Mode", help="Default mode for batch lines")
+    p.add_argument("--model", default="phi3:latest", help="Default model for batch lines")
+    p.add_argument("--no-cache", action="store_true", help="Bypass the response cache")
+    p.add_argument("--profile", action="store_true",
+                   help="Profile each run (profile.pstats + profile.collapsed in the run folder)")
+    p.add_argument("--metrics-port", type=int, default=None, metavar="PORT",
+                   help="Serve Prometheus metrics on PORT while running (0 = off; default: off)")
+    p.add_argument("--reindex", action="store_true", help="Rebuild the run index from projects/*/runs/*/run_context.json")
+    return p.parse_args(argv)
+
 
 if __name__ == "__main__":
+    args = parse_args()
+    if args.profile:
+        os.environ["AIDT_PROFILE"] = "1"  # read by core.profiling.profiling_enabled for every run
+    if args.metrics_port:
+        from core.metrics import start_metrics_server
+
+        server = start_metrics_server(port=args.metrics_port)
+        print(f"📈 Metrics: {server.url}" if server else f"❌ Metrics port {args.metrics_port} unavailable", file=sys.stderr)
+    if args.reindex:
+        from core.run_index import reindex
+
+        print(f"🗂 Indexed {reindex()} runs")
+        sys.exit(0)
+    if args.batch:
+        sys.exit(run_batch_cli(args))
     run_cli()
@@ -1,13 +1,251 @@
-import subprocess
+import atexit
 import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from config import CONFIG
+from core.contracts import parse_code_blocks
+
+
+@dataclass
+class Preview:
+    app_path: str
+    port: int
+    proc: subprocess.Popen
+    started: float
+    last_used: float
+
+    @property
+    def url(self) -> str:
+        return f"http://localhost:{self.port}"
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+
+def _port_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        try:
+            s.bind(("127.0.0.1", port))
+        except OSError:
+            return False
+    return True
+
+
+def extract_app(source_path: str, dest_path: Optional[str] = None) -> str:
+    """
+    Writes the python code of an agent output (its ```python blocks, or the whole
+    file when it has no fences) to dest_path (default: <name>_app.py next to it)
+    and returns that path. The file is only rewritten when the code changed, so a
+    running preview does not reload for nothing. ValueError if there is no code.
+    """
+    with open(source_path, "r", encoding="utf-8") as f:
+        text = f.read()
+    blocks, _ = parse_code_blocks(text)
+    if blocks:
+        code = "\n\n".join(b["code"] for b in blocks if b["lang"].lower() in ("python", "py") and b["code"])
+    else:
+        code = text.strip()
+    if not code:
+        raise ValueError(f"No python code block in {os.path.basename(source_path)}")
+    code += "\n"
+    if dest_path is None:
+        dest_path = os.path.splitext(source_path)[0] + "_app.py"
+    try:
+        with open(dest_path, "r", encoding="utf-8") as f:
+            unchanged = f.read() == code
+    except OSError:
+        unchanged = False
+    if not unchanged:
+        with open(dest_path, "w", encoding="utf-8") as f:
+            f.write(code)
+    return dest_path
+
+
+class PreviewManager:
+    """
+    Owns the `streamlit run` preview servers:
+    - one server per app file: launching the same file again reuses it
+      (started with runOnSave, so edits hot-reload instead of respawning)
+    - ports come from [base_port, base_port + port_range) and are checked before use
+    - at most max_previews servers; the least recently used one makes room
+    - servers idle for idle_timeout_sec (or dead) are reaped; touch() marks one as used
+    - stopping a server (up to stop_timeout_sec before it is killed) happens
+      outside the lock, so status() / launch() never wait on it
+    """
+
+    def __init__(
+        self,
+        base_port: int = 8600,
+        port_range: int = 50,
+        max_previews: int = 3,
+        idle_timeout_sec: float = 600,
+        reap_interval_sec: float = 30,
+        stop_timeout_sec: float = 5,
+    ):
+        self.base_port = int(base_port)
+        self.port_range = max(1, int(port_range))
+        self.max_previews = max(1, int(max_previews))
+        self.idle_timeout_sec = float(idle_timeout_sec)
+        self.reap_interval_sec = float(reap_interval_sec)
+        self.stop_timeout_sec = float(stop_timeout_sec)
+        self._previews: Dict[str, Preview] = {}
+        self._lock = threading.RLock()
+        self._reaper: Optional[threading.Thread] = None
+
+    def _allocate_port(self, preferred: Optional[int] = None) -> int:
+        taken = {p.port for p in self._previews.values()}
+        candidates = [preferred] if preferred else []
+        candidates += range(self.base_port, self.base_port + self.port_range)
+        for port in candidates:
+            if port not in taken and _port_free(port):
+                return port
+        raise RuntimeError(f"No free preview port in {self.base_port}-{self.base_port + self.port_range - 1}")
+
+    def launch(self, app_path: str, port: Optional[int] = None) -> Preview:
+        key = os.path.abspath(app_path)
+        victims: List[Preview] = []
+        try:
+            with self._lock:
+                victims += self._take_stale(time.time())
+                current = self._previews.get(key)
+                if current is not None:
+                    current.last_used = time.time()
+                    return current
+
+                while len(self._previews) >= self.max_previews:
+                    lru = min(self._previews.values(), key=lambda p: p.last_used)
+                    victims.append(self._previews.pop(lru.app_path))
+
+                port = self._allocate_port(port)
+                proc = subprocess.Popen(
+                    [
+                        sys.executable, "-m", "streamlit", "run", key,
+                        "--server.port", str(port),
+                        "--server.headless", "true",
+                        "--server.runOnSave", "true",
+                    ],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    start_new_session=(os.name == "posix"),
+                )
+                now = time.time()
+                preview = Preview(app_path=key, port=port, proc=proc, started=now, last_used=now)
+                self._previews[key] = preview
+                self._start_reaper()
+                return preview
+        finally:
+            self._terminate(victims)
+
+    def touch(self, app_path: str) -> None:
+        with self._lock:
+            p = self._previews.get(os.path.abspath(app_path))
+            if p is not None:
+                p.last_used = time.time()
+
+    def _terminate(self, victims: List[Preview]) -> None:
+        """Stops the processes of previews already removed from the table (call without the lock)."""
+        live = [p for p in victims if p.alive()]
+        for p in live:
+            p.proc.terminate()
+        deadline = time.monotonic() + self.stop_timeout_sec
+        for p in live:
+            try:
+                p.proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                p.proc.kill()
+                p.proc.wait()
+
+    def stop(self, app_path: str) -> bool:
+        with self._lock:
+            p = self._previews.pop(os.path.abspath(app_path), None)
+        if p is None:
+            return False
+        self._terminate([p])
+        return True
+
+    def stop_all(self) -> None:
+        with self._lock:
+            victims = list(self._previews.values())
+            self._previews.clear()
+        self._terminate(victims)
+
+    def _take_stale(self, now: float) -> List[Preview]:
+        stale = [
+            p for p in self._previews.values()
+            if not p.alive() or now - p.last_used > self.idle_timeout_sec
+        ]
+        for p in stale:
+            self._previews.pop(p.app_path, None)
+        return stale
+
+    def reap(self) -> int:
+        """Stops dead and idle previews; returns how many were removed."""
+        with self._lock:
+            stale = self._take_stale(time.time())
+        self._terminate(stale)
+        return len(stale)
+
+    def _start_reaper(self) -> None:
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+
+        def loop() -> None:
+            while True:
+                time.sleep(self.reap_interval_sec)
+                self.reap()
+                with self._lock:
+                    if not self._previews:
+                        self._reaper = None
+                        return
+
+        self._reaper = threading.Thread(target=loop, name="preview-reaper", daemon=True)
+        self._reaper.start()
+
+    def status(self) -> List[Dict[str, object]]:
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "app": p.app_path,
+                    "port": p.port,
+                    "url": p.url,
+                    "pid": p.proc.pid,
+                    "alive": p.alive(),
+                    "uptime_sec": round(now - p.started, 1),
+                    "idle_sec": round(now - p.last_used, 1),
+                }
+                for p in sorted(self._previews.values(), key=lambda p: p.started)
+            ]
+
+
+_MANAGER: Optional[PreviewManager] = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_preview_manager() -> PreviewManager:
+    """Process-wide manager from CONFIG["preview"]; previews are stopped at exit."""
+    global _MANAGER
+    with _MANAGER_LOCK:
+        if _MANAGER is None:
+            cfg = CONFIG.get("preview", {})
+            _MANAGER = PreviewManager(
+                base_port=cfg.get("base_port", 8600),
+                port_range=cfg.get("port_range", 50),
+                max_previews=cfg.get("max_previews", 3),
+                idle_timeout_sec=cfg.get("idle_timeout_sec", 600),
+            )
+            atexit.register(_MANAGER.stop_all)
+        return _MANAGER
+
 
 def launch_preview(app_path="preview_app.py", port=8600):
     try:
-        subprocess.Popen(
-            ["streamlit", "run", app_path, "--server.port", str(port)],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-        return f"http://localhost:{port}"
+        return get_preview_manager().launch(app_path, port=port).url
     except Exception as e:
-        return f"❌ Failed to launch preview: {e}"
\ No newline at end of file
+        return f"❌ Failed to launch preview: {e}"
@@ -3,7 +3,7 @@ from dashboard.orchestrator import run_agents
 
 goal = "Build an AI dashboard with a login page and testing."
 
-logs = asyncio.run(run_agents(goal))
+ctx, dirs, logs = asyncio.run(run_agents(goal))
 
-for agent_name, response in logs.items():
-    print(f"--- {agent_name} ---\n{response}\n")
+for agent_name, out in logs.items():
+    print(f"--- {agent_name} ---\n{out.get('content', '')}\n")
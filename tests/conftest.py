@@ -0,0 +1,18 @@
+# tests/conftest.py
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Runs the test inside an empty folder: projects/, cache/, memory/ are relative paths."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
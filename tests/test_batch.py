@@ -0,0 +1,48 @@
+import asyncio
+import io
+import json
+
+import pytest
+
+from core.batch import parse_goals, run_batch
+
+
+def test_parse_goals_plain_json_and_defaults():
+    items = parse_goals([
+        "# comment",
+        "",
+        "build a todo app",
+        '{"goal": "explain dns", "project": "net", "mode": "Fast Mode"}',
+    ], defaults={"project": "p", "model": "m"})
+    assert [(i.line, i.goal, i.project, i.mode, i.model) for i in items] == [
+        (3, "build a todo app", "p", "Team Mode", "m"),
+        (4, "explain dns", "net", "Fast Mode", "m"),
+    ]
+    with pytest.raises(ValueError, match="line 1"):
+        parse_goals(['{"project": "x"}'])
+
+
+def test_run_batch_limits_concurrency_and_streams_ndjson():
+    running = {"now": 0, "peak": 0}
+
+    async def run_fn(goal, project, mode, model, **kwargs):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(0.02)
+        running["now"] -= 1
+        if goal == "boom":
+            raise RuntimeError("backend down")
+        ctx = {"run_id": goal, "status": "completed", "final_agent": "Scribe"}
+        return ctx, {"runs": f"runs/{goal}"}, {"Scribe": {"content": f"answer to {goal}"}}
+
+    out = io.StringIO()
+    items = parse_goals(["a", "b", "boom", "c", "d"])
+    summary = asyncio.run(run_batch(items, run_fn, out, concurrency=2))
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+
+    assert running["peak"] == 2
+    results = {r["goal"]: r for r in lines if r["type"] == "result"}
+    assert results["a"]["final"] == "answer to a" and results["a"]["status"] == "completed"
+    assert results["boom"]["status"] == "error" and "backend down" in results["boom"]["error"]
+    assert lines[-1] == summary and summary["runs"] == 5
+    assert (summary["completed"], summary["errors"]) == (4, 1)
@@ -0,0 +1,44 @@
+import importlib.util
+import json
+import os
+import sys
+
+import pytest
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "run.py")
+
+
+@pytest.fixture(scope="module")
+def bench():
+    spec = importlib.util.spec_from_file_location("bench_run", BENCH)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod  # @dataclass looks its module up while the file runs
+    spec.loader.exec_module(mod)
+    yield mod
+    sys.modules.pop(spec.name, None)
+
+
+def test_every_case_sets_up_and_runs_once(bench):
+    for case in bench.CASES:
+        try:
+            fn = case.setup()
+        except ImportError:
+            continue  # measure() reports these as skipped
+        fn()
+
+
+def test_compare_flags_only_slowdowns_over_the_threshold(bench):
+    baseline = {"results": {"fast": {"best_us": 10.0}, "slow": {"best_us": 10.0}}}
+    results = {"fast": {"best_us": 11.0}, "slow": {"best_us": 12.0}, "new": {"best_us": 1.0}, "gone": {"skipped": "x"}}
+    assert bench.compare(results, baseline, 0.15) == ["slow"]
+    assert results["fast"]["vs_baseline"] == 1.1 and "vs_baseline" not in results["new"]
+
+
+def test_save_then_compare(bench, tmp_path, capsys):
+    path = str(tmp_path / "baseline.json")
+    args = ["--filter", "router.route", "--repeat", "1", "--min-time", "0.01", "--baseline", path]
+    assert bench.main(args + ["--compare"]) == 2  # no baseline yet
+    assert bench.main(args + ["--save"]) == 0
+    assert list(json.load(open(path))["results"]) == ["router.route[goals]"]
+    assert bench.main(args + ["--compare", "--threshold", "100"]) == 0
+    assert "vs baseline" in capsys.readouterr().out
@@ -0,0 +1,65 @@
+# tests/test_cache.py
+from __future__ import annotations
+
+import asyncio
+import threading
+from pathlib import Path
+
+from core.cache import ResponseCache, make_key
+
+
+def test_make_key_changes_with_model():
+    assert make_key("Coder", "sys", "task", "a") != make_key("Coder", "sys", "task", "b")
+    assert make_key("Coder", "sys", "task", "a") == make_key("Coder", "sys", "task", "a")
+
+
+def test_disk_tier_survives_a_new_process_object(tmp_path):
+    ResponseCache(disk_dir=str(tmp_path)).put("ab" * 32, {"x": 1})
+    cache = ResponseCache(disk_dir=str(tmp_path))
+    assert cache.get("ab" * 32) == {"x": 1}
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResponseCache(ttl_sec=-1, disk_dir=str(tmp_path))
+    cache.put("cd" * 32, "v")
+    assert cache.get("cd" * 32) is None
+
+
+def test_async_api_runs_the_disk_tier_off_the_loop(tmp_path, monkeypatch):
+    cache = ResponseCache(disk_dir=str(tmp_path))
+    threads = []
+    real_put, real_get = cache._disk_put, cache._disk_get
+    monkeypatch.setattr(cache, "_disk_put", lambda *a: (threads.append(threading.get_ident()), real_put(*a)))
+    monkeypatch.setattr(cache, "_disk_get", lambda *a: (threads.append(threading.get_ident()), real_get(*a))[1])
+
+    async def go():
+        loop_thread = threading.get_ident()
+        await cache.aput("ef" * 32, "reply")
+        cache._mem.clear()  # force the disk tier
+        value = await cache.aget("ef" * 32)
+        return loop_thread, value
+
+    loop_thread, value = asyncio.run(go())
+    assert value == "reply"
+    assert len(threads) == 2 and loop_thread not in threads
+
+
+def test_eviction_is_lru_and_does_not_rescan_the_folder(tmp_path, monkeypatch):
+    cache = ResponseCache(disk_dir=str(tmp_path), disk_max_bytes=10_000)
+    keys = [f"{i:02d}" * 32 for i in range(40)]
+    cache.put(keys[0], "x" * 400)  # first write loads the index (one scan)
+
+    def no_scan(self, pattern):
+        raise AssertionError("disk tier re-scanned the cache folder")
+
+    monkeypatch.setattr(Path, "glob", no_scan)
+    for k in keys[1:]:
+        cache.put(k, "x" * 400)
+        cache.get(keys[0])  # keep the first entry hot
+
+    on_disk = {fp.stem for fp in tmp_path.rglob("*.json")}
+    assert keys[0] in on_disk  # recently used: kept
+    assert keys[1] not in on_disk  # least recently used: evicted
+    assert cache.stats()["disk_bytes"] <= 10_000
+    assert cache.stats()["disk_bytes"] == sum(fp.stat().st_size for fp in tmp_path.rglob("*.json"))
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.executor import AgentExecutor
+
+
+def test_sync_calls_do_not_block_the_loop():
+    ex = AgentExecutor(max_workers=2)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        return await asyncio.gather(ex.run(time.sleep, 0.15), ticker())
+
+    try:
+        ((_, stats), _) = asyncio.run(main())
+    finally:
+        ex.shutdown()
+    assert stats.exec_time >= 0.14
+    assert ticks[-1] - ticks[0] < 0.14  # the loop kept ticking during the blocking call
+
+
+def test_pool_size_bounds_concurrency_per_backend():
+    ex = AgentExecutor(max_workers=4, backends={"slow": 1})
+    running = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.03)
+        with lock:
+            running["now"] -= 1
+        return threading.current_thread().name
+
+    async def main():
+        return await asyncio.gather(*(ex.run(work, backend="slow") for _ in range(3)))
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        ex.shutdown()
+    assert running["peak"] == 1
+    assert max(st.queue_wait for _, st in results) >= 0.05  # the third call queued behind two
+    assert ex.stats()["slow"]["workers"] == 1 and ex.stats()["slow"]["completed"] == 3
+
+
+def test_exceptions_propagate():
+    ex = AgentExecutor()
+
+    def boom():
+        raise KeyError("x")
+
+    try:
+        with pytest.raises(KeyError):
+            asyncio.run(ex.run(boom))
+    finally:
+        ex.shutdown()
@@ -0,0 +1,79 @@
+# tests/test_llm_client.py
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("httpx")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from stub_llm_server import StubOptions, StubServer  # noqa: E402
+
+from core.llm_client import PooledLLMClient  # noqa: E402
+
+
+@pytest.fixture
+def stub():
+    opts = StubOptions()
+    opts.latency = "fixed:1"
+    opts.tokens = 5
+    srv = StubServer(opts).start()
+    yield srv
+    srv.stop()
+
+
+def _payload():
+    return {"model": "stub", "messages": [{"role": "user", "content": "hi"}]}
+
+
+def test_one_client_per_loop_and_host_reused_across_calls(stub):
+    pool = PooledLLMClient()
+
+    async def go():
+        await pool.chat(stub.base_url, _payload())
+        first = pool.client(stub.base_url)
+        await pool.chat(stub.base_url, _payload())
+        return first is pool.client(stub.base_url), pool.stats()
+
+    same, stats = asyncio.run(go())
+    assert same
+    host = next(iter(stats))
+    assert stats[host]["requests"] == 2
+
+
+def test_client_is_closed_when_its_loop_shuts_down(stub):
+    pool = PooledLLMClient()
+
+    async def go():
+        await pool.chat(stub.base_url, _payload())
+        return pool.client(stub.base_url)
+
+    client = asyncio.run(go())
+    assert client.is_closed
+    assert pool._clients == {}
+
+
+def test_aclose_closes_the_running_loops_clients(stub):
+    pool = PooledLLMClient()
+
+    async def go():
+        await pool.chat(stub.base_url, _payload())
+        client = pool.client(stub.base_url)
+        await pool.aclose()
+        return client
+
+    assert asyncio.run(go()).is_closed
+    assert pool._clients == {}
+
+
+def test_agents_do_not_give_autogen_their_llm_config():
+    pytest.importorskip("autogen")
+    from agents.base import BaseAgent
+
+    agent = BaseAgent("Probe", "You are a probe.", {"base_url": "http://x/v1", "model": "m"})
+    assert agent.llm_config is False  # no per-agent autogen client stack
+    assert agent.llm["model"] == "m" and agent.backend == "http://x/v1"
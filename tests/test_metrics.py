@@ -0,0 +1,54 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from core.metrics import MetricsServer, Registry
+
+
+def test_render_follows_the_text_exposition_format():
+    reg = Registry()
+    runs = reg.counter("runs_total", "Runs.", ("status",))
+    runs.inc(status="ok")
+    runs.inc(2, status='bad "x"')
+    reg.gauge("depth", "Queue depth.", fn=lambda: {(): 3})
+    reg.gauge("broken", "Callback that raises.", fn=lambda: 1 / 0)
+    hist = reg.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+    for v in (0.05, 0.5, 5):
+        hist.observe(v)
+
+    text = reg.render()
+    assert '# TYPE runs_total counter' in text
+    assert 'runs_total{status="ok"} 1' in text and 'runs_total{status="bad \\"x\\""} 2' in text
+    assert "depth 3" in text and "# TYPE broken gauge" in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_sum 5.55" in text and "latency_seconds_count 3" in text
+    assert reg.counter("runs_total", "Runs.", ("status",)) is runs
+
+
+def test_misuse_raises():
+    reg = Registry()
+    c = reg.counter("c", "C.", ("a",))
+    with pytest.raises(ValueError):
+        c.inc(-1, a="x")
+    with pytest.raises(ValueError):
+        c.inc(b="x")
+    with pytest.raises(ValueError):
+        reg.gauge("c", "Same name, other kind.")
+
+
+def test_server_serves_metrics_only():
+    reg = Registry()
+    reg.counter("hits_total", "Hits.").inc()
+    srv = MetricsServer(port=0, registry=reg)
+    try:
+        with urllib.request.urlopen(srv.url, timeout=5) as resp:
+            assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert "hits_total 1" in resp.read().decode()
+        with pytest.raises(urllib.error.HTTPError) as err:
+            urllib.request.urlopen(srv.url.replace("/metrics", "/other"), timeout=5)
+        assert err.value.code == 404
+    finally:
+        srv.stop()
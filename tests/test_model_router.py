@@ -0,0 +1,84 @@
+import ast
+import os
+
+from core.model_router import ModelRouter
+from core.router import Intents, route
+
+CODE = Intents(code=True, words=12)
+FACT = Intents(factual=True, words=3)
+
+
+def _router(**extra):
+    cfg = {
+        "policy": [
+            {"agent": "Coder", "intent": "code", "models": ["big-a", "big-b"], "max_tokens": 2000},
+            {"intent": "simple_factual", "max_expected_tokens": 200, "model": "small"},
+        ],
+        "fallback_model": "backup",
+        "saturation": {"max_in_flight": 2, "latency_slo_sec": 5.0},
+    }
+    cfg.update(extra)
+    return ModelRouter(cfg)
+
+
+def test_policy_order_and_default():
+    r = _router()
+    coder = r.choose("Coder", "run-model", CODE)
+    assert coder.reason == "fastest of policy[0]" and coder.max_tokens == 2000
+    assert r.choose("QA", "run-model", FACT).to_dict() == {"model": "small", "reason": "policy[1]", "expected_tokens": 150}
+    assert r.choose("Coder", "run-model", FACT).model == "run-model"  # 400 expected tokens > 200
+    assert r.choose("QA", "run-model", CODE).reason == "default"
+    assert _router(enabled=False).choose("Coder", "run-model", CODE).model == "run-model"
+
+
+def test_fastest_samples_unobserved_models_then_follows_latency():
+    r = _router()
+    r.begin("big-a")
+    r.end("big-a", 1.0)
+    assert r.choose("Coder", "m", CODE).model == "big-b"  # not observed yet
+    r.begin("big-b")
+    r.end("big-b", 3.0)
+    assert r.choose("Coder", "m", CODE).model == "big-a"
+    for _ in range(5):
+        r.begin("big-a")
+        r.end("big-a", 4.0)
+    assert r.latency("big-a") > r.latency("big-b")
+    assert r.choose("Coder", "m", CODE).model == "big-b"
+
+
+def test_saturated_model_falls_back():
+    r = _router()
+    r.begin("small")
+    r.begin("small")
+    choice = r.choose("QA", "m", FACT)
+    assert (choice.model, choice.fallback_from) == ("backup", "small")
+    assert choice.reason == "policy[1] -> fallback (saturated)"
+    r.end("small", 1.0)
+    assert r.choose("QA", "m", FACT).model == "small"
+
+    r.begin("run-model")
+    r.end("run-model", 9.0)  # over the latency SLO
+    assert r.choose("Designer", "run-model").model == "backup"
+    r.begin("backup")
+    r.begin("backup")
+    assert r.choose("Designer", "run-model").model == "run-model"  # the fallback is saturated too
+    r.end("backup", None)
+    assert r.stats()["backup"]["errors"] == 1
+
+
+def test_default_policy_sends_light_work_to_the_small_model():
+    r = ModelRouter()  # CONFIG["model_router"]
+    assert r.choose("Planner", "phi3:latest", route("what is the capital of France")).model == "tinyllama:latest"
+    assert r.choose("Researcher", "phi3:latest", route("build a todo app")).model == "tinyllama:latest"
+    assert r.choose("Coder", "phi3:latest", route("build a todo app")).reason == "default"
+
+
+def test_dashboard_never_writes_the_shared_config():
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dashboard", "app.py")
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        for target in getattr(node, "targets", []) + [getattr(node, "target", None)]:
+            while isinstance(target, (ast.Subscript, ast.Attribute)):
+                target = target.value
+            assert not (isinstance(target, ast.Name) and target.id == "CONFIG"), f"CONFIG assigned on line {node.lineno}"
@@ -0,0 +1,283 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("autogen")
+
+from core import profiling, tracing  # noqa: E402
+from core.metrics import RUNS_IN_FLIGHT  # noqa: E402
+from dashboard import orchestrator  # noqa: E402
+
+
+def _cancel_during_first_save(monkeypatch, **kwargs):
+    """Runs run_agents and cancels it while its first run-context save is pending."""
+    saving = asyncio.Event()
+
+    async def stuck_save(dirs, ctx):
+        saving.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(orchestrator, "save_run_context_async", stuck_save)
+
+    async def caller():  # awaits the run in its own context, as batch / the service do
+        try:
+            await orchestrator.run_agents("build a todo app", project="t", use_cache=False, **kwargs)
+        except asyncio.CancelledError:
+            return tracing.current_tracer()
+        raise AssertionError("run was not cancelled")
+
+    async def main():
+        task = asyncio.create_task(caller())
+        await saving.wait()
+        task.cancel()
+        return await task
+
+    return asyncio.run(main())
+
+
+def test_cancel_in_first_save_resets_the_tracer(workdir, monkeypatch):
+    assert _cancel_during_first_save(monkeypatch) is None
+
+
+def test_runs_in_flight_is_balanced(workdir, monkeypatch):
+    before = RUNS_IN_FLIGHT.value()
+    _cancel_during_first_save(monkeypatch)
+    assert RUNS_IN_FLIGHT.value() == before
+
+    class BrokenProfiler:
+        def __init__(self, *args):
+            raise OSError("profiler unavailable")
+
+    monkeypatch.setattr(orchestrator, "RunProfiler", BrokenProfiler)
+    with pytest.raises(OSError):
+        asyncio.run(orchestrator.run_agents("build a todo app", project="t", use_cache=False, profile=True))
+    assert RUNS_IN_FLIGHT.value() == before
+
+
+def _profile_lock_free() -> bool:
+    if not profiling._PROFILE_LOCK.acquire(blocking=False):
+        return False
+    profiling._PROFILE_LOCK.release()
+    return True
+
+
+def test_profiler_lock_released_on_cancel_and_failed_start(workdir, monkeypatch):
+    _cancel_during_first_save(monkeypatch, profile=True)
+    assert _profile_lock_free()
+
+    class Taken:  # e.g. coverage or a debugger already holds the profiling hook
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+        def disable(self):
+            pass
+
+    class HookTaken(profiling.RunProfiler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._profiler = Taken()
+
+    monkeypatch.setattr(orchestrator, "RunProfiler", HookTaken)
+    with pytest.raises(ValueError):
+        asyncio.run(orchestrator.run_agents("build a todo app", project="t", use_cache=False, profile=True))
+    assert _profile_lock_free()
+
+
+def test_hedge_clone_keeps_the_routed_model(monkeypatch):
+    from config import CONFIG
+    from core.model_router import ModelChoice
+
+    hedge_cfg = {**CONFIG["resilience"]["hedge"], "llm_config": {"base_url": "http://second-backend:11434/v1"}}
+    monkeypatch.setitem(CONFIG["resilience"], "hedge", hedge_cfg)
+    monkeypatch.setattr(orchestrator, "_HEDGE_AGENTS", {})
+
+    coder = orchestrator.AGENTS["Coder"]
+    small = orchestrator._routed_agent(coder, ModelChoice("small-model", "test", max_tokens=256))
+    large = orchestrator._routed_agent(coder, ModelChoice("large-model", "test"))
+
+    hedge_small = orchestrator._hedge_agent("Coder", small)
+    hedge_large = orchestrator._hedge_agent("Coder", large)
+    assert hedge_small.llm["model"] == "small-model" and hedge_small.llm["max_tokens"] == 256
+    assert hedge_small.llm["base_url"] == "http://second-backend:11434/v1"
+    assert hedge_large.llm["model"] == "large-model"
+    assert hedge_small is not hedge_large
+    assert orchestrator._hedge_agent("Coder", small) is hedge_small
+
+
+def test_a_winning_hedge_is_not_a_latency_sample_of_the_model(monkeypatch):
+    from core.executor import ExecStats
+    from core.model_router import ModelRouter
+    from core.resilience import CallPolicy
+
+    router = ModelRouter({"policy": []})
+    primary, hedge = object(), object()
+
+    async def fake_run(agent_obj, message, on_chunk=None):
+        if agent_obj is primary:
+            await asyncio.sleep(1)
+            return "", "slow", ExecStats(backend="primary", exec_time=1.0)
+        return "", "fast", ExecStats(backend="hedge", exec_time=9.0)
+
+    monkeypatch.setattr(orchestrator, "get_model_router", lambda: router)
+    monkeypatch.setattr(orchestrator, "_run_agent", fake_run)
+    monkeypatch.setattr(orchestrator, "_hedge_agent", lambda name, obj: hedge)
+    monkeypatch.setattr(orchestrator, "policy_for", lambda name: CallPolicy(timeout_sec=5, retries=0, hedge=True, hedge_after_sec=0.01))
+
+    reply, stats, info = asyncio.run(orchestrator._call_agent("Coder", primary, "task", model="m", use_cache=False))
+    assert (reply, info["winner"]) == ("fast", "hedge")
+    assert router.latency("m") is None  # the hedge backend's 9 s is not charged to "m"
+    assert router.stats()["m"] == {"in_flight": 0, "calls": 1, "errors": 0, "ewma_sec": None}
+
+
+def test_cached_replies_record_no_model_latency(workdir, monkeypatch):
+    from config import CONFIG
+
+    monkeypatch.setitem(CONFIG, "similarity", {**CONFIG["similarity"], "enabled": False})  # no run reuse
+
+    async def main():
+        await orchestrator.run_agents("build a todo app", project="t", use_cache=True)
+        ctx, _, _ = await orchestrator.run_agents("build a todo app", project="t", use_cache=True)
+        return ctx
+
+    models = asyncio.run(main())["models"]
+    assert models and all(m.get("answered_by") == "cache" and "latency_sec" not in m for m in models.values())
+
+
+class _AnsweringPlanner:
+    """Replies like a model would: the task echoed back (as the JSON templates do) plus a real answer."""
+
+    name = "Planner"
+    system_message = "Answer directly."
+    answers = {
+        "capital of france": "Paris is the capital of France and its largest city.",
+        "days of week": "The seven days of the week: Monday, Tuesday, Wednesday, Thursday, Friday, Saturday, Sunday.",
+    }
+
+    async def generate_reply(self, messages):
+        task = messages[-1]["content"]
+        answer = next((a for k, a in self.answers.items() if k in task.lower()), "")
+        return json.dumps({"task": task, "answer": answer})
+
+
+@pytest.fixture
+def answering_planner(monkeypatch):
+    from agents.registry import BUILTIN, AgentRegistry
+
+    agents = AgentRegistry(BUILTIN, group=None)
+    agents.register("Planner", _AnsweringPlanner())
+    monkeypatch.setattr(orchestrator, "AGENTS", agents)
+
+
+CFG = {"min_answer_chars": 20, "max_answer_chars": 2000}
+
+
+@pytest.mark.parametrize("content, ok, why", [
+    ("Paris.", False, "too short"),
+    ("I don't know the capital of France, sorry.", False, "error or refusal"),
+    ("what is the capital of france? Let me think about it.", False, "echoes the goal"),
+    ("Bananas are a good source of potassium.", False, "off topic"),
+    ("Paris is the capital of France.", True, ""),
+    (json.dumps({"task": "Answer directly: what is the capital of france", "answer": "Paris is the capital of France."}), True, ""),
+    (json.dumps({"task": "Answer directly: what is the capital of france", "steps": ["Clarify requirements"]}), False, "off topic"),
+])
+def test_cheap_qa(content, ok, why):
+    passed, reason = orchestrator._cheap_qa(
+        "what is the capital of france", {"content": content}, CFG, task="Answer directly: what is the capital of france"
+    )
+    assert passed is ok and (ok or reason == why), reason
+
+
+@pytest.mark.parametrize("goal", ["tell me 7 days of week names", "what is the capital of France"])
+def test_trivial_goal_exits_early(workdir, answering_planner, goal):
+    ctx, _, logs = asyncio.run(orchestrator.run_agents(goal, project="t", use_cache=False))
+    assert ctx["final_agent"] == "Planner"
+    assert "Scribe" not in logs and "QA" not in logs
+    assert ctx["skipped"]["Scribe"]["kind"] == ctx["skipped"]["QA"]["kind"] == "early_exit"
+
+
+def test_template_planner_does_not_exit_early(workdir):
+    # the built-in Planner returns generic steps, not an answer: the team keeps going
+    ctx, _, logs = asyncio.run(orchestrator.run_agents("what is the capital of France", project="t", use_cache=False))
+    assert ctx["final_agent"] == "Scribe" and "QA" in logs
+
+
+def test_early_exit_answer_is_the_final_output(workdir, answering_planner):
+    import io
+
+    from core.batch import BatchItem, run_batch
+
+    out = io.StringIO()
+    asyncio.run(run_batch(
+        [BatchItem(line=1, goal="what is the capital of france", project="t")], orchestrator.run_agents, out, use_cache=False,
+    ))
+    record = json.loads(out.getvalue().splitlines()[0])
+    assert record["status"] == "completed"
+    assert record["final_agent"] == "Planner"
+    assert "Paris" in record["final"]
+
+
+def test_reuse_only_for_a_recent_identical_goal(workdir, monkeypatch):
+    from config import CONFIG
+    from core import similarity
+
+    monkeypatch.setattr(similarity, "_INDEX", None)
+    monkeypatch.setitem(CONFIG, "similarity", {**CONFIG["similarity"], "dir": str(workdir / "similarity")})
+
+    def similar(goal):
+        ctx, _, _ = asyncio.run(orchestrator.run_agents(goal, project="t"))
+        return ctx["similar"]
+
+    assert similar("build a converter from celsius to fahrenheit") == {}
+    assert similar("Build the converter from Celsius to Fahrenheit")["action"] == "reuse"
+    reversed_ = similar("build a converter from fahrenheit to celsius")
+    assert reversed_.get("action") != "reuse"
+
+    monkeypatch.setitem(CONFIG, "similarity", {**CONFIG["similarity"], "reuse_max_age_sec": 0})
+    stale = similar("build a converter from celsius to fahrenheit")
+    assert stale["exact"] and stale["action"] == "warm_start"
+
+
+class _Streamer:
+    name = "Streamer"
+    system_message = ""
+
+    def __init__(self, fail_first=False):
+        self.fail_first = fail_first
+        self.calls = 0
+
+    def generate_reply(self, messages):
+        raise AssertionError("streaming agents are iterated, not called")
+
+    async def stream_reply(self, messages):
+        self.calls += 1
+        yield "Hel"
+        if self.fail_first and self.calls == 1:
+            raise ConnectionError("stream dropped")
+        yield "lo"
+
+
+def test_streamed_chunks_reach_on_event_and_retries_reset(monkeypatch):
+    from core.resilience import CallPolicy
+
+    monkeypatch.setattr(orchestrator, "policy_for", lambda name: CallPolicy(timeout_sec=5, retries=1, backoff_base=0.001))
+    events = []
+    reply, stats, info = asyncio.run(orchestrator._call_agent(
+        "Coder", _Streamer(fail_first=True), "hi", use_cache=False, on_event=events.append,
+    ))
+    assert reply == "Hello" and stats.backend == "stream" and info["attempts"] == 2
+    assert [(e["type"], e.get("chunk")) for e in events] == [
+        ("chunk", "Hel"), ("reset", None), ("chunk", "Hel"), ("chunk", "lo"),
+    ]
+
+
+def test_stream_run_ends_with_the_result(workdir):
+    async def collect():
+        return [e async for e in orchestrator.stream_run("build a todo app", project="t", use_cache=False)]
+
+    events = asyncio.run(collect())
+    assert events[-1]["type"] == "result"
+    ctx, _, logs = events[-1]["result"]
+    done = [e["agent"] for e in events if e["type"] == "done"]
+    assert set(done) == set(logs) and ctx["status"] == "completed"
+    assert all(e["type"] != "result" for e in events[:-1])
@@ -0,0 +1,98 @@
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from preview import Preview, PreviewManager, extract_app
+
+
+CODER_OUTPUT = """Here is the app:
+
+```python
+import streamlit as st
+st.title("Hello")
+```
+
+And a helper:
+
+```py
+def add(a, b):
+    return a + b
+```
+
+```bash
+pip install streamlit
+```
+"""
+
+
+def test_extract_app_strips_fences(tmp_path):
+    src = tmp_path / "coder_output.py"
+    src.write_text(CODER_OUTPUT, encoding="utf-8")
+    app = extract_app(str(src))
+    assert app == str(tmp_path / "coder_output_app.py")
+    code = open(app, encoding="utf-8").read()
+    compile(code, app, "exec")
+    assert "st.title" in code and "def add" in code and "pip install" not in code
+
+    mtime = (tmp_path / "coder_output_app.py").stat().st_mtime_ns
+    time.sleep(0.01)
+    extract_app(str(src))  # same code: file left alone (no hot reload)
+    assert (tmp_path / "coder_output_app.py").stat().st_mtime_ns == mtime
+
+
+def test_extract_app_bare_python_and_no_code(tmp_path):
+    bare = tmp_path / "bare.py"
+    bare.write_text("print('hi')\n", encoding="utf-8")
+    assert open(extract_app(str(bare)), encoding="utf-8").read() == "print('hi')\n"
+
+    prose = tmp_path / "prose.py"
+    prose.write_text("```bash\nls\n```\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        extract_app(str(prose))
+
+
+def _stubborn(manager: PreviewManager, path: str) -> Preview:
+    """A preview whose process ignores SIGTERM, so stopping it waits the full stop_timeout_sec."""
+    proc = subprocess.Popen([
+        sys.executable, "-c",
+        "import signal, sys, time\nsignal.signal(signal.SIGTERM, signal.SIG_IGN)\nprint(flush=True)\ntime.sleep(60)",
+    ], stdout=subprocess.PIPE)
+    proc.stdout.readline()  # handler installed
+    now = time.time()
+    p = Preview(app_path=path, port=0, proc=proc, started=now, last_used=now)
+    manager._previews[path] = p
+    return p
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="SIGTERM cannot be ignored on Windows")
+def test_stop_does_not_hold_the_lock(tmp_path):
+    manager = PreviewManager(stop_timeout_sec=1.5)
+    p = _stubborn(manager, str(tmp_path / "a.py"))
+    stopper = threading.Thread(target=manager.stop, args=(p.app_path,))
+    stopper.start()
+    time.sleep(0.2)
+    started = time.monotonic()
+    assert manager.status() == []  # already out of the table, lock free
+    assert time.monotonic() - started < 0.5
+    stopper.join()
+    assert not p.alive()
+
+
+def test_touch_keeps_a_preview_from_being_reaped(tmp_path):
+    manager = PreviewManager(idle_timeout_sec=60)
+    p = _stubborn(manager, str(tmp_path / "a.py"))
+    p.proc.kill()
+    p.proc.wait()
+    alive = Preview(app_path=str(tmp_path / "b.py"), port=0, proc=subprocess.Popen(
+        [sys.executable, "-c", "import time; time.sleep(60)"]), started=0.0, last_used=0.0)
+    manager._previews[alive.app_path] = alive
+    manager.touch(alive.app_path)
+    try:
+        assert manager.reap() == 1  # only the dead one
+        assert [s["app"] for s in manager.status()] == [alive.app_path]
+    finally:
+        manager.stop_all()
+    assert not alive.alive()
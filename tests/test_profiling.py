@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+from core import profiling
+from core.profiling import RunProfiler, profiling_enabled
+
+
+def test_enabled_precedence(monkeypatch):
+    monkeypatch.setenv(profiling.ENV_VAR, "1")
+    assert profiling_enabled() and not profiling_enabled(False)
+    monkeypatch.setenv(profiling.ENV_VAR, "off")
+    assert not profiling_enabled() and profiling_enabled(True)
+
+
+def test_profile_records_blocking_calls_and_saves(tmp_path):
+    prof = RunProfiler(tmp_path, sample_interval_ms=2, block_threshold_ms=40)
+
+    def blocking_helper():
+        time.sleep(0.2)  # holds the event loop
+
+    async def main():
+        assert prof.start()
+        try:
+            assert not RunProfiler(tmp_path).start()  # one profiled run at a time
+            await asyncio.sleep(0.03)
+            blocking_helper()
+            await asyncio.sleep(0.03)
+        finally:
+            prof.stop()
+
+    asyncio.run(main())
+    summary = prof.save()
+    assert summary["samples"] > 0 and summary["wall_sec"] >= 0.2
+    assert any("blocking_helper" in " ".join(ep["stack"]) for ep in summary["blocking"])
+    assert "time.sleep" in summary["top"][0]["function"]  # hottest by own time
+    assert (tmp_path / "profile.pstats").stat().st_size > 0
+    assert "blocking_helper" in (tmp_path / "profile.collapsed").read_text()
+    assert profiling._PROFILE_LOCK.acquire(blocking=False)
+    profiling._PROFILE_LOCK.release()
@@ -0,0 +1,90 @@
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+from agents import registry
+from agents.registry import AgentRegistry
+
+
+class FakeAgent:
+    def __init__(self, name):
+        self.name = name
+
+    def generate_reply(self, messages):
+        return self.name
+
+
+@pytest.fixture
+def agent_module(monkeypatch):
+    mod = types.ModuleType("fake_agents_mod")
+    mod.writer = FakeAgent("Writer")
+    monkeypatch.setitem(sys.modules, "fake_agents_mod", mod)
+    return mod
+
+
+def test_builtin_agent_is_resolved_on_first_lookup(monkeypatch):
+    reg = AgentRegistry({"Writer": "lazy_agents_mod:writer"}, group=None)
+    assert "Writer" in reg and reg.loaded() == []  # nothing imported yet
+    mod = types.ModuleType("lazy_agents_mod")
+    mod.writer = FakeAgent("Writer")
+    monkeypatch.setitem(sys.modules, "lazy_agents_mod", mod)
+    assert reg["Writer"] is mod.writer and reg.loaded() == ["Writer"]
+    with pytest.raises(KeyError):
+        reg["Nobody"]
+
+
+def test_register_and_update_replace_agents(agent_module):
+    reg = AgentRegistry({"Writer": "fake_agents_mod:writer"}, group=None)
+    assert reg["Writer"] is agent_module.writer
+    replacement = FakeAgent("Writer v2")
+    reg.update({"Writer": replacement})
+    assert reg["Writer"] is replacement
+    reg.register("Editor", lambda: FakeAgent("Editor"))
+    assert reg["Editor"] is reg["Editor"]  # the factory runs once
+    assert sorted(reg) == ["Editor", "Writer"] and len(reg) == 2
+
+
+class FakeEntryPoint:
+    def __init__(self, name, obj):
+        self.name = name
+        self.obj = obj
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return self.obj
+
+
+def test_entry_points_are_discovered_once_and_builtins_win(agent_module, monkeypatch):
+    plugin = FakeAgent("Reviewer")
+    eps = [FakeEntryPoint("Reviewer", lambda: plugin), FakeEntryPoint("Writer", FakeAgent("impostor"))]
+    calls = []
+    monkeypatch.setattr(registry, "_entry_points", lambda group: calls.append(group) or eps)
+
+    reg = AgentRegistry({"Writer": "fake_agents_mod:writer"})
+    assert reg["Writer"] is agent_module.writer and calls == []  # builtins need no discovery
+    assert reg["Reviewer"] is plugin
+    assert "Writer" in reg and reg["Writer"] is agent_module.writer
+    assert calls == [registry.ENTRY_POINT_GROUP] and eps[1].loads == 0
+
+
+def test_broken_entry_point_metadata_keeps_builtins(agent_module, monkeypatch):
+    def broken(group):
+        raise RuntimeError("bad metadata")
+
+    monkeypatch.setattr(registry, "_entry_points", broken)
+    reg = AgentRegistry({"Writer": "fake_agents_mod:writer"})
+    assert reg.names() == ["Writer"] and "Reviewer" not in reg
+
+
+def test_importing_the_orchestrator_loads_no_agent():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = (
+        "import sys, dashboard.orchestrator; "
+        "print(sorted(m for m in sys.modules if m.startswith('agents.') or m == 'autogen'))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "['agents.registry']"
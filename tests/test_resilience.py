@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from core.resilience import AgentTimeoutError, CallPolicy, LatencyTracker, backoff_delay, call_with_policy
+
+
+def _flaky(failures, value="ok", delay=0.0):
+    calls = {"n": 0}
+
+    async def call():
+        calls["n"] += 1
+        await asyncio.sleep(delay)
+        if calls["n"] <= failures:
+            raise ConnectionError(f"attempt {calls['n']}")
+        return value
+    return call, calls
+
+
+def test_retries_until_success():
+    call, calls = _flaky(2)
+    policy = CallPolicy(timeout_sec=1, retries=2, backoff_base=0.001)
+    result, info = asyncio.run(call_with_policy("t", call, policy, tracker=LatencyTracker()))
+    assert result == "ok" and calls["n"] == 3
+    assert info["attempts"] == 3 and len(info["errors"]) == 2
+
+
+def test_deadline_per_attempt_then_last_error():
+    async def slow():
+        await asyncio.sleep(1)
+
+    policy = CallPolicy(timeout_sec=0.05, retries=1, backoff_base=0.001)
+    with pytest.raises(AgentTimeoutError):
+        asyncio.run(call_with_policy("t", slow, policy, tracker=LatencyTracker()))
+
+
+def test_hedge_wins_when_primary_is_slow():
+    async def primary():
+        await asyncio.sleep(1)
+        return "primary"
+
+    async def hedge():
+        return "hedge"
+
+    policy = CallPolicy(timeout_sec=2, retries=0, hedge=True, hedge_after_sec=0.02)
+    result, info = asyncio.run(call_with_policy("t", primary, policy, hedge_call=hedge, tracker=LatencyTracker()))
+    assert result == "hedge" and info["hedged"] and info["winner"] == "hedge"
+
+
+def test_hedge_of_a_failed_attempt_is_not_reported():
+    calls = {"n": 0}
+
+    async def primary():
+        calls["n"] += 1
+        if calls["n"] == 1:
+            await asyncio.sleep(0.1)  # slow enough to be hedged, then fails
+            raise ConnectionError("reset")
+        return "primary"
+
+    async def hedge():
+        raise ConnectionError("hedge down")
+
+    policy = CallPolicy(timeout_sec=1, retries=1, backoff_base=0.001, hedge=True, hedge_after_sec=0.02)
+    result, info = asyncio.run(call_with_policy("t", primary, policy, hedge_call=hedge, tracker=LatencyTracker()))
+    assert result == "primary" and info["attempts"] == 2
+    assert not info["hedged"] and info["winner"] == "primary"
+
+
+def test_hedge_waits_for_enough_samples():
+    tracker = LatencyTracker()
+    call, _ = _flaky(0)
+
+    async def hedge():
+        raise AssertionError("no p95 yet: must not hedge")
+
+    policy = CallPolicy(timeout_sec=1, retries=0, hedge=True, hedge_min_samples=5)
+    _, info = asyncio.run(call_with_policy("t", call, policy, hedge_call=hedge, tracker=tracker))
+    assert not info["hedged"] and tracker.count("t") == 1
+
+
+def test_backoff_is_capped_full_jitter():
+    assert all(0.0 <= backoff_delay(10, 0.5, 2.0) <= 2.0 for _ in range(100))
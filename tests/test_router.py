@@ -0,0 +1,67 @@
+# tests/test_router.py
+from __future__ import annotations
+
+import pytest
+
+from config import CONFIG
+from core import router as router_mod
+from core.router import IntentRouter, reset_router, route
+
+
+@pytest.mark.parametrize(
+    "goal, code, ui, simple",
+    [
+        # inflections (the legacy substring scan matched these)
+        ("debugging my flask app", True, False, False),
+        ("building a todo app", True, False, False),
+        ("help with implementation of quicksort", True, False, False),
+        ("fixing the errors in my scripts", True, False, False),
+        ("designing dashboards for agent runs", False, True, False),
+        # word boundaries (legacy false positives) and no bare prefixes
+        ("a chemical reaction in a fixture for the pageant", False, False, False),
+        ("what is the capital of France", False, False, True),
+        ("parse this json for me please now", False, False, False),
+        # plurals / phrases
+        ("tell me 7 days of week names", False, False, True),
+        ("build a streamlit login page", True, True, False),
+        ("", False, False, True),
+    ],
+)
+def test_classification(goal, code, ui, simple):
+    intents = IntentRouter().classify(goal)
+    assert (intents.code, intents.ui, intents.simple_factual) == (code, ui, simple)
+
+
+def test_short_keywords_are_whole_words_only():
+    r = IntentRouter()
+    assert r.classify("the uis of the app").ui  # plural
+    assert not r.classify("quicksort in place").ui
+    assert not r.classify("json payload parsing today").code  # no "js" inside "json"
+
+
+@pytest.mark.parametrize("word", ["reaction", "reactor", "fixture", "pageant", "codex", "scriptorium"])
+def test_keywords_are_not_bare_prefixes(word):
+    intents = IntentRouter().classify(f"{word} {word}")
+    assert not intents.matches, intents.matches
+
+
+@pytest.mark.parametrize("word", ["fixes", "fixed", "reacting", "pages", "paged", "designer", "implements", "defined"])
+def test_inflected_keywords_still_match(word):
+    assert IntentRouter().classify(word).matches
+
+
+def test_matches_name_the_keyword():
+    intents = IntentRouter().classify("debugging the   capital   of chile")
+    assert ("code", "debug*") in intents.matches
+    assert ("factual", "capital of") in intents.matches
+
+
+def test_router_is_cached_until_the_keywords_dict_changes(monkeypatch):
+    reset_router()
+    first = router_mod.get_router()
+    assert router_mod.get_router() is first
+
+    monkeypatch.setitem(CONFIG, "router", {"keywords": {"code": ["sqlx"]}})
+    assert route("write sqlx migrations for users").code
+    assert router_mod.get_router() is not first
+    reset_router()
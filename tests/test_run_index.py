@@ -0,0 +1,62 @@
+# tests/test_run_index.py
+from __future__ import annotations
+
+from pathlib import Path
+
+from core.run_index import RunIndex
+
+
+def _ctx(run_id: str, start: str = "2026-10-18T12:00:00", project: str = "Demo") -> dict:
+    return {"project": project, "run_id": run_id, "goal": "g", "status": "completed", "start_time": start,
+            "timings": {"Scribe": {"end": 1.5}}}
+
+
+def _run_folder(root: Path, run_id: str, project: str = "demo") -> Path:
+    d = root / "projects" / project / "runs" / run_id
+    d.mkdir(parents=True)
+    (d / "scribe.md").write_text("summary", encoding="utf-8")
+    (d / "run_context.json").write_text("{}", encoding="utf-8")
+    return d
+
+
+def test_record_run_indexes_the_run_and_its_files(workdir):
+    index = RunIndex(workdir / "runs.sqlite3")
+    index.record_run(_ctx("r1"), _run_folder(workdir, "r1"))
+    [run] = index.recent_runs()
+    assert run["project"] == "demo" and run["wall_sec"] == 1.5
+    assert [a["name"] for a in index.artifacts("Demo", "r1")] == ["run_context.json", "scribe.md"]
+
+
+def test_record_run_picks_up_the_scribe_log_written_during_the_run(workdir):
+    memory = workdir / "memory"
+    memory.mkdir()
+    (memory / "scribe_log_2026-10-17_09-00-00.md").write_text("old", encoding="utf-8")  # before the run
+    (memory / "scribe_log_2026-10-18_12-00-03.md").write_text("new", encoding="utf-8")  # ScribeAgent, this run
+
+    index = RunIndex(workdir / "runs.sqlite3")
+    index.record_run(_ctx("r1"), _run_folder(workdir, "r1"), legacy_dir=memory)
+    files = [Path(f).name for f in index.scribe_files()]
+    assert "scribe_log_2026-10-18_12-00-03.md" in files
+    assert "scribe_log_2026-10-17_09-00-00.md" not in files  # only rebuild() backfills older logs
+
+
+def test_current_runs_scribe_is_not_hidden_by_legacy_logs(workdir):
+    memory = workdir / "memory"
+    memory.mkdir()
+    for i in range(20):
+        (memory / f"scribe_log_2026-10-18_12-00-{i:02d}.md").write_text("x", encoding="utf-8")
+
+    index = RunIndex(workdir / "runs.sqlite3")
+    index.rebuild(workdir / "projects", memory)
+    index.record_run(_ctx("r9"), _run_folder(workdir, "r9"), legacy_dir=memory)
+    files = index.scribe_files(project="Demo", run_id="r9", limit=8)
+    assert len(files) == 8
+    assert files[0].endswith(str(Path("r9") / "scribe.md"))
+
+
+def test_rebuild_backfills_from_run_context_files(workdir):
+    d = _run_folder(workdir, "r2")
+    (d / "run_context.json").write_text('{"goal": "from disk", "status": "completed"}', encoding="utf-8")
+    index = RunIndex(workdir / "runs.sqlite3")
+    assert index.rebuild(workdir / "projects", workdir / "memory") == 1
+    assert index.recent_runs(project="demo")[0]["goal"] == "from disk"
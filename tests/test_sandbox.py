@@ -0,0 +1,178 @@
+import os
+import sys
+import time
+
+import pytest
+
+from core.sandbox import Limits, SandboxPool
+
+
+# reaches core.sandbox's module globals from inside a restricted snippet
+WORKER_GLOBALS = """
+todo, seen = [().__class__.__base__], set()
+while todo:
+    c = todo.pop()
+    if c.__name__ == "_ChunkStream":
+        break
+    for sub in ().__class__.__class__.__subclasses__(c):
+        if sub not in seen:
+            seen.add(sub)
+            todo.append(sub)
+g = c.write.__globals__
+"""
+
+POISON = WORKER_GLOBALS + """
+g["SAFE_BUILTINS"]["leaked"] = "poisoned"
+g["SAFE_BUILTINS"]["__import__"] = g["__builtins__"]["__import__"]
+g["BLOCKED_IMPORTS"].clear()
+print("done")
+"""
+
+
+@pytest.fixture
+def pool():
+    p = SandboxPool(size=1, max_runs=50)
+    yield p
+    p.close()
+
+
+def _alive(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] not in ("Z", "X")
+    except OSError:
+        return False
+
+
+def test_snippet_cannot_poison_the_next_one(pool):
+    first = pool.execute(POISON, Limits(timeout_sec=10))
+    assert first.status == "ok", first.stderr
+    assert first.stdout.strip() == "done"
+
+    leaked = pool.execute("print(leaked)", Limits(timeout_sec=10))
+    assert leaked.status == "err" and "NameError" in leaked.stderr
+    blocked = pool.execute("import subprocess", Limits(timeout_sec=10))
+    assert blocked.status == "unsafe"
+    no_import = pool.execute("import json", Limits(timeout_sec=10))
+    assert no_import.status == "err" and "__import__" in no_import.stderr
+    assert pool.stats()["spawned"] == 1  # same warm worker throughout
+
+
+def _wait_for_idle(pool, n=1):
+    deadline = time.monotonic() + 5
+    while pool.stats()["idle"] < n and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return pool.stats()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="snippets run in a forked child")
+def test_a_memory_heavy_snippet_does_not_retire_the_worker():
+    pool = SandboxPool(size=1, max_runs=50, max_rss_growth_mb=32)
+    try:
+        assert pool.execute("print(1)", Limits(timeout_sec=10)).status == "ok"
+        heavy = pool.execute("x = ' ' * (120 * 1024 * 1024)\nprint(len(x))", Limits(timeout_sec=10, memory_mb=512))
+        assert heavy.status == "ok", heavy.stderr
+        assert heavy.peak_rss_kb > 100 * 1024  # the snippet child's peak
+        assert pool.execute("print(2)", Limits(timeout_sec=10)).status == "ok"
+        assert pool.stats()["spawned"] == 1 and pool.stats()["recycled"] == 0
+    finally:
+        pool.close()
+
+
+def test_worker_rss_growth_recycles(monkeypatch):
+    import core.sandbox as sandbox
+
+    rss = iter([50_000, 50_000, 200_000])
+    monkeypatch.setattr(sandbox, "_proc_rss_kb", lambda pid: next(rss))
+    pool = SandboxPool(size=1, max_runs=50, max_rss_growth_mb=64)
+    try:
+        for _ in range(3):
+            assert pool.execute("print(1)", Limits(timeout_sec=10)).status == "ok"
+        assert pool.stats()["recycled"] == 1
+    finally:
+        pool.close()
+
+
+def test_dropped_workers_are_replaced_right_away():
+    pool = SandboxPool(size=1, max_runs=2)
+    try:
+        for _ in range(2):
+            pool.execute("print(1)", Limits(timeout_sec=10))
+        assert pool.execute("while True: pass", Limits(timeout_sec=0.5)).status == "timeout"
+        stats = _wait_for_idle(pool)
+        assert (stats["recycled"], stats["killed"], stats["spawned"]) == (1, 1, 3)
+        assert (stats["workers"], stats["idle"]) == (1, 1)  # a warm worker waits for the next call
+    finally:
+        pool.close()
+    assert pool.stats()["workers"] == 0
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="needs /proc")
+def test_timeout_kills_the_snippet_child(pool):
+    code = WORKER_GLOBALS + "print(g['os'].getpid(), flush=True)\ng['time'].sleep(30)"
+    res = pool.execute(code, Limits(timeout_sec=1))
+    assert res.status == "timeout"
+    pid = int(res.stdout.split()[0])
+    deadline = time.monotonic() + 5
+    while _alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _alive(pid)
+
+
+def test_output_is_capped_and_marked(pool):
+    res = pool.execute("for i in range(5000):\n    print('x' * 100)", Limits(timeout_sec=10, max_output_bytes=1000, chunk_bytes=256))
+    assert res.status == "ok" and res.truncated
+    assert len(res.stdout.encode()) == 1000
+    assert "output truncated" in res.stderr
+
+
+@pytest.mark.skipif(not hasattr(os, "fork") or sys.platform != "linux", reason="rlimits are enforced on Linux")
+def test_cpu_and_memory_limits(pool):
+    spin = pool.execute("while True:\n    pass", Limits(timeout_sec=10, cpu_sec=0.5))
+    assert spin.status == "timeout" and "CPU time limit" in spin.stderr
+    assert spin.wall_sec < 5
+
+    hog = pool.execute("x = [0] * (512 * 1024 * 1024)", Limits(timeout_sec=10, memory_mb=64))
+    assert hog.status == "err" and "MemoryError" in hog.stderr
+
+    ok = pool.execute("print(sum(range(10)))", Limits(timeout_sec=10))
+    assert ok.status == "ok" and ok.stdout.strip() == "45" and ok.cpu_sec >= 0
+
+
+def test_trusted_and_concurrent_execution(workdir):
+    import asyncio
+
+    from core.sandbox import execute, execute_many, run_python_sandbox
+    from tools import run_python_code
+
+    trusted = execute("import os, sys\nprint(sys.argv, os.getpid() != 0)", trusted=True, timeout_sec=10)
+    assert trusted.status == "ok" and trusted.stdout.strip() == "['-'] True"
+    assert execute("import os", timeout_sec=10).status == "unsafe"  # restricted by default
+    assert run_python_sandbox("print(6 * 7)") == ("ok", "42\n", "")
+    assert run_python_code("print('hi')") == "hi"
+
+    results = asyncio.run(execute_many([f"print({i})" for i in range(4)], timeout_sec=10))
+    assert [r.stdout.strip() for r in results] == ["0", "1", "2", "3"]
+
+    slow = execute("import time\ntime.sleep(5)", trusted=True, timeout_sec=0.5)
+    assert slow.status == "timeout"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_trusted_run_does_not_wait_for_a_grandchild_holding_the_usage_pipe():
+    from core.sandbox import execute
+
+    # the grandchild keeps the usage fd open; the child exits without reporting usage
+    code = (
+        "import os, time\n"
+        "if os.fork() == 0:\n"
+        "    os.close(1); os.close(2)\n"
+        "    time.sleep(5)\n"
+        "    os._exit(0)\n"
+        "print('bye', flush=True)\n"
+        "os._exit(0)\n"
+    )
+    t0 = time.monotonic()
+    res = execute(code, trusted=True, timeout_sec=10)
+    assert res.status == "ok" and res.stdout == "bye\n"
+    assert time.monotonic() - t0 < 3
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from core.scheduler import DagScheduler, Node
+
+
+def _node(name, delay=0.0, fail=False, requires=(), optional=(), log=None):
+    async def fn(inputs):
+        if log is not None:
+            log.append((name, sorted(inputs)))
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError(f"{name} broke")
+        return name.lower()
+    return Node(name, fn, list(requires), list(optional))
+
+
+def test_nodes_start_when_their_own_inputs_are_done():
+    # B only needs A: it must not wait for the slow C (no phase barrier)
+    sched = DagScheduler([
+        _node("A", 0.01),
+        _node("C", 0.2),
+        _node("B", 0.01, requires=["A"]),
+        _node("D", optional=["B", "C"]),
+    ])
+    res = asyncio.run(sched.run())
+    assert {n: r.status for n, r in res.items()} == {"A": "ok", "B": "ok", "C": "ok", "D": "ok"}
+    assert res["B"].end < res["C"].end
+    assert sched.critical_path() == ["C", "D"]
+
+
+def test_required_failure_skips_optional_failure_is_partial():
+    log = []
+    sched = DagScheduler([
+        _node("A", fail=True),
+        _node("B"),
+        _node("Req", requires=["A"]),
+        _node("Opt", optional=["A", "B"], log=log),
+    ])
+    res = asyncio.run(sched.run())
+    assert res["A"].status == "failed" and "A broke" in res["A"].error
+    assert res["Req"].status == "skipped"
+    assert res["Opt"].status == "ok" and res["Opt"].missing == ["A"]
+    assert ("Opt", ["B"]) in log
+
+
+def test_cycles_and_unknown_requirements_are_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        DagScheduler([_node("A", requires=["B"]), _node("B", requires=["A"])])
+    with pytest.raises(ValueError, match="unknown"):
+        DagScheduler([_node("A", requires=["Z"])])
+
+
+def test_cancel_from_on_result_stops_the_rest():
+    sched = None
+
+    def on_result(res):
+        if res.name == "A":
+            sched.cancel("good enough")
+
+    sched = DagScheduler([_node("A"), _node("Slow", 5.0), _node("B", requires=["A"])], on_result=on_result)
+    res = asyncio.run(asyncio.wait_for(sched.run(), 2))
+    assert res["A"].status == "ok"
+    assert res["Slow"].status == "cancelled" and res["Slow"].error == "good enough"
+    assert res["B"].status == "cancelled"
@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+pytest.importorskip("autogen")
+
+from dashboard.service import Job, OrchestratorService  # noqa: E402
+
+
+def test_job_applies_stream_events():
+    job = Job(id="job-1", goal="g", project="p", mode="Team Mode", model="m")
+    for ev in [
+        {"type": "start", "agent": "Coder"},
+        {"type": "chunk", "agent": "Coder", "chunk": "par"},
+        {"type": "reset", "agent": "Coder"},
+        {"type": "chunk", "agent": "Coder", "chunk": "full"},
+        {"type": "done", "agent": "Coder", "output": {"content": "final"}},
+        {"type": "pruned", "agent": "QA", "reason": "early exit"},
+    ]:
+        job.apply(ev)
+    snap = job.snapshot()
+    assert snap["agents"] == [("Coder", "final", "✅"), ("QA", "early exit", "⏭ not needed")]
+
+
+def test_runs_happen_on_the_service_loop(workdir):
+    service = OrchestratorService(keep_jobs=2)
+    try:
+        jobs = [service.submit("build a todo app", "t", "Team Mode", "m", use_cache=False) for _ in range(2)]
+        deadline = time.monotonic() + 30
+        while service.active() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        for job in jobs:
+            snap = job.snapshot()
+            assert snap["status"] == "done", snap["error"]
+            ctx, _, logs = snap["result"]
+            assert ctx["status"] == "completed" and "Scribe" in logs
+        service.submit("build a todo app", "t", "Team Mode", "m", use_cache=False)
+        assert [j.id for j in service.jobs()][0] == jobs[1].id  # oldest finished job dropped
+    finally:
+        service.shutdown()
+    assert service.loop.is_closed()
@@ -0,0 +1,118 @@
+import json
+import threading
+
+import pytest
+
+from config import CONFIG
+from core import similarity
+from core.similarity import Normalizer, SimilarityIndex
+
+
+def _exact(m) -> bool:
+    return m is not None and m.exact
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SimilarityIndex({"dir": str(tmp_path)})
+
+
+@pytest.mark.parametrize("first, second", [
+    ("convert celsius to fahrenheit", "convert fahrenheit to celsius"),
+    ("translate english to french", "translate french to english"),
+    ("explain the login code", "write the login code"),
+    ("write a login page", "implement a login page"),  # synonyms only help a warm start
+    ("copy from staging to prod", "copy to staging from prod"),
+])
+def test_different_tasks_are_never_reused(index, first, second):
+    index.add("p", "r1", first, "team", "r1/scribe.md")
+    assert not _exact(index.lookup("p", second, mode="team"))
+
+
+def test_word_order_lowers_similarity(index):
+    index.add("p", "r1", "convert celsius to fahrenheit", "team", "r1/scribe.md")
+    m = index.lookup("p", "convert fahrenheit to celsius", mode="team")
+    assert m is None or m.similarity < 0.6
+
+
+def test_same_goal_is_exact_and_synonyms_still_warm_start(index):
+    index.add("p", "r1", "Build a todo app with a login page", "team", "r1/scribe.md")
+    same = index.lookup("p", "please build the todo apps with login page", mode="team")
+    assert same.exact and same.run_id == "r1" and same.similarity == 1.0
+    assert 0 <= same.age_sec < 60
+
+    reworded = index.lookup("p", "create a todo application with a login page", mode="team")
+    assert reworded is not None and not reworded.exact and reworded.similarity >= 0.6
+
+
+def test_newest_exact_match_wins(index):
+    index.add("p", "r1", "summarize the release notes", "team", "r1/scribe.md")
+    index.add("p", "r2", "summarize the release notes", "team", "r2/scribe.md")
+    assert index.lookup("p", "summarize the release notes", mode="team").run_id == "r2"
+    assert not _exact(index.lookup("p", "summarize the release notes", mode="fast"))
+
+
+def test_old_rows_are_rederived_from_the_goal(tmp_path):
+    row = {
+        "run_id": "old", "goal": "convert celsius to fahrenheit", "mode": "team", "path": "old/scribe.md",
+        "tokens": ["celsius", "convert", "fahrenheit"], "created": 1.0, "layout": "48x12s1", "bands": [1, 2],
+    }
+    (tmp_path / "p.jsonl").write_text(json.dumps(row) + "\n", encoding="utf-8")
+    index = SimilarityIndex({"dir": str(tmp_path)})
+    assert not _exact(index.lookup("p", "convert fahrenheit to celsius", mode="team"))
+    m = index.lookup("p", "convert celsius to fahrenheit", mode="team")
+    assert m.exact and m.created == 1.0
+
+
+def test_normalizer_views():
+    n = Normalizer()
+    assert n.key("Explain THE login codes") == "explain login code"
+    assert n.key("sign in page") == n.key("signin page")
+    assert "build" in n.features("write a parser") and "build parser" in n.features("write a parser")
+
+
+@pytest.mark.parametrize("first, second", [
+    ("build a streamlit login page", "create a login page in streamlit"),
+    ("build a streamlit login page", "make a streamlit page for login"),
+])
+def test_reworded_goal_warm_starts_with_the_shipped_config(tmp_path, first, second):
+    index = SimilarityIndex({**CONFIG["similarity"], "dir": str(tmp_path)})
+    index.add("p", "r1", first, "team", "r1/scribe.md")
+    m = index.lookup("p", second, mode="team")
+    assert m is not None and not m.exact
+    assert m.similarity >= CONFIG["similarity"]["warm_start_threshold"]
+
+
+def test_preload_reads_every_project(tmp_path):
+    writer = SimilarityIndex({"dir": str(tmp_path)})
+    writer.add("alpha", "r1", "build a todo app", "team", "r1/scribe.md")
+    writer.add("beta", "r2", "explain dns", "team", "r2/scribe.md")
+
+    index = SimilarityIndex({"dir": str(tmp_path)})
+    assert index.preload() == 2
+    assert index.loaded("alpha") and index.loaded("beta")
+
+
+def test_a_slow_load_does_not_block_other_projects(tmp_path, monkeypatch):
+    index = SimilarityIndex({"dir": str(tmp_path)})
+    index.add("fast", "r1", "build a todo app", "team", "r1/scribe.md")
+    release, started = threading.Event(), threading.Event()
+    load = similarity._ProjectIndex._load
+
+    def slow_load(self):
+        if self.path.stem == "slow":
+            started.set()
+            release.wait(5)
+        load(self)
+
+    monkeypatch.setattr(similarity._ProjectIndex, "_load", slow_load)
+    loader = threading.Thread(target=index.load, args=("slow",))
+    loader.start()
+    try:
+        assert started.wait(5)
+        assert index.lookup("fast", "build a todo app", mode="team").exact  # not stuck behind "slow"
+        assert not index.loaded("slow")
+    finally:
+        release.set()
+        loader.join()
+    assert index.loaded("slow")
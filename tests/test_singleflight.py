@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from core.singleflight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    sf = SingleFlight()
+    runs = {"n": 0}
+
+    async def work():
+        runs["n"] += 1
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(sf.do("k", work) for _ in range(5)), sf.do("other", work))
+
+    results = asyncio.run(main())
+    assert runs["n"] == 2
+    assert [r for r, _ in results] == ["result"] * 6
+    assert sum(1 for _, shared in results if not shared) == 2
+    assert sf.stats() == {"calls": 6, "executions": 2, "saved": 4, "in_flight": 0}
+
+
+def test_errors_reach_every_caller_and_cancel_is_isolated():
+    sf = SingleFlight()
+
+    async def broken():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("down")
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    async def main():
+        errs = await asyncio.gather(sf.do("e", broken), sf.do("e", broken), return_exceptions=True)
+        first = asyncio.ensure_future(sf.do("s", slow))
+        second = asyncio.ensure_future(sf.do("s", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return errs, await second
+
+    errs, (value, shared) = asyncio.run(main())
+    assert all(isinstance(e, RuntimeError) for e in errs)
+    assert value == "ok" and shared
+
+
+def test_followers_get_their_own_run_record(workdir):
+    pytest.importorskip("autogen")
+    from dashboard import orchestrator
+
+    async def main():
+        return await asyncio.gather(*(
+            orchestrator.run_agents_coalesced("build a todo app", project="t", use_cache=False) for _ in range(3)
+        ))
+
+    results = asyncio.run(main())
+    leaders = [ctx for ctx, _, _ in results if not ctx["coalesced_with"]]
+    followers = [ctx for ctx, _, _ in results if ctx["coalesced_with"]]
+    assert len(leaders) == 1 and len(followers) == 2
+    assert {f["coalesced_with"] for f in followers} == {leaders[0]["run_id"]}
+    assert len({ctx["run_id"] for ctx, _, _ in results}) == 3
+    assert all(dirs == results[0][1] for _, dirs, _ in results)
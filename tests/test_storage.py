@@ -0,0 +1,66 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from core.storage import (
+    ArtifactWriter,
+    atomic_write_text,
+    ensure_dirs,
+    flush_run,
+    save_agent_output_async,
+    save_run_context_async,
+)
+
+
+def test_atomic_write_leaves_no_temp_files(tmp_path):
+    target = tmp_path / "sub" / "out.txt"
+    assert atomic_write_text(target, "héllo") == len("héllo".encode("utf-8"))
+    atomic_write_text(target, "second", fsync="dir")
+    assert target.read_text(encoding="utf-8") == "second"
+    assert os.listdir(target.parent) == ["out.txt"]
+
+
+def test_writer_coalesces_a_path_and_flush_waits_for_disk(tmp_path):
+    writer = ArtifactWriter(batch_size=16)
+    path = tmp_path / "ctx.json"
+
+    async def main():
+        futs = [await writer.submit(path, f"v{i}", "run") for i in range(5)]
+        futs.append(await writer.submit(tmp_path / "other.txt", "x", "run"))
+        await writer.flush("run")
+        return futs
+
+    futs = asyncio.run(main())
+    assert all(f.done() and not f.exception() for f in futs)
+    assert path.read_text() == "v4"  # last write wins
+    assert writer.counters["coalesced"] >= 4 and writer.counters["writes"] >= 2
+
+
+def test_flush_raises_the_write_error(tmp_path):
+    writer = ArtifactWriter()
+    blocker = tmp_path / "file"
+    blocker.write_text("not a folder")
+
+    async def main():
+        await writer.submit(blocker / "out.txt", "x", "run")
+        await writer.flush("run")
+
+    with pytest.raises(OSError):
+        asyncio.run(main())
+    assert writer.counters["errors"] == 1
+
+
+def test_run_helpers_write_through_the_loop_writer(workdir):
+    dirs = ensure_dirs("My Project", "r1")
+
+    async def main():
+        await save_run_context_async(dirs, {"run_id": "r1", "status": "running"})
+        await save_agent_output_async(dirs, {"save_as": "coder_output.py", "content": "print(1)"})
+        await flush_run(dirs)
+
+    asyncio.run(main())
+    assert str(dirs["runs"]).replace(os.sep, "/") == "projects/my-project/runs/r1"
+    assert json.loads((dirs["runs"] / "run_context.json").read_text())["status"] == "running"
+    assert (dirs["runs"] / "coder_output.py").read_text() == "print(1)"
@@ -0,0 +1,64 @@
+import json
+import os
+import random
+import sys
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from stub_llm_server import StubOptions, StubServer, parse_latency  # noqa: E402
+
+
+def _post(url, body):
+    req = urllib.request.Request(url, json.dumps(body).encode(), {"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=5) as resp:
+        return resp.status, resp.read().decode()
+
+
+def test_latency_specs():
+    rng = random.Random(1)
+    assert parse_latency("fixed:250")(rng) == 0.25
+    assert 0.1 <= parse_latency("uniform:100,200")(rng) <= 0.2
+    assert parse_latency("lognormal:100,0.3")(rng) > 0
+    with pytest.raises(ValueError):
+        parse_latency("pareto:1")
+
+
+def test_completions_streaming_and_injected_errors():
+    srv = StubServer(StubOptions(latency="fixed:0", tokens=4)).start()
+    try:
+        status, body = _post(srv.base_url + "/chat/completions", {"messages": [{"role": "user", "content": "hi"}]})
+        assert status == 200
+        assert len(json.loads(body)["choices"][0]["message"]["content"].split()) == 4
+
+        _, sse = _post(srv.base_url + "/chat/completions", {"stream": True, "messages": [{"content": "hi"}]})
+        events = [line[6:] for line in sse.splitlines() if line.startswith("data: ")]
+        assert events[-1] == "[DONE]" and len(events) == 5
+
+        srv.backend.opts.error_rate = 1.0
+        with pytest.raises(urllib.error.HTTPError) as err:
+            _post(srv.base_url + "/chat/completions", {"messages": [{"content": "hi"}]})
+        assert err.value.code == 500
+        assert srv.backend.counters["requests"] == 3 and srv.backend.counters["errors"] == 1
+    finally:
+        srv.stop()
+
+
+def test_load_test_end_to_end(workdir, monkeypatch, capsys):
+    pytest.importorskip("httpx")
+    pytest.importorskip("autogen")
+    import load_test
+
+    from agents.registry import BUILTIN, AgentRegistry
+    from dashboard import orchestrator
+
+    monkeypatch.setattr(orchestrator, "AGENTS", AgentRegistry(BUILTIN, group=None))
+    code = load_test.main(["--runs", "3", "--concurrency", "2", "--latency", "fixed:1", "--tokens", "5", "--json"])
+    report = json.loads(capsys.readouterr().out)
+    assert code == 0
+    assert report["completed"] == 3 and report["errors"] == 0
+    assert report["backend"]["requests"] >= 3 * 5  # every stage went through the stub
+    assert "Scribe" in report["stages"]
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from core import tracing
+from core.tracing import Tracer, activate, deactivate
+
+
+def test_spans_nest_per_task_and_record_errors():
+    tracer = Tracer()
+
+    async def agent(name):
+        with tracing.span(name, "agent"):
+            await asyncio.sleep(0.01)
+            with tracing.span(f"{name}.exec", "exec"):
+                await asyncio.sleep(0)
+
+    async def main():
+        token = activate(tracer)
+        try:
+            with tracing.span("run", "run"):
+                await asyncio.gather(agent("Coder"), agent("QA"))
+                with pytest.raises(RuntimeError):
+                    with tracing.span("save", "storage"):
+                        raise RuntimeError("disk full")
+        finally:
+            deactivate(token)
+
+    asyncio.run(main())
+    spans = {s["name"]: s for s in tracer.to_list()}
+    run_id = spans["run"]["id"]
+    assert spans["Coder"]["parent"] == spans["QA"]["parent"] == run_id
+    assert spans["Coder.exec"]["parent"] == spans["Coder"]["id"]
+    assert spans["QA.exec"]["parent"] == spans["QA"]["id"]
+    assert spans["save"]["attrs"]["error"] == "RuntimeError: disk full"
+    assert all(s["end"] >= s["start"] >= 0 for s in spans.values())
+
+    summary = tracer.summary(top=2)
+    assert summary["spans"] == 6 and summary["by_kind"]["agent"]["count"] == 2
+    assert {s["name"] for s in summary["slowest"]} == {"Coder", "QA"}  # the run span itself is left out
+
+
+def test_module_span_is_a_no_op_outside_a_run():
+    assert tracing.current_tracer() is None
+    with tracing.span("orphan") as sp:
+        assert sp is None
+
+
+def test_add_records_a_measured_span_under_the_current_one():
+    tracer = Tracer(origin=0.0)
+    with tracer.span("agent") as parent:
+        queued = tracer.add("queue", "queue", start=1.0, end=1.5)
+    assert queued.parent == parent.id
+    assert [s for s in tracer.to_list() if s["name"] == "queue"][0]["duration"] == 0.5
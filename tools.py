@@ -1,28 +1,19 @@
 import os
-import subprocess
-import tempfile
 
-def run_python_code(code: str) -> str:
-    try:
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".py", delete=False, encoding="utf-8") as f:
-            f.write(code)
-            temp_path = f.name
+from core.sandbox import execute
 
-        result = subprocess.run(
-            ["python", temp_path],
-            capture_output=True,
-            text=True,
-            timeout=15
-        )
-        try:
-            os.remove(temp_path)
-        except OSError:
-            pass
 
-        return result.stdout.strip() or result.stderr.strip() or "✅ Ran successfully (no output)."
+def run_python_code(code: str) -> str:
+    """Runs trusted code in a fresh interpreter (see core.sandbox.execute, trusted=True)."""
+    try:
+        result = execute(code, trusted=True)
     except Exception as e:
         return f"❌ Error running code: {e}"
 
+    if result.status == "timeout":
+        return f"❌ Error running code: {result.stderr.strip()}"
+    return result.stdout.strip() or result.stderr.strip() or "✅ Ran successfully (no output)."
+
 def save_file(filename: str, content: str) -> str:
     try:
         folder = os.path.dirname(filename)